@@ -1,4 +1,5 @@
-from collections.abc import Generator
+import uuid
+from collections.abc import AsyncGenerator
 from typing import Annotated
 
 import jwt
@@ -6,29 +7,39 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jwt.exceptions import InvalidTokenError
 from pydantic import ValidationError
-from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core import security
 from app.core.config import settings
-from app.core.db import engine
+from app.core.db import get_session
 from app.models.user import TokenPayload, User
-import uuid
 
 reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/login/access-token"
 )
 
 
-def get_db() -> Generator[Session, None, None]:
-    with Session(engine) as session:
+async def get_db() -> AsyncGenerator[AsyncSession]:
+    async with get_session() as session:
+        yield session
+
+
+async def get_read_db() -> AsyncGenerator[AsyncSession]:
+    async with get_session(replica=True) as session:
         yield session
 
 
-SessionDep = Annotated[Session, Depends(get_db)]
+SessionDep = Annotated[AsyncSession, Depends(get_db)]
+# For handlers that only read, their queries may go to a replica
+ReadSessionDep = Annotated[AsyncSession, Depends(get_read_db)]
 TokenDep = Annotated[str, Depends(reusable_oauth2)]
 
 
-def get_current_user(session: SessionDep, token: TokenDep) -> User:
+async def get_current_user(session: SessionDep, token: TokenDep) -> User:
+    cached_user = security.principal_cache.get(token)
+    if cached_user is not None:
+        # Attach a copy to this session without loading it again
+        return await session.merge(cached_user, load=False)
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[security.ALGORITHM]
@@ -46,18 +57,22 @@ def get_current_user(session: SessionDep, token: TokenDep) -> User:
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Token subject is not a valid UUID",
         )
-    user = session.get(User, uuid_obj)
+    version = security.principal_cache.version(uuid_obj)
+    user = await session.get(User, uuid_obj)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     if not user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
+    security.principal_cache.set(
+        token, user, version=version, expires_at=payload["exp"]
+    )
     return user
 
 
 CurrentUser = Annotated[User, Depends(get_current_user)]
 
 
-def get_current_active_superuser(current_user: CurrentUser) -> User:
+async def get_current_active_superuser(current_user: CurrentUser) -> User:
     if not current_user.is_superuser:
         raise HTTPException(
             status_code=403, detail="The user doesn't have enough privileges"
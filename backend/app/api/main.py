@@ -1,6 +1,23 @@
 from fastapi import APIRouter
 
-from app.api.routes import items, login, private, users, utils, transactions
+from app.api.routes import (
+    alerts,
+    analytics,
+    items,
+    login,
+    market,
+    news,
+    portfolio,
+    positions,
+    private,
+    stocks,
+    stream,
+    transactions,
+    users,
+    utils,
+    wallet,
+    watchlist,
+)
 from app.core.config import settings
 
 api_router = APIRouter()
@@ -9,6 +26,16 @@ api_router.include_router(users.router)
 api_router.include_router(utils.router)
 api_router.include_router(items.router)
 api_router.include_router(transactions.router)
+api_router.include_router(positions.router)
+api_router.include_router(portfolio.router)
+api_router.include_router(stocks.router)
+api_router.include_router(market.router)
+api_router.include_router(news.router)
+api_router.include_router(stream.router)
+api_router.include_router(analytics.router)
+api_router.include_router(alerts.router)
+api_router.include_router(watchlist.router)
+api_router.include_router(wallet.router)
 
 
 if settings.ENVIRONMENT == "local":
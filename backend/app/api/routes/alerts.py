@@ -0,0 +1,140 @@
+import uuid
+from datetime import datetime
+from typing import Any
+
+from fastapi import APIRouter, HTTPException, Query
+from sqlmodel import col, func, select, tuple_
+
+from app.api.deps import CurrentUser, ReadSessionDep, SessionDep
+from app.api.pagination import MAX_PAGE_SIZE, decode_cursor, encode_cursor
+from app.core.config import settings
+from app.models import (
+    Message,
+    PriceAlert,
+    PriceAlertCreate,
+    PriceAlertPublic,
+    PriceAlertsPublic,
+)
+from app.services import alerts
+from app.services.market_data import market_data
+from app.services.securities import security_index
+
+router = APIRouter(prefix="/alerts", tags=["alerts"])
+
+
+def _to_public(alert: PriceAlert, current_prices: dict[str, float]) -> PriceAlertPublic:
+    return PriceAlertPublic.model_validate(
+        alert, update={"current_price": current_prices.get(alert.symbol)}
+    )
+
+
+def _current_prices(symbols: set[str]) -> dict[str, float]:
+    # Cached quotes only, listing alerts never waits for the provider
+    return {
+        symbol: quote.price
+        for symbol, quote in market_data.cache.get_many(symbols).items()
+    }
+
+
+@router.get("/", response_model=PriceAlertsPublic)
+async def read_alerts(
+    session: ReadSessionDep,
+    current_user: CurrentUser,
+    symbol: str | None = None,
+    active: bool | None = None,
+    cursor: str | None = None,
+    limit: int = Query(default=100, ge=1, le=MAX_PAGE_SIZE),
+) -> Any:
+    """
+    Retrieve the current user's price alerts, newest first.
+    Pass the returned next_cursor to get the following page.
+    """
+    filters = [PriceAlert.user_id == current_user.id]
+    if symbol:
+        filters.append(PriceAlert.symbol == symbol.upper())
+    if active is not None:
+        filters.append(PriceAlert.is_active == active)
+    count_statement = select(func.count()).select_from(PriceAlert).where(*filters)
+    count = (await session.exec(count_statement)).one()
+    if cursor:
+        after = decode_cursor(cursor, datetime.fromisoformat, uuid.UUID)
+        filters.append(tuple_(PriceAlert.created_at, PriceAlert.id) < tuple_(*after))
+    statement = (
+        select(PriceAlert)
+        .where(*filters)
+        .order_by(col(PriceAlert.created_at).desc(), col(PriceAlert.id).desc())
+        .limit(limit)
+    )
+    price_alerts = (await session.exec(statement)).all()
+    current_prices = _current_prices({alert.symbol for alert in price_alerts})
+    next_cursor = None
+    if len(price_alerts) == limit:
+        last = price_alerts[-1]
+        next_cursor = encode_cursor(last.created_at.isoformat(), last.id)
+    return PriceAlertsPublic(
+        data=[_to_public(alert, current_prices) for alert in price_alerts],
+        count=count,
+        next_cursor=next_cursor,
+    )
+
+
+@router.post("/", response_model=PriceAlertPublic)
+async def create_alert(
+    *, session: SessionDep, current_user: CurrentUser, alert_in: PriceAlertCreate
+) -> Any:
+    """
+    Create a price alert, triggered once when the price crosses its target.
+    """
+    security = security_index.get(alert_in.symbol)
+    if not security:
+        raise HTTPException(status_code=400, detail="Unknown symbol")
+    active = PriceAlert.user_id == current_user.id, col(PriceAlert.is_active)
+    count = (
+        await session.exec(select(func.count()).select_from(PriceAlert).where(*active))
+    ).one()
+    if count >= settings.ALERT_MAX_PER_USER:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.ALERT_MAX_PER_USER} active alerts per user",
+        )
+    duplicate = await session.exec(
+        select(PriceAlert.id).where(
+            *active,
+            PriceAlert.symbol == security.symbol,
+            PriceAlert.direction == alert_in.direction,
+            PriceAlert.target_price == alert_in.target_price,
+        )
+    )
+    if duplicate.first():
+        raise HTTPException(status_code=400, detail="A similar alert already exists")
+    alert = PriceAlert.model_validate(
+        alert_in,
+        update={
+            "user_id": current_user.id,
+            "symbol": security.symbol,
+            "security_id": security.id,
+        },
+    )
+    session.add(alert)
+    await session.commit()
+    await session.refresh(alert)
+    alerts.submit_alert(alert)
+    return _to_public(alert, _current_prices({alert.symbol}))
+
+
+@router.delete("/{id}")
+async def delete_alert(
+    session: SessionDep, current_user: CurrentUser, id: uuid.UUID
+) -> Message:
+    """
+    Delete a price alert.
+    """
+    alert = await session.get(PriceAlert, id)
+    if not alert:
+        raise HTTPException(status_code=404, detail="Alert not found")
+    if alert.user_id != current_user.id:
+        raise HTTPException(status_code=400, detail="Not enough permissions")
+    await session.delete(alert)
+    await session.commit()
+    alerts.alert_engine.cancel(id)
+    return Message(message="Alert deleted successfully")
@@ -0,0 +1,67 @@
+import datetime
+from typing import Any
+
+from fastapi import APIRouter, HTTPException, Query
+
+from app.api.deps import CurrentUser
+from app.models import DailyActivitiesPublic, TopSymbolsPublic
+from app.services.analytics import snapshot_store
+
+router = APIRouter(prefix="/analytics", tags=["analytics"])
+
+DEFAULT_RANGE_DAYS = 7
+MAX_TOP_SYMBOLS = 100
+
+
+def _date_range(
+    since: datetime.date | None, until: datetime.date | None
+) -> tuple[datetime.date, datetime.date]:
+    until = until or datetime.date.today()
+    since = since or until - datetime.timedelta(days=DEFAULT_RANGE_DAYS)
+    if since >= until:
+        raise HTTPException(status_code=400, detail="since must be before until")
+    return since, until
+
+
+@router.get("/top-symbols", response_model=TopSymbolsPublic)
+async def read_top_symbols(
+    current_user: CurrentUser,
+    since: datetime.date | None = None,
+    until: datetime.date | None = None,
+    limit: int = Query(default=10, ge=1, le=MAX_TOP_SYMBOLS),
+) -> Any:
+    """
+    Get the most traded symbols across all users by volume, over the trade
+    dates from `since` to before `until` (the past week by default).
+    Served from the daily snapshot, trades after snapshot_through aren't
+    counted yet.
+    """
+    since, until = _date_range(since, until)
+    rows = await snapshot_store.top_symbols_async(since, until, limit=limit)
+    return TopSymbolsPublic(
+        data=rows,
+        since=since,
+        until=until,
+        snapshot_through=snapshot_store.exported_through,
+    )
+
+
+@router.get("/symbols/{symbol}/daily", response_model=DailyActivitiesPublic)
+async def read_symbol_daily_activity(
+    current_user: CurrentUser,
+    symbol: str,
+    since: datetime.date | None = None,
+    until: datetime.date | None = None,
+) -> Any:
+    """
+    Get the trade count, volume and average price of a symbol across all
+    users, per trade date.
+    """
+    since, until = _date_range(since, until)
+    rows = await snapshot_store.daily_activity_async([symbol], since, until)
+    return DailyActivitiesPublic(
+        data=rows,
+        since=since,
+        until=until,
+        snapshot_through=snapshot_store.exported_through,
+    )
@@ -0,0 +1,48 @@
+import datetime
+from typing import Any
+
+from fastapi import APIRouter, HTTPException, Response
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models import MarketStatusPublic
+from app.services.trading_calendar import trading_calendars
+
+router = APIRouter(prefix="/market", tags=["market"])
+
+MAX_STATUS_AGE_SECONDS = 60.0
+
+# A status only changes when a session opens or closes, each one is cached
+# until then (or for at most a minute)
+status_cache: TTLCache[str, MarketStatusPublic] = TTLCache(
+    ttl=MAX_STATUS_AGE_SECONDS, max_size=64
+)
+
+
+def _seconds_until_change(status: MarketStatusPublic, now: datetime.datetime) -> float:
+    change = status.next_close if status.is_open else status.next_open
+    if change is None:
+        return MAX_STATUS_AGE_SECONDS
+    return min(MAX_STATUS_AGE_SECONDS, (change - now).total_seconds())
+
+
+@router.get("/status", response_model=MarketStatusPublic)
+async def read_market_status(response: Response, exchange: str | None = None) -> Any:
+    """
+    Whether an exchange (the default one if not given) is open, its session
+    today and its next open and close.
+    """
+    name = (exchange or settings.MARKET_DEFAULT_EXCHANGE).strip().upper()
+    if name not in trading_calendars.exchanges():
+        raise HTTPException(status_code=404, detail="Unknown exchange")
+    now = datetime.datetime.now(datetime.UTC)
+    status = status_cache.get(name)
+    if status is None:
+        status = MarketStatusPublic.model_validate(
+            trading_calendars.get(name).status(now, exchange=name),
+            from_attributes=True,
+        )
+        status_cache.set(name, status, ttl=_seconds_until_change(status, now))
+    max_age = max(0, int(_seconds_until_change(status, now)))
+    response.headers["Cache-Control"] = f"public, max-age={max_age}"
+    return status
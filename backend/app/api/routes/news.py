@@ -0,0 +1,35 @@
+from typing import Any
+
+from fastapi import APIRouter, Query
+
+from app.api.deps import CurrentUser
+from app.api.pagination import decode_cursor, encode_cursor
+from app.models import NewsArticlesPublic
+from app.services.news import news_index
+
+router = APIRouter(prefix="/news", tags=["news"])
+
+MAX_NEWS_PAGE_SIZE = 100
+
+
+@router.get("/", response_model=NewsArticlesPublic)
+async def read_news(
+    current_user: CurrentUser,
+    symbol: str | None = None,
+    category: str | None = None,
+    cursor: str | None = None,
+    limit: int = Query(default=20, ge=1, le=MAX_NEWS_PAGE_SIZE),
+) -> Any:
+    """
+    Retrieve market news, newest first, optionally about a symbol and in a
+    category. Pass the returned next_cursor to get the following page.
+    """
+    before = None
+    if cursor:
+        published, id = decode_cursor(cursor, float, int)
+        before = (published, id)
+    articles, next_key = news_index.page(
+        symbol=symbol, category=category, before=before, limit=limit
+    )
+    next_cursor = encode_cursor(*next_key) if next_key else None
+    return NewsArticlesPublic(data=articles, next_cursor=next_cursor)
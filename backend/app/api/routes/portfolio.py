@@ -0,0 +1,232 @@
+import calendar
+import datetime
+import math
+import uuid
+from collections.abc import Sequence
+from typing import Any, Literal
+
+import numpy as np
+from fastapi import APIRouter
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app import crud
+from app.api.deps import CurrentUser, ReadSessionDep
+from app.models import (
+    PerformancePointPublic,
+    PortfolioPerformancePublic,
+    Position,
+    Transaction,
+)
+from app.models.transaction import TransactionStatus, TransactionType
+from app.services import performance
+from app.services.analytics import snapshot_store
+from app.services.bars import bar_store
+from app.services.market_data import MarketDataError, market_data
+
+router = APIRouter(prefix="/portfolio", tags=["portfolio"])
+
+PERIOD_DAYS = {"1D": 1, "1W": 7, "1M": 30, "3M": 90, "1Y": 365}
+
+
+def _signed_quantity(transaction: Transaction) -> float:
+    if transaction.transaction_type == TransactionType.BUY:
+        return transaction.quantity
+    return -transaction.quantity
+
+
+async def _opening_holdings(
+    session: AsyncSession, user_id: uuid.UUID, transactions: Sequence[Transaction]
+) -> dict[str, tuple[float, float]]:
+    """
+    The quantity of each symbol held before `transactions`, the user's trades
+    since the start of the period, rolled back from the current positions,
+    with a price to value it at when no close was recorded: the average cost,
+    or the first trade's price once the position is closed.
+    """
+    statement = select(Position).where(Position.user_id == user_id)
+    opening = {
+        position.symbol: (
+            position.quantity,
+            position.cost_basis / position.quantity if position.quantity else None,
+        )
+        for position in await session.exec(statement)
+    }
+    for transaction in transactions:
+        quantity, price = opening.get(transaction.symbol, (0.0, None))
+        opening[transaction.symbol] = (
+            quantity - _signed_quantity(transaction),
+            transaction.price_per_unit if price is None else price,
+        )
+    return {
+        symbol: (quantity, price)
+        for symbol, (quantity, price) in opening.items()
+        if quantity and price is not None
+    }
+
+
+async def _price_matrix(
+    transactions: Sequence[Transaction],
+    symbols: list[str],
+    start: datetime.date,
+    today: datetime.date,
+    opening_prices: dict[str, float],
+) -> performance.PriceMatrix:
+    # Later observations of a day win: the opening prices, then the last
+    # close recorded before the period, then the daily average of every
+    # user's trades, then the user's own fills, then the recorded closes,
+    # then today's quote
+    columns = {symbol: index for index, symbol in enumerate(symbols)}
+    day, symbol, price = [], [], []
+    for name, opening_price in opening_prices.items():
+        day.append(0)
+        symbol.append(columns[name])
+        price.append(opening_price)
+    midnight = calendar.timegm(start.timetuple())
+    for name in symbols:
+        bars = bar_store.bars(name)
+        before = np.searchsorted(bars["time"], midnight)
+        if before:
+            day.append(0)
+            symbol.append(columns[name])
+            price.append(float(bars["close"][before - 1]))
+    for row in await snapshot_store.daily_activity_async(symbols, start, today):
+        day.append((row["date"] - start).days)
+        symbol.append(columns[row["symbol"]])
+        price.append(row["average_price"])
+    for transaction in transactions:
+        day.append((transaction.timestamp.date() - start).days)
+        symbol.append(columns[transaction.symbol])
+        price.append(transaction.price_per_unit)
+    days = (today - start).days + 1
+    for name in symbols:
+        closes = bar_store.daily_closes(name, midnight, days)
+        (recorded,) = np.nonzero(~np.isnan(closes))
+        day.extend(recorded.tolist())
+        symbol.extend([columns[name]] * len(recorded))
+        price.extend(closes[recorded].tolist())
+    try:
+        quotes = await market_data.get_quotes_async(symbols)
+    except MarketDataError:
+        # Value today's holdings at the latest known prices instead
+        quotes = {}
+    for quote in quotes.values():
+        if quote.symbol in columns:
+            day.append((today - start).days)
+            symbol.append(columns[quote.symbol])
+            price.append(quote.price)
+    return performance.PriceMatrix.from_observations(
+        start,
+        days,
+        symbols,
+        np.array(day, dtype=int),
+        np.array(symbol, dtype=int),
+        np.array(price, dtype=float),
+    )
+
+
+def _optional(value: float) -> float | None:
+    return None if math.isnan(value) else value
+
+
+@router.get("/performance/", response_model=PortfolioPerformancePublic)
+async def read_performance(
+    session: ReadSessionDep,
+    current_user: CurrentUser,
+    period: Literal["1D", "1W", "1M", "3M", "1Y", "ALL"] = "1M",
+) -> Any:
+    """
+    Get the daily value of the current user's holdings over a period, with
+    its time and money weighted returns, max drawdown and volatility.
+    """
+    today = datetime.date.today()
+    # Only the trades of the period are read: what was held before it is
+    # rolled back from the current positions
+    since = None
+    if period != "ALL":
+        start = today - datetime.timedelta(days=PERIOD_DAYS[period])
+        since = datetime.datetime.combine(start, datetime.time())
+
+    def filters(model: Any) -> list[Any]:
+        clauses = [
+            model.user_id == current_user.id,
+            model.status == TransactionStatus.COMPLETED,
+        ]
+        if since:
+            clauses.append(model.timestamp >= since)
+        return clauses
+
+    watermark = await crud.get_archive_watermark(session=session)
+    rows = crud.select_transaction_rows(
+        filters,
+        include_archive=watermark is not None and (since is None or since < watermark),
+    )
+    statement = select(Transaction).from_statement(rows)
+    transactions = (await session.exec(statement)).scalars().all()
+
+    opening: dict[str, tuple[float, float]] = {}
+    if since is None:
+        start = transactions[0].timestamp.date() if transactions else today
+    else:
+        opening = await _opening_holdings(session, current_user.id, transactions)
+    symbols = sorted({t.symbol for t in transactions} | opening.keys())
+    prices = await _price_matrix(
+        transactions,
+        symbols,
+        start,
+        today,
+        {symbol: price for symbol, (_, price) in opening.items()},
+    )
+
+    # The opening holdings count as bought on the first day, before the
+    # first point of the period
+    columns = {symbol: index for index, symbol in enumerate(symbols)}
+    trades = performance.Trades(
+        user=np.zeros(len(opening) + len(transactions), dtype=int),
+        day=np.array(
+            [0] * len(opening)
+            + [(t.timestamp.date() - start).days for t in transactions],
+            dtype=int,
+        ),
+        symbol=np.array(
+            [columns[symbol] for symbol in opening]
+            + [columns[t.symbol] for t in transactions],
+            dtype=int,
+        ),
+        quantity=np.array(
+            [quantity for quantity, _ in opening.values()]
+            + [_signed_quantity(t) for t in transactions],
+            dtype=float,
+        ),
+        price=np.array(
+            [price for _, price in opening.values()]
+            + [t.price_per_unit for t in transactions],
+            dtype=float,
+        ),
+    )
+    values, bought, sold = performance.daily_values(trades, prices, 1)
+
+    # The first return of the period is the day after its first point
+    days = len(prices.closes)
+    first = 0 if period == "ALL" else days - PERIOD_DAYS[period]
+    returns = performance.daily_returns(values, bought, sold)[:, first:]
+    money_weighted = performance.money_weighted_return(values, bought, sold, first)
+    years = (days - first) / performance.PERIODS_PER_YEAR
+    if years < 1:
+        # Returns for less than a year aren't annualized
+        money_weighted = (1 + money_weighted) ** years - 1
+    dates = prices.dates
+    return PortfolioPerformancePublic(
+        period=period,
+        data=[
+            PerformancePointPublic(
+                date=dates[day], label=f"{dates[day]:%b} {dates[day].day}", value=value
+            )
+            for day, value in enumerate(values[0])
+            if day >= first - 1
+        ],
+        time_weighted_return=performance.time_weighted_return(returns)[0],
+        money_weighted_return=_optional(money_weighted[0]),
+        max_drawdown=performance.max_drawdown(returns)[0],
+        volatility=_optional(performance.volatility(returns)[0]),
+    )
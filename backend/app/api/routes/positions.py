@@ -0,0 +1,49 @@
+import uuid
+from typing import Any
+
+from fastapi import APIRouter, HTTPException
+from sqlmodel import select
+
+from app.api.deps import CurrentUser, ReadSessionDep
+from app.models import Position, PositionPublic, PositionsPublic
+
+router = APIRouter(prefix="/positions", tags=["positions"])
+
+
+def _to_public(position: Position) -> PositionPublic:
+    average_cost = position.cost_basis / position.quantity if position.quantity else 0.0
+    return PositionPublic.model_validate(
+        position, update={"average_cost": average_cost}
+    )
+
+
+@router.get("/", response_model=PositionsPublic)
+async def read_positions(
+    session: ReadSessionDep, current_user: CurrentUser, include_closed: bool = False
+) -> Any:
+    """
+    Retrieve the current user's positions.
+    """
+    statement = select(Position).where(Position.user_id == current_user.id)
+    if not include_closed:
+        statement = statement.where(Position.quantity != 0)
+    positions = (await session.exec(statement.order_by(Position.symbol))).all()
+    return PositionsPublic(
+        data=[_to_public(p) for p in positions], count=len(positions)
+    )
+
+
+@router.get("/{security_id}", response_model=PositionPublic)
+async def read_position(
+    session: ReadSessionDep, current_user: CurrentUser, security_id: uuid.UUID
+) -> Any:
+    """
+    Get the current user's position in a security.
+    """
+    statement = select(Position).where(
+        Position.user_id == current_user.id, Position.security_id == security_id
+    )
+    position = (await session.exec(statement)).first()
+    if not position:
+        raise HTTPException(status_code=404, detail="Position not found")
+    return _to_public(position)
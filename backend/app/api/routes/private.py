@@ -4,11 +4,13 @@ from fastapi import APIRouter
 from pydantic import BaseModel
 
 from app.api.deps import SessionDep
-from app.core.security import get_password_hash
+from app.core.security import get_password_hash_async
+from app.models import Transaction
 from app.models.user import (
     User,
     UserPublic,
 )
+from app.services import matching
 
 router = APIRouter(tags=["private"], prefix="/private")
 
@@ -21,7 +23,7 @@ class PrivateUserCreate(BaseModel):
 
 
 @router.post("/users/", response_model=UserPublic)
-def create_user(user_in: PrivateUserCreate, session: SessionDep) -> Any:
+async def create_user(user_in: PrivateUserCreate, session: SessionDep) -> Any:
     """
     Create a new user.
     """
@@ -29,10 +31,23 @@ def create_user(user_in: PrivateUserCreate, session: SessionDep) -> Any:
     user = User(
         email=user_in.email,
         full_name=user_in.full_name,
-        hashed_password=get_password_hash(user_in.password),
+        hashed_password=await get_password_hash_async(user_in.password),
     )
 
     session.add(user)
-    session.commit()
+    await session.commit()
 
     return user
+
+
+class PrivatePriceTick(BaseModel):
+    symbol: str
+    price: float
+
+
+@router.post("/prices/", response_model=list[Transaction])
+async def push_price(tick: PrivatePriceTick, session: SessionDep) -> Any:
+    """
+    Feed a price tick to the matching engine, returning the orders it settled.
+    """
+    return await matching.process_price(session, tick.symbol, tick.price)
@@ -0,0 +1,145 @@
+import json
+import time
+from datetime import UTC, datetime
+from typing import Any, Literal
+
+import numpy as np
+from fastapi import APIRouter, HTTPException, Query, Response
+
+from app.api.deps import CurrentUser
+from app.models import Quote, SecuritySearchResult
+from app.services.bars import BAR_DTYPE, INTERVAL_SECONDS, bar_store
+from app.services.market_data import (
+    MarketDataError,
+    QuoteNotFoundError,
+    market_data,
+)
+from app.services.search import search_index
+from app.services.securities import security_index
+
+router = APIRouter(prefix="/stocks", tags=["stocks"])
+
+MAX_QUOTES_PER_REQUEST = 100
+MAX_SEARCH_RESULTS = 50
+
+
+@router.get("/search/", response_model=list[SecuritySearchResult])
+async def search_securities(
+    current_user: CurrentUser,
+    q: str = Query(min_length=1, max_length=100),
+    limit: int = Query(default=10, ge=1, le=MAX_SEARCH_RESULTS),
+) -> Any:
+    """
+    Autocomplete securities by symbol or company name, best matches first.
+    Quotes are included when cached, never fetched.
+    """
+    matches = search_index.search(q, limit=limit)
+    quotes = market_data.cache.get_many(match.symbol for match in matches)
+    results = []
+    for match in matches:
+        result = SecuritySearchResult.model_validate(match, from_attributes=True)
+        if quote := quotes.get(match.symbol):
+            result.price = quote.price
+            result.change = quote.change
+            result.change_percent = quote.change_percent
+        results.append(result)
+    return results
+
+
+@router.get("/quote/{symbol}", response_model=Quote)
+async def read_quote(current_user: CurrentUser, symbol: str) -> Any:
+    """
+    Get the latest quote for a symbol.
+    """
+    try:
+        return await market_data.get_quote_async(symbol)
+    except QuoteNotFoundError:
+        raise HTTPException(status_code=404, detail="Symbol not found")
+    except MarketDataError:
+        raise HTTPException(status_code=502, detail="Market data unavailable")
+
+
+@router.get("/quotes", response_model=dict[str, Quote])
+async def read_quotes(
+    current_user: CurrentUser,
+    symbols: str = Query(description="Comma separated symbols, e.g. AAPL,MSFT"),
+) -> Any:
+    """
+    Get the latest quotes for several symbols at once, keyed by symbol.
+    """
+    wanted = [s.strip() for s in symbols.split(",") if s.strip()]
+    if len(wanted) > MAX_QUOTES_PER_REQUEST:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {MAX_QUOTES_PER_REQUEST} symbols per request",
+        )
+    try:
+        return await market_data.get_quotes_async(wanted)
+    except MarketDataError:
+        raise HTTPException(status_code=502, detail="Market data unavailable")
+
+
+# Days of history and default bar interval of each chart period
+HISTORY_PERIODS = {
+    "1D": (1, "1m"),
+    "1W": (7, "5m"),
+    "1M": (30, "1h"),
+    "3M": (90, "1d"),
+    "1Y": (365, "1d"),
+}
+BAR_FORMAT = ",".join(
+    f"{name}:{BAR_DTYPE.fields[name][0].str}" for name in BAR_DTYPE.names
+)
+
+
+def _bars_json(bars: np.ndarray, seconds: int) -> str:
+    if seconds >= INTERVAL_SECONDS["1d"]:
+        dates = [
+            datetime.fromtimestamp(t, UTC).date().isoformat()
+            for t in bars["time"].tolist()
+        ]
+    else:
+        dates = [
+            datetime.fromtimestamp(t, UTC).strftime("%Y-%m-%dT%H:%M:%SZ")
+            for t in bars["time"].tolist()
+        ]
+    fields = BAR_DTYPE.names[1:]
+    columns = [bars[name].tolist() for name in fields]
+    return json.dumps(
+        [
+            {"date": date, **dict(zip(fields, values))}
+            for date, *values in zip(dates, *columns)
+        ],
+        separators=(",", ":"),
+    )
+
+
+@router.get("/{symbol}/history/")
+async def read_history(
+    current_user: CurrentUser,
+    symbol: str,
+    period: Literal["1D", "1W", "1M", "3M", "1Y"] = "1M",
+    interval: Literal["1m", "5m", "1h", "1d"] | None = None,
+    format: Literal["json", "binary"] = "json",
+) -> Response:
+    """
+    Get the OHLCV bars of a symbol over a period, oldest first, as a JSON
+    list or, with format=binary, as the raw little-endian records described
+    by the X-Bar-Format header.
+    """
+    security = security_index.get(symbol)
+    if not security:
+        raise HTTPException(status_code=404, detail="Symbol not found")
+    symbol = security.symbol
+    days, default_interval = HISTORY_PERIODS[period]
+    seconds = INTERVAL_SECONDS[interval or default_interval]
+    end = int(time.time())
+    bars = await bar_store.history_async(symbol, end - days * 86400, end, seconds)
+    if format == "binary":
+        # Served straight from the memory map when not downsampled
+        return Response(
+            content=memoryview(bars.view(np.uint8)),
+            media_type="application/octet-stream",
+            headers={"X-Bar-Format": BAR_FORMAT},
+        )
+    return Response(content=_bars_json(bars, seconds), media_type="application/json")
@@ -0,0 +1,223 @@
+import asyncio
+import json
+import uuid
+from collections.abc import AsyncIterator
+from typing import Any
+
+from fastapi import (
+    APIRouter,
+    HTTPException,
+    Query,
+    WebSocket,
+    WebSocketDisconnect,
+    status,
+)
+from fastapi.responses import StreamingResponse
+
+from app.api.deps import get_current_user
+from app.core.config import settings
+from app.core.db import get_session
+from app.services.securities import security_index
+from app.services.streaming import (
+    QuoteSubscriber,
+    StreamFullError,
+    TooManySymbolsError,
+    quote_stream,
+)
+
+router = APIRouter(prefix="/stream", tags=["stream"])
+
+
+async def _authenticate(token: str) -> uuid.UUID:
+    # Browsers can't set headers on WebSockets or EventSources, so the access
+    # token comes as a query parameter
+    async with get_session() as session:
+        return (await get_current_user(session, token)).id
+
+
+def _split_symbols(symbols: Any) -> tuple[list[str], list[str]]:
+    """
+    The known and unknown symbols of a comma separated string or a list.
+    """
+    if isinstance(symbols, str):
+        symbols = symbols.split(",")
+    if not isinstance(symbols, list):
+        return [], []
+    known, unknown = [], []
+    for symbol in symbols:
+        if not isinstance(symbol, str) or not symbol.strip():
+            continue
+        entry = security_index.get(symbol.strip())
+        if entry:
+            known.append(entry.symbol)
+        else:
+            unknown.append(symbol.strip())
+    return known, unknown
+
+
+def _message(type: str, data: str) -> str:
+    # Quotes are serialized once per tick, not once per subscriber, and only
+    # put together here
+    return '{"type":"' + type + '","data":' + data + "}"
+
+
+class _Connection:
+    def __init__(self, websocket: WebSocket, subscriber: QuoteSubscriber) -> None:
+        self.websocket = websocket
+        self.subscriber = subscriber
+        # Replies to commands and quotes are sent from two tasks
+        self._send_lock = asyncio.Lock()
+
+    async def send(self, message: str) -> None:
+        async with self._send_lock:
+            await asyncio.wait_for(
+                self.websocket.send_text(message),
+                settings.STREAM_SEND_TIMEOUT_SECONDS,
+            )
+
+    async def send_json(self, **message: Any) -> None:
+        await self.send(json.dumps(message))
+
+    async def subscribe(self, symbols: Any) -> None:
+        known, unknown = _split_symbols(symbols)
+        if unknown:
+            await self.send_json(
+                type="error", detail="Unknown symbols", symbols=unknown
+            )
+        try:
+            quote_stream.subscribe(self.subscriber, known)
+        except TooManySymbolsError:
+            await self.send_json(
+                type="error",
+                detail=f"At most {quote_stream.max_symbols} symbols per connection",
+            )
+        await self.send_json(type="subscribed", symbols=sorted(self.subscriber.symbols))
+
+    async def receive_commands(self) -> None:
+        while True:
+            try:
+                command = json.loads(await self.websocket.receive_text())
+            except WebSocketDisconnect:
+                return
+            except ValueError:
+                await self.send_json(type="error", detail="Invalid JSON")
+                continue
+            action = command.get("action") if isinstance(command, dict) else None
+            if action == "subscribe":
+                await self.subscribe(command.get("symbols"))
+            elif action == "unsubscribe":
+                known, _ = _split_symbols(command.get("symbols"))
+                quote_stream.unsubscribe(self.subscriber, known)
+                await self.send_json(
+                    type="subscribed", symbols=sorted(self.subscriber.symbols)
+                )
+            else:
+                await self.send_json(
+                    type="error",
+                    detail='Expected a "subscribe" or "unsubscribe" action',
+                )
+
+    async def send_quotes(self) -> None:
+        while True:
+            events, quotes = await self.subscriber.next_batch()
+            for type, data in events:
+                await self.send(_message(type, data))
+            if quotes:
+                await self.send(_message("quotes", "[" + ",".join(quotes) + "]"))
+
+
+@router.websocket("/quotes")
+async def stream_quotes(
+    websocket: WebSocket, token: str = Query(), symbols: str = Query(default="")
+) -> None:
+    """
+    Push quotes of the subscribed symbols as they change. Send
+    {"action": "subscribe" | "unsubscribe", "symbols": [...]} to change them.
+    """
+    try:
+        user_id = await _authenticate(token)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    try:
+        subscriber = quote_stream.connect(user_id)
+    except StreamFullError:
+        await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+        return
+    connection = _Connection(websocket, subscriber)
+    try:
+        await websocket.accept()
+        if symbols:
+            await connection.subscribe(symbols)
+        tasks = {
+            asyncio.create_task(connection.receive_commands()),
+            asyncio.create_task(connection.send_quotes()),
+        }
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            task.cancel()
+        for task in done:
+            if isinstance(task.exception(), TimeoutError):
+                # Too slow to keep up, even with its quotes coalesced
+                await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+    except (WebSocketDisconnect, TimeoutError):
+        pass
+    finally:
+        quote_stream.disconnect(subscriber)
+
+
+async def _events(user_id: uuid.UUID, symbols: list[str]) -> AsyncIterator[str]:
+    # Connected from within the generator, which is always closed once started
+    try:
+        subscriber = quote_stream.connect(user_id)
+    except StreamFullError:
+        return
+    try:
+        quote_stream.subscribe(subscriber, symbols)
+        while True:
+            try:
+                events, quotes = await asyncio.wait_for(
+                    subscriber.next_batch(), settings.STREAM_KEEPALIVE_SECONDS
+                )
+            except TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            for type, data in events:
+                yield f"event: {type}\ndata: {data}\n\n"
+            if quotes:
+                yield "event: quotes\ndata: [" + ",".join(quotes) + "]\n\n"
+    finally:
+        quote_stream.disconnect(subscriber)
+
+
+@router.get("/quotes/sse")
+async def stream_quotes_sse(
+    token: str = Query(),
+    symbols: str = Query(description="Comma separated symbols, e.g. AAPL,MSFT"),
+) -> StreamingResponse:
+    """
+    Server-sent events fallback of the quotes WebSocket, for a fixed set of
+    symbols.
+    """
+    user_id = await _authenticate(token)
+    known, unknown = _split_symbols(symbols)
+    if unknown:
+        raise HTTPException(
+            status_code=400, detail=f"Unknown symbols: {', '.join(unknown)}"
+        )
+    if len(set(known)) > quote_stream.max_symbols:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {quote_stream.max_symbols} symbols per connection",
+        )
+    if quote_stream.full:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many streaming connections",
+            headers={"Retry-After": "5"},
+        )
+    return StreamingResponse(
+        _events(user_id, known),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
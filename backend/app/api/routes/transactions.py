@@ -1,37 +1,261 @@
+import csv
+import io
+import json
 import uuid
-from typing import Any
+from collections.abc import AsyncIterator, Sequence
+from datetime import datetime
+from typing import Any, Literal
 
-from fastapi import APIRouter, HTTPException
-from sqlmodel import func, select
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Row
+from sqlmodel import col, func, select, tuple_, update
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.api.deps import CurrentUser, SessionDep
-from app.models import Transaction, TransactionCreate
+from app import crud
+from app.api.deps import CurrentUser, ReadSessionDep, SessionDep
+from app.api.pagination import MAX_PAGE_SIZE, decode_cursor, encode_cursor
+from app.core.db import get_session
+from app.models import (
+    SymbolStatsPublic,
+    Transaction,
+    TransactionArchive,
+    TransactionBulkResult,
+    TransactionCreate,
+    TransactionsPublic,
+    TransactionStats,
+    TransactionStatsSummary,
+)
+from app.models.transaction import (
+    TransactionOrderType,
+    TransactionStatus,
+    TransactionType,
+)
+from app.services import matching
+from app.services.securities import (
+    SecurityMismatchError,
+    SecurityNotFoundError,
+    security_index,
+)
 
 router = APIRouter(prefix="/transactions", tags=["transactions"])
 
 
-@router.get("/", response_model=list[Transaction])
-def get_transactions(session: SessionDep, current_user: CurrentUser) -> Any:
+def _security_fields(transaction_in: TransactionCreate) -> dict[str, Any]:
     """
-    Retrieve transactions for the current user.
+    The security of an order, from the in-memory index rather than the database.
     """
-    statement = (
-        select(Transaction)
-        .where(Transaction.user_id == current_user.id)
-        .order_by(Transaction.timestamp)
+    try:
+        security = security_index.resolve(
+            transaction_in.symbol, transaction_in.security_id
+        )
+    except SecurityNotFoundError:
+        raise HTTPException(status_code=400, detail="Unknown symbol")
+    except SecurityMismatchError:
+        raise HTTPException(
+            status_code=400, detail="security_id doesn't match the symbol"
+        )
+    return {"symbol": security.symbol, "security_id": security.id}
+
+
+async def _check_position(session: AsyncSession, transaction: Transaction) -> None:
+    """
+    Refuse a sell the user doesn't hold, whatever its order type.
+    """
+    if transaction.transaction_type != TransactionType.SELL:
+        return
+    position = await crud.get_position(
+        session=session,
+        user_id=transaction.user_id,
+        security_id=transaction.security_id,
+    )
+    if not position or position.quantity < transaction.quantity:
+        raise HTTPException(status_code=400, detail="Insufficient position")
+
+
+async def _apply_to_position(session: AsyncSession, transaction: Transaction) -> None:
+    # Checked again by the update itself, as another fill may have sold the
+    # shares since
+    if transaction.status == TransactionStatus.COMPLETED and not (
+        await crud.apply_transaction_to_position(
+            session=session, transaction=transaction
+        )
+    ):
+        raise HTTPException(status_code=400, detail="Insufficient position")
+
+
+async def _settle_cash(session: AsyncSession, transaction: Transaction) -> None:
+    """
+    Take the cost of a buy order from the wallet, resting orders holding it
+    until they fill or are cancelled, or pay a completed sell into it.
+    """
+    if transaction.status == TransactionStatus.FAILED:
+        return
+    amount = transaction.quantity * transaction.price_per_unit
+    if transaction.transaction_type == TransactionType.BUY:
+        if not await crud.debit_wallet(
+            session=session, user_id=transaction.user_id, amount=amount
+        ):
+            raise HTTPException(status_code=400, detail="Insufficient funds")
+    elif transaction.status == TransactionStatus.COMPLETED:
+        await crud.credit_wallet(
+            session=session, user_id=transaction.user_id, amount=amount
+        )
+
+
+def _naive_local(value: datetime | None) -> datetime | None:
+    # Timestamps are stored as naive local times
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone().replace(tzinfo=None)
+
+
+@router.get("/", response_model=TransactionsPublic)
+async def get_transactions(
+    session: ReadSessionDep,
+    current_user: CurrentUser,
+    cursor: str | None = None,
+    limit: int = Query(default=100, ge=1, le=MAX_PAGE_SIZE),
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> Any:
+    """
+    Retrieve transactions for the current user, oldest first, optionally
+    from `since` and before `until`.
+    Pass the returned next_cursor to get the following page.
+    """
+    since, until = _naive_local(since), _naive_local(until)
+    after = None
+    if cursor:
+        after = decode_cursor(cursor, datetime.fromisoformat, uuid.UUID)
+
+    def range_filters(model: Any) -> list[Any]:
+        clauses = [model.user_id == current_user.id]
+        if since:
+            clauses.append(model.timestamp >= since)
+        if until:
+            clauses.append(model.timestamp < until)
+        return clauses
+
+    def filters(model: Any) -> list[Any]:
+        clauses = range_filters(model)
+        if after:
+            clauses.append(tuple_(model.timestamp, model.id) > tuple_(*after))
+        return clauses
+
+    # The archive only holds months before the watermark, so recent ranges
+    # are served by the transaction table alone
+    watermark = await crud.get_archive_watermark(session=session)
+    start = max(since or datetime.min, after[0] if after else datetime.min)
+    rows = crud.select_transaction_rows(
+        filters, include_archive=watermark is not None and start < watermark
+    )
+    statement = select(Transaction).from_statement(rows.limit(limit))
+    transactions = (await session.exec(statement)).scalars().all()
+
+    # The stats rollup counts every transaction of the user, a range is
+    # counted from its rows
+    if since or until:
+        count = await crud.count_transactions(
+            session=session,
+            filters=range_filters,
+            include_archive=watermark is not None
+            and (since or datetime.min) < watermark,
+        )
+    else:
+        count_statement = select(func.sum(TransactionStats.total_count)).where(
+            TransactionStats.user_id == current_user.id
+        )
+        count = (await session.exec(count_statement)).one() or 0
+    next_cursor = None
+    if len(transactions) == limit:
+        last = transactions[-1]
+        next_cursor = encode_cursor(last.timestamp.isoformat(), last.id)
+    return TransactionsPublic(data=transactions, count=count, next_cursor=next_cursor)
+
+
+EXPORT_BATCH_SIZE = 1000
+EXPORT_COLUMNS = crud.TRANSACTION_COLUMNS
+
+
+def _export_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+async def _export_rows(user_id: uuid.UUID) -> AsyncIterator[Sequence[Row[Any]]]:
+    # The request's session is released once the handler returns, so the
+    # stream reads through a session of its own
+    async with get_session(replica=True) as session:
+        watermark = await crud.get_archive_watermark(session=session)
+        statement = crud.select_transaction_rows(
+            lambda model: [model.user_id == user_id],
+            include_archive=watermark is not None,
+        )
+        result = await session.stream(
+            statement.execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+        async for rows in result.partitions():
+            yield rows
+
+
+async def _export_ndjson(user_id: uuid.UUID) -> AsyncIterator[str]:
+    async for rows in _export_rows(user_id):
+        yield "".join(
+            json.dumps(
+                {c: _export_value(v) for c, v in zip(EXPORT_COLUMNS, row)},
+                separators=(",", ":"),
+            )
+            + "\n"
+            for row in rows
+        )
+
+
+async def _export_csv(user_id: uuid.UUID) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    async for rows in _export_rows(user_id):
+        writer.writerows([_export_value(v) for v in row] for row in rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+@router.get("/export")
+async def export_transactions(
+    current_user: CurrentUser, format: Literal["ndjson", "csv"] = "ndjson"
+) -> StreamingResponse:
+    """
+    Stream the current user's full transaction history, oldest first.
+    """
+    if format == "csv":
+        content, media_type = _export_csv(current_user.id), "text/csv"
+    else:
+        content, media_type = _export_ndjson(current_user.id), "application/x-ndjson"
+    return StreamingResponse(
+        content,
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="transactions.{format}"'
+        },
     )
-    transactions = session.exec(statement).all()
-    return transactions
 
 
 @router.get("/{id}", response_model=Transaction)
-def get_transaction(
-    session: SessionDep, current_user: CurrentUser, id: uuid.UUID
+async def get_transaction(
+    session: ReadSessionDep, current_user: CurrentUser, id: uuid.UUID
 ) -> Any:
     """
     Get transaction by ID.
     """
-    transaction = session.get(Transaction, id)
+    transaction = await session.get(Transaction, id) or await session.get(
+        TransactionArchive, id
+    )
     if not transaction:
         raise HTTPException(status_code=404, detail="Transaction not found")
     if transaction.user_id != current_user.id:
@@ -40,112 +264,284 @@ def get_transaction(
 
 
 @router.post("/", response_model=Transaction)
-def create_transaction(
+async def create_transaction(
     *, session: SessionDep, current_user: CurrentUser, transaction_in: TransactionCreate
 ) -> Any:
     """
     Create a new transaction for the current user.
     """
     db_transaction = Transaction.model_validate(
-        transaction_in, update={"user_id": current_user.id}
+        transaction_in,
+        update={"user_id": current_user.id, **_security_fields(transaction_in)},
     )
+    if db_transaction.status != TransactionStatus.FAILED:
+        await _check_position(session, db_transaction)
+    if db_transaction.status == TransactionStatus.COMPLETED:
+        db_transaction.filled_at = db_transaction.timestamp
     session.add(db_transaction)
-    session.commit()
-    session.refresh(db_transaction)
+    await crud.record_transaction_stats(session=session, transaction=db_transaction)
+    await _apply_to_position(session, db_transaction)
+    await _settle_cash(session, db_transaction)
+    await session.commit()
+    await session.refresh(db_transaction)
+    if matching.is_resting_order(db_transaction):
+        matching.submit_order(db_transaction)
     return db_transaction
 
 
+BULK_CHUNK_SIZE = 1000
+
+
+async def _read_ndjson_chunks(request: Request) -> AsyncIterator[list[Any]]:
+    chunk: list[Any] = []
+    buffer = b""
+    async for data in request.stream():
+        buffer += data
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                chunk.append(json.loads(line))
+            except ValueError as e:
+                chunk.append(ValueError(f"Invalid JSON: {e}"))
+            if len(chunk) == BULK_CHUNK_SIZE:
+                yield chunk
+                chunk = []
+    if buffer.strip():
+        try:
+            chunk.append(json.loads(buffer))
+        except ValueError as e:
+            chunk.append(ValueError(f"Invalid JSON: {e}"))
+    if chunk:
+        yield chunk
+
+
+@router.post("/bulk", response_model=TransactionBulkResult)
+async def bulk_create_transactions(
+    request: Request, session: SessionDep, current_user: CurrentUser
+) -> Any:
+    """
+    Create many transactions for the current user in one database transaction.
+    Accepts a JSON list, or an NDJSON stream (Content-Type:
+    application/x-ndjson). Invalid rows are reported by index and skipped.
+    """
+    loader = crud.TransactionBulkLoader(session=session, user_id=current_user.id)
+    if request.headers.get("content-type", "").startswith("application/x-ndjson"):
+        async for chunk in _read_ndjson_chunks(request):
+            await loader.add_chunk(chunk)
+    else:
+        try:
+            rows = await request.json()
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid JSON body")
+        if not isinstance(rows, list):
+            raise HTTPException(status_code=400, detail="Expected a list of rows")
+        for start in range(0, len(rows), BULK_CHUNK_SIZE):
+            chunk = rows[start : start + BULK_CHUNK_SIZE]
+            await loader.add_chunk(chunk)
+    await loader.commit()
+    for transaction in loader.resting_orders:
+        matching.submit_order(transaction)
+    return TransactionBulkResult(inserted=loader.inserted, errors=loader.errors)
+
+
+@router.get("/stats/summary", response_model=TransactionStatsSummary)
+async def get_transaction_stats_summary(
+    session: ReadSessionDep, current_user: CurrentUser
+) -> Any:
+    """
+    Get every transaction statistic for the current user in one call.
+    """
+    statement = (
+        select(TransactionStats)
+        .where(TransactionStats.user_id == current_user.id)
+        .order_by(TransactionStats.symbol)
+    )
+    rows = (await session.exec(statement)).all()
+    symbols = [
+        SymbolStatsPublic(
+            symbol=row.symbol,
+            total_count=row.total_count,
+            total_volume=row.total_volume,
+            average_price=row.price_sum / row.total_count if row.total_count else 0.0,
+        )
+        for row in rows
+    ]
+    return TransactionStatsSummary(
+        total_count=sum(row.total_count for row in rows),
+        total_volume=sum(row.total_volume for row in rows),
+        symbols=symbols,
+    )
+
+
 @router.get("/stats/total-volume", response_model=float)
-def get_total_transaction_volume(session: SessionDep, current_user: CurrentUser) -> Any:
+async def get_total_transaction_volume(
+    session: ReadSessionDep, current_user: CurrentUser
+) -> Any:
     """
     Get total transaction volume for the current user.
     """
-    statement = select(
-        func.sum(Transaction.quantity * Transaction.price_per_unit)
-    ).where(Transaction.user_id == current_user.id)
-    total_volume = session.exec(statement).one()
+    statement = select(func.sum(TransactionStats.total_volume)).where(
+        TransactionStats.user_id == current_user.id
+    )
+    total_volume = (await session.exec(statement)).one()
     return total_volume or 0.0
 
 
 @router.get("/stats/total-count", response_model=int)
-def get_total_transaction_count(session: SessionDep, current_user: CurrentUser) -> Any:
+async def get_total_transaction_count(
+    session: ReadSessionDep, current_user: CurrentUser
+) -> Any:
     """
     Get total transaction count for the current user.
     """
-    statement = select(func.count()).where(Transaction.user_id == current_user.id)
-    total_count = session.exec(statement).one()
+    statement = select(func.sum(TransactionStats.total_count)).where(
+        TransactionStats.user_id == current_user.id
+    )
+    total_count = (await session.exec(statement)).one()
     return total_count or 0
 
 
 @router.post("/buy", response_model=Transaction)
-def buy_transaction(
+async def buy_transaction(
     *, session: SessionDep, current_user: CurrentUser, transaction_in: TransactionCreate
 ) -> Any:
     """
     Create a buy transaction for the current user.
     """
     db_transaction = Transaction.model_validate(
-        transaction_in, update={"user_id": current_user.id, "type": "buy"}
+        transaction_in,
+        update={
+            "user_id": current_user.id,
+            "transaction_type": TransactionType.BUY,
+            **_security_fields(transaction_in),
+        },
     )
+    # Market orders fill immediately at the submitted price, the others rest
+    # in the matching engine until a price triggers them
+    if db_transaction.order_type == TransactionOrderType.MARKET:
+        db_transaction.status = TransactionStatus.COMPLETED
+        db_transaction.filled_at = db_transaction.timestamp
+    else:
+        db_transaction.status = TransactionStatus.PENDING
     session.add(db_transaction)
-    session.commit()
-    session.refresh(db_transaction)
+    await crud.record_transaction_stats(session=session, transaction=db_transaction)
+    await _apply_to_position(session, db_transaction)
+    await _settle_cash(session, db_transaction)
+    await session.commit()
+    await session.refresh(db_transaction)
+    if matching.is_resting_order(db_transaction):
+        matching.submit_order(db_transaction)
     return db_transaction
 
 
 @router.post("/sell", response_model=Transaction)
-def sell_transaction(
+async def sell_transaction(
     *, session: SessionDep, current_user: CurrentUser, transaction_in: TransactionCreate
 ) -> Any:
     """
     Create a sell transaction for the current user.
     """
     db_transaction = Transaction.model_validate(
-        transaction_in, update={"user_id": current_user.id, "type": "sell"}
+        transaction_in,
+        update={
+            "user_id": current_user.id,
+            "transaction_type": TransactionType.SELL,
+            **_security_fields(transaction_in),
+        },
     )
+    await _check_position(session, db_transaction)
+    # Market orders fill immediately at the submitted price, the others rest
+    # in the matching engine until a price triggers them
+    if db_transaction.order_type == TransactionOrderType.MARKET:
+        db_transaction.status = TransactionStatus.COMPLETED
+        db_transaction.filled_at = db_transaction.timestamp
+    else:
+        db_transaction.status = TransactionStatus.PENDING
     session.add(db_transaction)
-    session.commit()
-    session.refresh(db_transaction)
+    await crud.record_transaction_stats(session=session, transaction=db_transaction)
+    await _apply_to_position(session, db_transaction)
+    await _settle_cash(session, db_transaction)
+    await session.commit()
+    await session.refresh(db_transaction)
+    if matching.is_resting_order(db_transaction):
+        matching.submit_order(db_transaction)
     return db_transaction
 
 
+@router.post("/{id}/cancel", response_model=Transaction)
+async def cancel_transaction(
+    session: SessionDep, current_user: CurrentUser, id: uuid.UUID
+) -> Any:
+    """
+    Cancel a pending order of the current user.
+    """
+    transaction = await session.get(Transaction, id)
+    if not transaction:
+        raise HTTPException(status_code=404, detail="Transaction not found")
+    if transaction.user_id != current_user.id:
+        raise HTTPException(status_code=400, detail="Not enough permissions")
+    if transaction.status != TransactionStatus.PENDING:
+        raise HTTPException(
+            status_code=400, detail="Only pending orders can be cancelled"
+        )
+    # Only one of a cancel and a fill may settle the order
+    claimed = await session.exec(
+        update(Transaction)  # type: ignore
+        .where(
+            col(Transaction.id) == transaction.id,
+            col(Transaction.status) == TransactionStatus.PENDING,
+        )
+        .values(status=TransactionStatus.FAILED)
+    )
+    if not claimed.rowcount:
+        raise HTTPException(
+            status_code=400, detail="Only pending orders can be cancelled"
+        )
+    if transaction.transaction_type == TransactionType.BUY:
+        # Give back the cost the order held
+        await crud.credit_wallet(
+            session=session,
+            user_id=current_user.id,
+            amount=transaction.quantity * transaction.price_per_unit,
+        )
+    matching.matching_engine.cancel(transaction.id)
+    await session.commit()
+    await session.refresh(transaction)
+    return transaction
+
+
 @router.get("/stats/average-price/{symbol}", response_model=float)
-def get_average_price_for_symbol(
-    session: SessionDep, current_user: CurrentUser, symbol: str
+async def get_average_price_for_symbol(
+    session: ReadSessionDep, current_user: CurrentUser, symbol: str
 ) -> Any:
     """
     Get average price per unit for a given symbol for the current user.
     """
-    statement = select(func.avg(Transaction.price_per_unit)).where(
-        (Transaction.user_id == current_user.id) & (Transaction.symbol == symbol)
-    )
-    average_price = session.exec(statement).one()
-    return average_price or 0.0
+    stats = await session.get(TransactionStats, (current_user.id, symbol))
+    if not stats or not stats.total_count:
+        return 0.0
+    return stats.price_sum / stats.total_count
 
 
 @router.get("/stats/total-volume/{symbol}", response_model=float)
-def get_total_volume_for_symbol(
-    session: SessionDep, current_user: CurrentUser, symbol: str
+async def get_total_volume_for_symbol(
+    session: ReadSessionDep, current_user: CurrentUser, symbol: str
 ) -> Any:
     """
     Get total transaction volume for a given symbol for the current user.
     """
-    statement = select(
-        func.sum(Transaction.quantity * Transaction.price_per_unit)
-    ).where((Transaction.user_id == current_user.id) & (Transaction.symbol == symbol))
-    total_volume = session.exec(statement).one()
-    return total_volume or 0.0
+    stats = await session.get(TransactionStats, (current_user.id, symbol))
+    return stats.total_volume if stats else 0.0
 
 
 @router.get("/stats/total-count/{symbol}", response_model=int)
-def get_total_count_for_symbol(
-    session: SessionDep, current_user: CurrentUser, symbol: str
+async def get_total_count_for_symbol(
+    session: ReadSessionDep, current_user: CurrentUser, symbol: str
 ) -> Any:
     """
     Get total transaction count for a given symbol for the current user.
     """
-    statement = select(func.count()).where(
-        (Transaction.user_id == current_user.id) & (Transaction.symbol == symbol)
-    )
-    total_count = session.exec(statement).one()
-    return total_count or 0
+    stats = await session.get(TransactionStats, (current_user.id, symbol))
+    return stats.total_count if stats else 0
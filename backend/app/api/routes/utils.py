@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends
 from pydantic.networks import EmailStr
 
 from app.api.deps import get_current_active_superuser
+from app.core.security import password_hasher
 from app.models import Message
 from app.utils import generate_test_email, send_email
 
@@ -29,3 +30,14 @@ def test_email(email_to: EmailStr) -> Message:
 @router.get("/health-check/")
 async def health_check() -> bool:
     return True
+
+
+@router.get(
+    "/password-hasher-stats/",
+    dependencies=[Depends(get_current_active_superuser)],
+)
+def password_hasher_stats() -> dict[str, int]:
+    """
+    Queue depth and throughput of the password hashing pool.
+    """
+    return password_hasher.stats()
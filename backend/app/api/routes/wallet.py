@@ -0,0 +1,41 @@
+from typing import Any
+
+from fastapi import APIRouter, HTTPException
+
+from app import crud
+from app.api.deps import CurrentUser, ReadSessionDep, SessionDep
+from app.core.config import settings
+from app.models import Deposit, DepositCreate, Wallet, WalletPublic
+
+router = APIRouter(prefix="/wallet", tags=["wallet"])
+
+
+@router.get("/", response_model=WalletPublic)
+async def read_wallet(session: ReadSessionDep, current_user: CurrentUser) -> Any:
+    """
+    Get the current user's cash balance, pending buy orders already deducted.
+    """
+    wallet = await session.get(Wallet, current_user.id)
+    if not wallet:
+        return WalletPublic(balance=0.0, currency="USD")
+    return wallet
+
+
+@router.post("/deposit", response_model=WalletPublic)
+async def deposit(
+    *, session: SessionDep, current_user: CurrentUser, deposit_in: DepositCreate
+) -> Any:
+    """
+    Add cash to the current user's wallet.
+    """
+    if deposit_in.amount > settings.WALLET_MAX_DEPOSIT:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Maximum deposit is {settings.WALLET_MAX_DEPOSIT:,.0f}",
+        )
+    session.add(Deposit(user_id=current_user.id, amount=deposit_in.amount))
+    await crud.credit_wallet(
+        session=session, user_id=current_user.id, amount=deposit_in.amount
+    )
+    await session.commit()
+    return await session.get(Wallet, current_user.id, populate_existing=True)
@@ -0,0 +1,167 @@
+import datetime
+from typing import Annotated, Any
+
+from fastapi import APIRouter, Header, HTTPException, Response
+from sqlmodel import col, select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app import crud
+from app.api.deps import CurrentUser, ReadSessionDep, SessionDep
+from app.models import (
+    Message,
+    Quote,
+    Watchlist,
+    WatchlistItem,
+    WatchlistItemCreate,
+    WatchlistItemPublic,
+    WatchlistPublic,
+)
+from app.models.security import Security
+from app.services.market_data import MarketDataError, market_data
+from app.services.securities import security_index
+
+router = APIRouter(prefix="/watchlist", tags=["watchlist"])
+
+
+def _etag(version: int) -> str:
+    return f'"{version}"'
+
+
+def _matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag in tags or "*" in tags
+
+
+def _to_public(
+    item: WatchlistItem, name: str, quote: Quote | None
+) -> WatchlistItemPublic:
+    prices = (
+        {
+            "price": quote.price,
+            "change": quote.change,
+            "change_percent": quote.change_percent,
+        }
+        if quote
+        else {}
+    )
+    return WatchlistItemPublic.model_validate(item, update={"name": name, **prices})
+
+
+async def _bump_version(session: AsyncSession, watchlist: Watchlist) -> int:
+    # Incremented in the database, concurrent changes never share a version
+    result = await session.exec(
+        update(Watchlist)  # type: ignore
+        .where(col(Watchlist.id) == watchlist.id)
+        .values(
+            version=col(Watchlist.version) + 1,
+            updated_at=datetime.datetime.now(),
+        )
+        .returning(Watchlist.version)
+    )
+    return result.scalar_one()
+
+
+@router.get("/", response_model=WatchlistPublic)
+async def read_watchlist(
+    session: ReadSessionDep,
+    current_user: CurrentUser,
+    response: Response,
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> Any:
+    """
+    Retrieve the current user's watchlist with the latest quotes.
+
+    The ETag is the watchlist's version: with a matching If-None-Match, the
+    response is an empty 304 while the list is unchanged. Prices aren't part
+    of the version, the quote stream keeps them up to date.
+    """
+    watchlist = (
+        await session.exec(
+            select(Watchlist).where(Watchlist.user_id == current_user.id)
+        )
+    ).first()
+    version = watchlist.version if watchlist else 0
+    etag = _etag(version)
+    if _matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    rows: list[tuple[WatchlistItem, str]] = []
+    if watchlist:
+        # Every item resolved against its security in one query
+        statement = (
+            select(WatchlistItem, Security.name)
+            .join(Security, col(WatchlistItem.security_id) == Security.id)
+            .where(WatchlistItem.watchlist_id == watchlist.id)
+            .order_by(col(WatchlistItem.added_at))
+        )
+        rows = list((await session.exec(statement)).all())
+    try:
+        # One cache multi-get, the misses fetched in parallel
+        quotes = await market_data.get_quotes_async(item.symbol for item, _ in rows)
+    except MarketDataError:
+        # Serve the list with the cached prices only
+        quotes = market_data.cache.get_many(item.symbol for item, _ in rows)
+    return WatchlistPublic(
+        data=[_to_public(item, name, quotes.get(item.symbol)) for item, name in rows],
+        count=len(rows),
+        version=version,
+    )
+
+
+@router.post("/", response_model=WatchlistItemPublic)
+async def add_to_watchlist(
+    *,
+    session: SessionDep,
+    current_user: CurrentUser,
+    response: Response,
+    item_in: WatchlistItemCreate,
+) -> Any:
+    """
+    Add a stock to the current user's watchlist.
+    """
+    security = security_index.get(item_in.symbol)
+    if not security:
+        raise HTTPException(status_code=400, detail="Unknown symbol")
+    watchlist = await crud.get_or_create_watchlist(
+        session=session, user_id=current_user.id
+    )
+    item = WatchlistItem(
+        watchlist_id=watchlist.id, security_id=security.id, symbol=security.symbol
+    )
+    # A conditional insert, concurrent adds of a stock can't both pass a check
+    if not await crud.add_watchlist_item(session=session, item=item):
+        raise HTTPException(
+            status_code=400, detail="Stock is already in your watchlist"
+        )
+    version = await _bump_version(session, watchlist)
+    await session.commit()
+    response.headers["ETag"] = _etag(version)
+    return _to_public(item, security.name, market_data.cache.get(security.symbol))
+
+
+@router.delete("/{symbol}")
+async def remove_from_watchlist(
+    session: SessionDep, current_user: CurrentUser, response: Response, symbol: str
+) -> Message:
+    """
+    Remove a stock from the current user's watchlist.
+    """
+    statement = (
+        select(WatchlistItem, Watchlist)
+        .join(Watchlist, col(WatchlistItem.watchlist_id) == Watchlist.id)
+        .where(
+            Watchlist.user_id == current_user.id,
+            WatchlistItem.symbol == symbol.upper(),
+        )
+    )
+    row = (await session.exec(statement)).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Stock is not in your watchlist")
+    item, watchlist = row
+    await session.delete(item)
+    version = await _bump_version(session, watchlist)
+    await session.commit()
+    response.headers["ETag"] = _etag(version)
+    return Message(message="Stock removed from the watchlist")
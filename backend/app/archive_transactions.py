@@ -0,0 +1,115 @@
+import argparse
+import datetime
+import logging
+
+from sqlmodel import Session, col, delete, func, insert, select
+
+from app import crud
+from app.core.config import settings
+from app.core.db import engine
+from app.models import Transaction, TransactionArchive, TransactionArchiveMonth
+from app.models.transaction import TransactionStatus
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def archivable_months(session: Session, before: datetime.date) -> list[datetime.date]:
+    """
+    The months from the oldest settled transaction left in the transaction
+    table up to `before`, as their first day.
+    """
+    statement = select(func.min(Transaction.timestamp)).where(
+        Transaction.timestamp < datetime.datetime(before.year, before.month, 1),
+        Transaction.status != TransactionStatus.PENDING,
+    )
+    oldest = session.exec(statement).one()
+    months = []
+    if oldest:
+        month = oldest.date().replace(day=1)
+        while month < before:
+            months.append(month)
+            month = crud.month_after(month).date()
+    return months
+
+
+def archive_month(session: Session, month: datetime.date) -> int:
+    """
+    Move the settled transactions of a month to the archive, in one commit.
+    Pending orders stay behind, they're archived once the matcher settles them.
+    """
+    start = datetime.datetime(month.year, month.month, 1)
+    end = crud.month_after(month)
+
+    def settled(model: type[Transaction] | type[TransactionArchive]) -> list[object]:
+        return [
+            model.timestamp >= start,
+            model.timestamp < end,
+            model.status != TransactionStatus.PENDING,
+        ]
+
+    rows = select(*(Transaction.__table__.c[c] for c in crud.TRANSACTION_COLUMNS))
+    moved = session.exec(
+        insert(TransactionArchive).from_select(  # type: ignore
+            crud.TRANSACTION_COLUMNS, rows.where(*settled(Transaction))
+        )
+    ).rowcount
+    # Only delete what was copied, in case rows were added in between
+    archived_ids = select(TransactionArchive.id).where(*settled(TransactionArchive))
+    session.exec(
+        delete(Transaction).where(  # type: ignore
+            *settled(Transaction), col(Transaction.id).in_(archived_ids)
+        )
+    )
+    entry = session.get(TransactionArchiveMonth, month) or TransactionArchiveMonth(
+        month=month
+    )
+    entry.row_count += moved
+    entry.archived_at = datetime.datetime.now()
+    session.add(entry)
+    session.commit()
+    return moved
+
+
+def compact(session: Session) -> None:
+    """
+    Give the space freed in the transaction table back to the file system.
+    """
+    if session.get_bind().dialect.name == "sqlite":
+        session.connection().exec_driver_sql("VACUUM")
+    else:
+        session.connection().exec_driver_sql('VACUUM ANALYZE "transaction"')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Move the settled transactions of past months to the archive"
+    )
+    parser.add_argument(
+        "--after-days",
+        type=int,
+        default=settings.TRANSACTION_ARCHIVE_AFTER_DAYS,
+        help="archive the months that ended at least this many days ago",
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="vacuum the transaction table once the months are archived",
+    )
+    args = parser.parse_args()
+    cutoff = datetime.date.today() - datetime.timedelta(days=args.after_days)
+    # Only whole months are archived
+    before = cutoff.replace(day=1)
+    with Session(engine) as session:
+        for month in archivable_months(session, before):
+            moved = archive_month(session, month)
+            logger.info("Archived %d transactions of %s", moved, month.isoformat())
+    if args.compact:
+        # VACUUM can't run inside a transaction
+        with Session(engine.execution_options(isolation_level="AUTOCOMMIT")) as session:
+            compact(session)
+        logger.info("Compacted the transaction table")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+import argparse
+import datetime
+import logging
+import time
+import zlib
+
+import numpy as np
+from sqlmodel import Session, select
+
+from app.core.db import engine
+from app.models.security import Security
+from app.services.bars import BAR_DTYPE, bar_store
+from app.services.market_data import FakeQuoteProvider
+from app.services.trading_calendar import ExchangeCalendar, trading_calendars
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def session_minutes(calendar: ExchangeCalendar, start: int, end: int) -> np.ndarray:
+    """
+    The start of every minute from `start` to before `end` during the
+    exchange's sessions.
+    """
+    sessions = calendar.sessions_between(
+        datetime.datetime.fromtimestamp(start, datetime.UTC),
+        datetime.datetime.fromtimestamp(end, datetime.UTC),
+    )
+    minutes = [
+        np.arange(
+            max(start, int(session.open.timestamp())),
+            min(end, int(session.close.timestamp())),
+            60,
+        )
+        for session in sessions
+    ]
+    return np.concatenate(minutes) if minutes else np.empty(0, dtype=np.int64)
+
+
+def simulate_bars(symbol: str, minutes: np.ndarray, last_price: float) -> np.ndarray:
+    """
+    Random walk 1 minute bars at `minutes`, closing at `last_price`, the same
+    for every run.
+    """
+    rng = np.random.default_rng(zlib.crc32(symbol.encode()))
+    returns = rng.normal(0, 0.0008, len(minutes))
+    closes = last_price * np.exp(np.cumsum(returns) - returns.sum())
+    opens = np.concatenate([[closes[0] / np.exp(returns[0])], closes[:-1]])
+    wicks = np.abs(rng.normal(0, 0.0004, (2, len(minutes))))
+    bars = np.empty(len(minutes), dtype=BAR_DTYPE)
+    bars["time"] = minutes
+    bars["open"] = opens
+    bars["high"] = np.maximum(opens, closes) * (1 + wicks[0])
+    bars["low"] = np.minimum(opens, closes) * (1 - wicks[1])
+    bars["close"] = closes
+    bars["volume"] = rng.integers(0, 5000, len(minutes))
+    return bars
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Fill the bar store with simulated history, ending where "
+        "the fake quote feed starts, for the symbols without bars yet"
+    )
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument(
+        "--symbols", help="comma separated symbols, every security by default"
+    )
+    args = parser.parse_args()
+    with Session(engine) as session:
+        markets = {
+            symbol: (market, security_type)
+            for symbol, market, security_type in session.exec(
+                select(Security.symbol, Security.market, Security.security_type)
+            )
+        }
+    if args.symbols:
+        symbols = [s.strip().upper() for s in args.symbols.split(",") if s.strip()]
+    else:
+        symbols = list(markets)
+    # Up to the current minute, which the quote recorder fills in
+    end = int(time.time()) // 60 * 60
+    start = end - args.days * 24 * 60 * 60
+    provider = FakeQuoteProvider()
+    for symbol in symbols:
+        if len(bar_store.bars(symbol)):
+            logger.info("Skipping %s, it already has bars", symbol)
+            continue
+        # Only the minutes the symbol's exchange was open, the default
+        # exchange's for markets without a calendar
+        market, security_type = markets.get(symbol, (None, None))
+        calendar = trading_calendars.find(market, security_type)
+        minutes = session_minutes(calendar or trading_calendars.get(None), start, end)
+        if not len(minutes):
+            logger.info("Skipping %s, its exchange had no session", symbol)
+            continue
+        bars = simulate_bars(symbol, minutes, provider.fetch_quote(symbol).price)
+        bar_store.append(symbol, bars)
+        logger.info("Added %d bars to %s", len(bars), symbol)
+
+
+if __name__ == "__main__":
+    main()
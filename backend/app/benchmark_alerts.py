@@ -0,0 +1,77 @@
+import argparse
+import logging
+import random
+import time
+import uuid
+
+from app.models.alert import AlertDirection
+from app.services.alerts import ActiveAlert, AlertEngine
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Time the price alert engine on random alerts, in process"
+    )
+    parser.add_argument("--alerts", type=int, default=2_000_000)
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--ticks", type=int, default=100_000)
+    parser.add_argument(
+        "--volatility",
+        type=float,
+        default=0.001,
+        help="standard deviation of the relative price move per tick",
+    )
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    symbols = [f"S{index}" for index in range(args.symbols)]
+    users = [uuid.uuid4() for _ in range(max(1, args.alerts // 20))]
+    alerts = []
+    for _ in range(args.alerts):
+        # Targets within 25% of the starting price, on either side
+        distance = rng.random() / 4
+        up = rng.random() < 0.5
+        alerts.append(
+            ActiveAlert(
+                id=uuid.uuid4(),
+                user_id=rng.choice(users),
+                symbol=rng.choice(symbols),
+                direction=AlertDirection.ABOVE if up else AlertDirection.BELOW,
+                target_price=100.0 * (1 + distance if up else 1 - distance),
+            )
+        )
+    engine = AlertEngine()
+    started = time.perf_counter()
+    engine.load(alerts)
+    logger.info(
+        "Loaded %d alerts on %d symbols in %.2fs",
+        len(engine),
+        args.symbols,
+        time.perf_counter() - started,
+    )
+
+    prices = dict.fromkeys(symbols, 100.0)
+    fired = 0
+    timings = []
+    for _ in range(args.ticks):
+        symbol = rng.choice(symbols)
+        prices[symbol] *= 1 + rng.gauss(0, args.volatility)
+        started = time.perf_counter()
+        fired += len(engine.on_price(symbol, prices[symbol]))
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+    logger.info(
+        "%d ticks, %d alerts fired: median %.1fus, p99 %.1fus, max %.1fus per tick",
+        args.ticks,
+        fired,
+        1e6 * timings[len(timings) // 2],
+        1e6 * timings[int(len(timings) * 0.99)],
+        1e6 * timings[-1],
+    )
+
+
+if __name__ == "__main__":
+    main()
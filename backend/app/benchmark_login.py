@@ -0,0 +1,123 @@
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+from dataclasses import dataclass, field
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.security import (
+    PasswordHasher,
+    PasswordHasherBusyError,
+    get_password_hash,
+    verify_password,
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PASSWORD = "benchmark-password"
+
+
+@dataclass
+class Results:
+    accepted: int = 0
+    rejected: int = 0
+    logins: list[float] = field(default_factory=list)
+    probes: list[float] = field(default_factory=list)
+
+
+async def login(
+    hasher: PasswordHasher | None, hashed_password: str, results: Results
+) -> None:
+    started = time.perf_counter()
+    try:
+        if hasher is None:
+            # What the pool replaces: bcrypt on the threads every route shares
+            await run_in_threadpool(verify_password, PASSWORD, hashed_password)
+        else:
+            await hasher.run(verify_password, PASSWORD, hashed_password)
+    except PasswordHasherBusyError:
+        # Answered with a 429 by the API
+        results.rejected += 1
+        return
+    results.accepted += 1
+    results.logins.append(time.perf_counter() - started)
+
+
+async def probe(results: Results, interval: float) -> None:
+    # Stands in for the other requests, whose sync work runs on the threadpool
+    while True:
+        started = time.perf_counter()
+        await run_in_threadpool(int)
+        results.probes.append(time.perf_counter() - started)
+        await asyncio.sleep(interval)
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100)[round(fraction * 100) - 1]
+
+
+async def run(mode: str, args: argparse.Namespace, hashed_password: str) -> None:
+    hasher = (
+        PasswordHasher(max_workers=args.workers, max_queue=args.queue)
+        if mode == "bounded"
+        else None
+    )
+    results = Results()
+    prober = asyncio.create_task(probe(results, args.probe_interval))
+    started = time.perf_counter()
+    for _ in range(args.bursts):
+        await asyncio.gather(
+            *(login(hasher, hashed_password, results) for _ in range(args.logins))
+        )
+    elapsed = time.perf_counter() - started
+    prober.cancel()
+    logger.info(
+        "%s: %d bursts of %d logins in %.2fs, %d accepted (%.0f/s), %d rejected "
+        "with 429, login p50 %.0fms p99 %.0fms, other requests p99 %.1fms max %.1fms",
+        mode,
+        args.bursts,
+        args.logins,
+        elapsed,
+        results.accepted,
+        results.accepted / elapsed,
+        results.rejected,
+        1000 * percentile(results.logins, 0.5),
+        1000 * percentile(results.logins, 0.99),
+        1000 * percentile(results.probes, 0.99),
+        1000 * max(results.probes, default=0.0),
+    )
+    if hasher:
+        assert results.accepted + results.rejected == args.bursts * args.logins
+        assert results.accepted >= min(args.logins, hasher.max_pending)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Send bursts of concurrent logins through the bounded bcrypt "
+        "pool, and time the other requests while they run."
+    )
+    parser.add_argument("--logins", type=int, default=500)
+    parser.add_argument("--bursts", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=settings.PASSWORD_HASH_WORKERS)
+    parser.add_argument("--queue", type=int, default=settings.PASSWORD_HASH_MAX_QUEUE)
+    parser.add_argument("--probe-interval", type=float, default=0.01)
+    parser.add_argument(
+        "--compare",
+        action="store_true",
+        help="also check the passwords on the shared threadpool, without a bound",
+    )
+    args = parser.parse_args()
+    hashed_password = get_password_hash(PASSWORD)
+    modes = ["bounded", "unbounded"] if args.compare else ["bounded"]
+    for mode in modes:
+        asyncio.run(run(mode, args, hashed_password))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+import argparse
+import datetime
+import logging
+import time
+
+import numpy as np
+
+from app.services import performance
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def generate(
+    rng: np.random.Generator, *, users: int, days: int, symbols: int, trades: int
+) -> tuple[performance.PriceMatrix, performance.Trades]:
+    """
+    Random walk prices, and `trades` buys per user on random days, a third of
+    them sold in half later on.
+    """
+    returns = rng.normal(0.0003, 0.02, size=(days, symbols))
+    closes = 100 * np.exp(np.cumsum(returns, axis=0))
+    prices = performance.PriceMatrix(
+        start=datetime.date.today() - datetime.timedelta(days=days - 1),
+        symbols=[f"S{index}" for index in range(symbols)],
+        closes=closes,
+    )
+    user = np.repeat(np.arange(users), trades)
+    day = rng.integers(0, days - 1, size=len(user))
+    symbol = rng.integers(0, symbols, size=len(user))
+    quantity = rng.integers(1, 100, size=len(user)).astype(float)
+    sold = rng.random(len(user)) < 1 / 3
+    sell_day = rng.integers(day[sold] + 1, days)
+    user = np.concatenate([user, user[sold]])
+    day = np.concatenate([day, sell_day])
+    symbol = np.concatenate([symbol, symbol[sold]])
+    quantity = np.concatenate([quantity, -quantity[sold] / 2])
+    # Trades sorted by user, so a batch of users is a slice
+    order = np.argsort(user, kind="stable")
+    trades_ = performance.Trades(
+        user=user[order],
+        day=day[order],
+        symbol=symbol[order],
+        quantity=quantity[order],
+        price=closes[day[order], symbol[order]],
+    )
+    return prices, trades_
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Time the portfolio performance engine on random trades"
+    )
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--trades-per-user", type=int, default=20)
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1000,
+        help="users computed at once, bounds the memory of the holdings",
+    )
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+    prices, trades = generate(
+        rng,
+        users=args.users,
+        days=args.days,
+        symbols=args.symbols,
+        trades=args.trades_per_user,
+    )
+    timings = dict.fromkeys(["values", "returns", "xirr"], 0.0)
+    twr = []
+    started = time.perf_counter()
+    for first_user in range(0, args.users, args.batch_size):
+        batch = min(args.batch_size, args.users - first_user)
+        low, high = np.searchsorted(trades.user, [first_user, first_user + batch])
+        batch_trades = performance.Trades(
+            user=trades.user[low:high] - first_user,
+            day=trades.day[low:high],
+            symbol=trades.symbol[low:high],
+            quantity=trades.quantity[low:high],
+            price=trades.price[low:high],
+        )
+        step = time.perf_counter()
+        values, bought, sold = performance.daily_values(batch_trades, prices, batch)
+        timings["values"] += time.perf_counter() - step
+
+        step = time.perf_counter()
+        returns = performance.daily_returns(values, bought, sold)
+        twr.append(performance.time_weighted_return(returns))
+        performance.max_drawdown(returns)
+        performance.volatility(returns)
+        timings["returns"] += time.perf_counter() - step
+
+        step = time.perf_counter()
+        performance.money_weighted_return(values, bought, sold)
+        timings["xirr"] += time.perf_counter() - step
+    elapsed = time.perf_counter() - started
+    logger.info(
+        "%d users x %d days, %d trades: %.2fs (daily values %.2fs, TWR, "
+        "drawdown and volatility %.2fs, XIRR %.2fs), median TWR %.1f%%",
+        args.users,
+        args.days,
+        len(trades.user),
+        elapsed,
+        timings["values"],
+        timings["returns"],
+        timings["xirr"],
+        100 * np.median(np.concatenate(twr)),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import argparse
+import logging
+import random
+import string
+import time
+import uuid
+
+from app.models.security import SecurityType
+from app.services.search import SecuritySearchIndex
+from app.services.securities import SecurityEntry
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+WORDS = [
+    "american", "global", "energy", "capital", "bank", "technologies",
+    "pharmaceuticals", "holdings", "international", "systems", "resources",
+    "financial", "health", "industries", "semiconductor", "software", "motors",
+    "airlines", "foods", "realty", "trust", "mining", "networks", "media",
+]  # fmt: skip
+SUFFIXES = ["Inc.", "Corp.", "Ltd.", "plc", "Group", "Co.", "N.V.", "ETF"]
+
+
+def generate(rng: random.Random, count: int) -> list[SecurityEntry]:
+    symbols: set[str] = set()
+    while len(symbols) < count:
+        symbols.add("".join(rng.choices(string.ascii_uppercase, k=rng.randint(1, 5))))
+    return [
+        SecurityEntry(
+            id=uuid.uuid4(),
+            symbol=symbol,
+            name=" ".join(
+                [w.title() for w in rng.sample(WORDS, rng.randint(1, 3))]
+                + [rng.choice(SUFFIXES)]
+            ),
+            security_type=SecurityType.COMMON_STOCK,
+            market="NASDAQ",
+            currency="USD",
+        )
+        for symbol in sorted(symbols)
+    ]
+
+
+def _typo(rng: random.Random, word: str) -> str:
+    index = rng.randrange(len(word))
+    return word[:index] + rng.choice(string.ascii_lowercase) + word[index + 1 :]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Time the security search index on random instruments"
+    )
+    parser.add_argument("--securities", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=10_000)
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+    rng = random.Random(0)
+    entries = generate(rng, args.securities)
+
+    index = SecuritySearchIndex()
+    started = time.perf_counter()
+    index.update(entries, [])
+    logger.info(
+        "Indexed %d securities in %.2fs", len(index), time.perf_counter() - started
+    )
+
+    started = time.perf_counter()
+    for entry in generate(rng, 1000):
+        index.update([entry], [])
+    logger.info(
+        "Added 1000 securities one at a time in %.2fs", time.perf_counter() - started
+    )
+
+    # Keystrokes typed into the search box: symbol and name prefixes, typos
+    queries = []
+    for _ in range(args.queries):
+        entry = rng.choice(entries)
+        kind = rng.randrange(3)
+        if kind == 0:
+            queries.append(entry.symbol[: rng.randint(1, len(entry.symbol))])
+        elif kind == 1:
+            queries.append(entry.name[: rng.randint(1, len(entry.name))])
+        else:
+            queries.append(_typo(rng, rng.choice(WORDS)))
+    timings = []
+    for query in queries:
+        started = time.perf_counter()
+        index.search(query, limit=args.limit)
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+    logger.info(
+        "%d queries: median %.1fus, p99 %.1fus, max %.1fus",
+        len(timings),
+        timings[len(timings) // 2] * 1e6,
+        timings[int(len(timings) * 0.99)] * 1e6,
+        timings[-1] * 1e6,
+    )
+
+
+if __name__ == "__main__":
+    main()
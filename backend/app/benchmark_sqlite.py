@@ -0,0 +1,185 @@
+import argparse
+import asyncio
+import logging
+import random
+import tempfile
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlmodel import SQLModel, create_engine, insert, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.core.db import set_sqlite_pragmas, sqlite_pragmas
+from app.models import Transaction
+from app.models.transaction import TransactionType
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SEED_USERS = 20
+SEED_TRANSACTIONS_PER_USER = 500
+
+
+@dataclass
+class Counts:
+    reads: int = 0
+    writes: int = 0
+    errors: int = 0
+
+
+def _transaction(user_id: uuid.UUID) -> dict[str, object]:
+    return Transaction(
+        symbol="AAPL",
+        quantity=1,
+        price_per_unit=random.uniform(100, 200),
+        transaction_type=TransactionType.BUY,
+        security_id=uuid.uuid4(),
+        user_id=user_id,
+    ).model_dump()
+
+
+def seed(path: Path, journal_mode: str) -> list[uuid.UUID]:
+    engine = create_engine(f"sqlite:///{path}")
+    set_sqlite_pragmas(engine, [f"PRAGMA journal_mode={journal_mode}"])
+    SQLModel.metadata.create_all(engine)
+    user_ids = [uuid.uuid4() for _ in range(SEED_USERS)]
+    with engine.begin() as connection:
+        for user_id in user_ids:
+            values = [_transaction(user_id) for _ in range(SEED_TRANSACTIONS_PER_USER)]
+            connection.execute(insert(Transaction), values)
+    engine.dispose()
+    return user_ids
+
+
+async def writer(
+    engine: AsyncEngine, user_ids: list[uuid.UUID], deadline: float, counts: Counts
+) -> None:
+    while time.monotonic() < deadline:
+        async with AsyncSession(engine) as session:
+            session.add(Transaction(**_transaction(random.choice(user_ids))))
+            try:
+                await session.commit()
+                counts.writes += 1
+            except OperationalError:
+                counts.errors += 1
+
+
+async def reader(
+    engine: AsyncEngine, user_ids: list[uuid.UUID], deadline: float, counts: Counts
+) -> None:
+    while time.monotonic() < deadline:
+        statement = (
+            select(Transaction)
+            .where(Transaction.user_id == random.choice(user_ids))
+            .order_by(Transaction.timestamp, Transaction.id)
+            .limit(100)
+        )
+        async with AsyncSession(engine) as session:
+            try:
+                (await session.exec(statement)).all()
+                counts.reads += 1
+            except OperationalError:
+                counts.errors += 1
+
+
+def _engines(url: str, tuned: bool) -> tuple[AsyncEngine, AsyncEngine]:
+    if not tuned:
+        # SQLite's defaults, with one pool shared by readers and writers
+        engine = create_async_engine(url)
+        return engine, engine
+    write_engine = create_async_engine(url, pool_size=settings.DATABASE_POOL_SIZE)
+    read_engine = create_async_engine(url, pool_size=settings.DATABASE_READ_POOL_SIZE)
+    set_sqlite_pragmas(write_engine.sync_engine, sqlite_pragmas())
+    set_sqlite_pragmas(read_engine.sync_engine, sqlite_pragmas(read_only=True))
+    return write_engine, read_engine
+
+
+async def run(
+    url: str,
+    tuned: bool,
+    user_ids: list[uuid.UUID],
+    *,
+    seconds: float,
+    writers: int,
+    readers: int,
+) -> Counts:
+    write_engine, read_engine = _engines(url, tuned)
+    counts = Counts()
+    deadline = time.monotonic() + seconds
+    try:
+        await asyncio.gather(
+            *(writer(write_engine, user_ids, deadline, counts) for _ in range(writers)),
+            *(reader(read_engine, user_ids, deadline, counts) for _ in range(readers)),
+        )
+    finally:
+        await write_engine.dispose()
+        await read_engine.dispose()
+    return counts
+
+
+def run_process(
+    url: str, tuned: bool, user_ids: list[uuid.UUID], options: dict[str, int | float]
+) -> Counts:
+    return asyncio.run(run(url, tuned, user_ids, **options))  # type: ignore[arg-type]
+
+
+def benchmark(
+    tuned: bool, *, processes: int, seconds: float, writers: int, readers: int
+) -> Counts:
+    """
+    Run `processes` workers, like the API's, each with its own engines and
+    `writers` + `readers` concurrent sessions, and add up their counts.
+    """
+    options = {"seconds": seconds, "writers": writers, "readers": readers}
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "benchmark.db"
+        user_ids = seed(path, settings.SQLITE_JOURNAL_MODE if tuned else "delete")
+        url = f"sqlite+aiosqlite:///{path}"
+        with ProcessPoolExecutor(processes) as executor:
+            futures = [
+                executor.submit(run_process, url, tuned, user_ids, options)
+                for _ in range(processes)
+            ]
+            results = [future.result() for future in futures]
+    return Counts(
+        reads=sum(counts.reads for counts in results),
+        writes=sum(counts.writes for counts in results),
+        errors=sum(counts.errors for counts in results),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare concurrent read/write throughput of SQLite's "
+        "default configuration with the tuned profile from the settings."
+    )
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--readers", type=int, default=8)
+    args = parser.parse_args()
+    for tuned in (False, True):
+        counts = benchmark(
+            tuned,
+            processes=args.processes,
+            seconds=args.seconds,
+            writers=args.writers,
+            readers=args.readers,
+        )
+        logger.info(
+            "%s: %.0f reads/s, %.0f writes/s, %d errors",
+            "tuned" if tuned else "default",
+            counts.reads / args.seconds,
+            counts.writes / args.seconds,
+            counts.errors,
+        )
+
+
+if __name__ == "__main__":
+    main()
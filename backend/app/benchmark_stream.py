@@ -0,0 +1,103 @@
+import argparse
+import asyncio
+import logging
+import random
+import time
+import uuid
+from datetime import UTC, datetime
+
+from app.models.quote import Quote
+from app.services.streaming import QuoteStreamHub, QuoteSubscriber
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def consume(
+    subscriber: QuoteSubscriber, delay: float, received: list[int]
+) -> None:
+    # Stands in for a connection, `delay` being the time its sends take
+    while True:
+        _, quotes = await subscriber.next_batch()
+        received[0] += len(quotes)
+        if delay:
+            await asyncio.sleep(delay)
+
+
+async def run(args: argparse.Namespace) -> None:
+    hub = QuoteStreamHub(
+        max_connections=args.connections, max_symbols=args.symbols_per_connection
+    )
+    rng = random.Random(0)
+    symbols = [f"S{index}" for index in range(args.symbols)]
+    received = [0]
+    tasks = []
+    for index in range(args.connections):
+        subscriber = hub.connect(uuid.uuid4())
+        hub.subscribe(subscriber, rng.sample(symbols, args.symbols_per_connection))
+        slow = index < args.connections * args.slow_fraction
+        tasks.append(
+            asyncio.create_task(consume(subscriber, 0.5 if slow else 0, received))
+        )
+    await asyncio.sleep(0)
+
+    quote = Quote(
+        symbol="",
+        price=100.0,
+        change=0.0,
+        change_percent=0.0,
+        open=100.0,
+        high=100.0,
+        low=100.0,
+        previous_close=100.0,
+        timestamp=datetime.now(UTC),
+    )
+    fan_out = 0.0
+    started = time.perf_counter()
+    for _ in range(args.rounds):
+        step = time.perf_counter()
+        # A refresh of every symbol, serialized once and fanned out
+        for symbol in symbols:
+            hub._fan_out(
+                symbol, quote.model_copy(update={"symbol": symbol}).model_dump_json()
+            )
+        fan_out += time.perf_counter() - step
+        # Let the consumers drain
+        await asyncio.sleep(0.05)
+    elapsed = time.perf_counter() - started
+    for task in tasks:
+        task.cancel()
+    coalesced = sum(subscriber.coalesced for subscriber in hub._connections)
+    logger.info(
+        "%d connections x %d symbols, %d rounds of %d ticks: %.2fs, fan out "
+        "%.1fms per round, %d quotes delivered, %d coalesced",
+        args.connections,
+        args.symbols_per_connection,
+        args.rounds,
+        len(symbols),
+        elapsed,
+        1000 * fan_out / args.rounds,
+        received[0],
+        coalesced,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Time the fan out of quotes to streaming subscribers, in process"
+    )
+    parser.add_argument("--connections", type=int, default=10_000)
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--symbols-per-connection", type=int, default=10)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument(
+        "--slow-fraction",
+        type=float,
+        default=0.1,
+        help="connections taking 0.5s per send, whose quotes get coalesced",
+    )
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
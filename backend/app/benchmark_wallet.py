@@ -0,0 +1,192 @@
+import argparse
+import asyncio
+import logging
+import tempfile
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app import crud
+from app.core.db import set_sqlite_pragmas, sqlite_pragmas
+from app.models import Wallet
+from app.models.user import User
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Counts:
+    accepted: int = 0
+    refused: int = 0
+    errors: int = 0
+
+
+def seed(path: Path, balance: float) -> uuid.UUID:
+    engine = create_engine(f"sqlite:///{path}")
+    set_sqlite_pragmas(engine, sqlite_pragmas())
+    SQLModel.metadata.create_all(engine)
+    user = User(
+        email="wallet@example.com",
+        username="wallet",
+        first_name=None,
+        last_name=None,
+        hashed_password="",
+    )
+    with Session(engine) as session:
+        session.add(user)
+        session.add(Wallet(user_id=user.id, balance=balance))
+        session.commit()
+        user_id = user.id
+    engine.dispose()
+    return user_id
+
+
+async def conditional_order(
+    engine: AsyncEngine, user_id: uuid.UUID, cost: float
+) -> bool:
+    async with AsyncSession(engine) as session:
+        accepted = await crud.debit_wallet(
+            session=session, user_id=user_id, amount=cost
+        )
+        await session.commit()
+        return accepted
+
+
+async def read_then_write_order(
+    engine: AsyncEngine, user_id: uuid.UUID, cost: float
+) -> bool:
+    # What the conditional UPDATE replaces: check the balance, then write it
+    async with AsyncSession(engine) as session:
+        wallet = await session.get(Wallet, user_id)
+        if not wallet or wallet.balance < cost:
+            return False
+        # Other orders run between the read and the write, as they would
+        # while an order is being validated
+        await asyncio.sleep(0)
+        wallet.balance -= cost
+        session.add(wallet)
+        await session.commit()
+        return True
+
+
+ORDERS = {"conditional": conditional_order, "read-then-write": read_then_write_order}
+
+
+async def trader(
+    engine: AsyncEngine, user_id: uuid.UUID, mode: str, cost: float, counts: Counts
+) -> None:
+    # Places orders until one is refused for lack of cash
+    order = ORDERS[mode]
+    while True:
+        try:
+            if not await order(engine, user_id, cost):
+                counts.refused += 1
+                return
+            counts.accepted += 1
+        except OperationalError:
+            counts.errors += 1
+
+
+async def run(
+    url: str, user_id: uuid.UUID, mode: str, cost: float, tasks: int
+) -> Counts:
+    engine = create_async_engine(url, pool_size=tasks)
+    set_sqlite_pragmas(engine.sync_engine, sqlite_pragmas())
+    counts = Counts()
+    try:
+        await asyncio.gather(
+            *(trader(engine, user_id, mode, cost, counts) for _ in range(tasks))
+        )
+    finally:
+        await engine.dispose()
+    return counts
+
+
+def run_process(
+    url: str, user_id: uuid.UUID, mode: str, cost: float, tasks: int
+) -> Counts:
+    return asyncio.run(run(url, user_id, mode, cost, tasks))
+
+
+def benchmark(
+    mode: str, *, balance: float, cost: float, processes: int, tasks: int
+) -> None:
+    """
+    Have `processes` workers, like the API's, each with `tasks` concurrent
+    sessions, spend one wallet until it's empty, then check that the orders
+    accepted add up to what it held.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "benchmark.db"
+        user_id = seed(path, balance)
+        url = f"sqlite+aiosqlite:///{path}"
+        started = time.perf_counter()
+        with ProcessPoolExecutor(processes) as executor:
+            futures = [
+                executor.submit(run_process, url, user_id, mode, cost, tasks)
+                for _ in range(processes)
+            ]
+            results = [future.result() for future in futures]
+        elapsed = time.perf_counter() - started
+        engine = create_engine(f"sqlite:///{path}")
+        with Session(engine) as session:
+            wallet = session.get(Wallet, user_id)
+            assert wallet
+            final_balance = wallet.balance
+        engine.dispose()
+    accepted = sum(counts.accepted for counts in results)
+    errors = sum(counts.errors for counts in results)
+    affordable = int(balance // cost)
+    logger.info(
+        "%s: %d orders accepted in %.2fs (%.0f/s), %d affordable, %d errors, "
+        "balance %.2f left, %.2f overspent",
+        mode,
+        accepted,
+        elapsed,
+        accepted / elapsed,
+        affordable,
+        errors,
+        final_balance,
+        max(0.0, accepted * cost - balance),
+    )
+    if mode == "conditional":
+        assert accepted == affordable, "orders were lost or overspent"
+        assert final_balance == balance - accepted * cost
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Spend one wallet from many concurrent sessions and check "
+        "that no order gets through without the cash to pay for it."
+    )
+    parser.add_argument("--balance", type=float, default=10_000.0)
+    parser.add_argument("--cost", type=float, default=10.0)
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--tasks", type=int, default=8)
+    parser.add_argument(
+        "--compare",
+        action="store_true",
+        help="also run the read-then-write version, which overspends",
+    )
+    args = parser.parse_args()
+    modes = ["conditional", "read-then-write"] if args.compare else ["conditional"]
+    for mode in modes:
+        benchmark(
+            mode,
+            balance=args.balance,
+            cost=args.cost,
+            processes=args.processes,
+            tasks=args.tasks,
+        )
+
+
+if __name__ == "__main__":
+    main()
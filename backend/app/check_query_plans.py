@@ -0,0 +1,90 @@
+import re
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import Connection, Engine, event
+
+# Statements that have a plan, as opposed to PRAGMAs and the like
+EXPLAINABLE = re.compile(r"\s*(SELECT|INSERT|UPDATE|DELETE|WITH)\b", re.IGNORECASE)
+LIMIT = re.compile(r"\bLIMIT\b", re.IGNORECASE)
+
+
+@dataclass
+class CapturedStatement:
+    sql: str
+    parameters: Any
+
+
+@contextmanager
+def capture_statements(*engines: Engine) -> Iterator[list[CapturedStatement]]:
+    """
+    Record the SQL the engines send to the database within the block, each
+    statement once, with the parameters of its first execution.
+    """
+    statements: dict[str, CapturedStatement] = {}
+
+    def on_execute(
+        conn: Connection,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: Any,
+        executemany: bool,
+    ) -> None:
+        if executemany:
+            parameters = parameters[0]
+        statements.setdefault(statement, CapturedStatement(statement, parameters))
+
+    captured: list[CapturedStatement] = []
+    for engine in engines:
+        event.listen(engine, "before_cursor_execute", on_execute)
+    try:
+        yield captured
+    finally:
+        for engine in engines:
+            event.remove(engine, "before_cursor_execute", on_execute)
+        captured.extend(statements.values())
+
+
+def explain(connection: Connection, statement: CapturedStatement) -> list[str]:
+    """
+    Return the detail lines of SQLite's EXPLAIN QUERY PLAN for a statement.
+    """
+    rows = connection.exec_driver_sql(
+        f"EXPLAIN QUERY PLAN {statement.sql}", statement.parameters
+    ).all()
+    return [row[-1] for row in rows]
+
+
+def find_table_scans(
+    connection: Connection,
+    statements: list[CapturedStatement],
+    *,
+    full_scans: frozenset[str] = frozenset(),
+) -> dict[str, list[str]]:
+    """
+    The plans, by SQL, of the statements that scan a table or a whole index,
+    other than the tables of `full_scans`, which are meant to be read whole.
+    A statement with a LIMIT, such as a keyset-paginated one, may walk an
+    index in order as it stops early, but must not sort its rows instead, so
+    that every page costs the same.
+    """
+    scans = {}
+    for statement in statements:
+        if not EXPLAINABLE.match(statement.sql):
+            continue
+        plan = explain(connection, statement)
+        limited = bool(LIMIT.search(statement.sql))
+        for line in plan:
+            if line.startswith("SCAN "):
+                allowed = line.split()[1] in full_scans or (
+                    limited and " INDEX " in line
+                )
+            else:
+                allowed = not (limited and line.startswith("USE TEMP B-TREE"))
+            if not allowed:
+                scans[statement.sql] = plan
+                break
+    return scans
@@ -0,0 +1,77 @@
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Iterable
+
+
+class TTLCache[K: Hashable, V]:
+    """
+    Thread-safe mapping bounded by both size (least recently used entries
+    are evicted first) and age (entries expire `ttl` seconds after being set).
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl: float,
+        max_size: int,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.ttl = ttl
+        self.max_size = max_size
+        self._clock = clock
+        self._entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _get(self, key: K, now: float) -> V | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at <= now:
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def get(self, key: K) -> V | None:
+        with self._lock:
+            return self._get(key, self._clock())
+
+    def get_many(self, keys: Iterable[K]) -> dict[K, V]:
+        """
+        Return the cached values of `keys`, skipping missing or expired ones.
+        """
+        with self._lock:
+            now = self._clock()
+            found = {}
+            for key in keys:
+                value = self._get(key, now)
+                if value is not None:
+                    found[key] = value
+            return found
+
+    def set(self, key: K, value: V, ttl: float | None = None) -> None:
+        with self._lock:
+            expires_at = self._clock() + (self.ttl if ttl is None else ttl)
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def pop(self, key: K) -> V | None:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            return entry[1] if entry else None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
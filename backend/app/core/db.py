@@ -1,10 +1,106 @@
+from typing import Any
+
+from sqlalchemy import Connection, Engine, event
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 from sqlmodel import Session, create_engine, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app import crud
 from app.core.config import settings
 from app.models.user import User, UserCreate
 
-engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI))
+
+def sqlite_pragmas(*, read_only: bool = False) -> list[str]:
+    """
+    The PRAGMA statements configured in the settings, run on every new
+    connection since most of them only last as long as the connection.
+    """
+    pragmas = [
+        f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}",
+        f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}",
+        f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}",
+        f"PRAGMA cache_size=-{settings.SQLITE_CACHE_SIZE_KIB}",
+        f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE}",
+        f"PRAGMA temp_store={settings.SQLITE_TEMP_STORE}",
+    ]
+    if read_only:
+        pragmas.append("PRAGMA query_only=ON")
+    return pragmas
+
+
+def set_sqlite_pragmas(engine: Engine, pragmas: list[str]) -> None:
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection: Any, connection_record: Any) -> None:
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+
+def _create_async_engine(url: str, *, pool_size: int, read_only: bool) -> AsyncEngine:
+    engine = create_async_engine(
+        url,
+        pool_size=pool_size,
+        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+        pool_pre_ping=not url.startswith("sqlite"),
+    )
+    if engine.dialect.name == "sqlite":
+        set_sqlite_pragmas(engine.sync_engine, sqlite_pragmas(read_only=read_only))
+    return engine
+
+
+# Sync engine for scripts and bulk jobs, async engines for request handlers.
+# Read-only dependencies go through their own pool, to the replica when one is
+# configured. On SQLite its connections are query-only, and in WAL mode never
+# wait on the writers.
+engine = create_engine(
+    settings.SQLALCHEMY_DATABASE_URI,
+    pool_size=settings.DATABASE_POOL_SIZE,
+    max_overflow=settings.DATABASE_MAX_OVERFLOW,
+)
+if engine.dialect.name == "sqlite":
+    set_sqlite_pragmas(engine, sqlite_pragmas())
+async_engine = _create_async_engine(
+    settings.SQLALCHEMY_ASYNC_DATABASE_URI,
+    pool_size=settings.DATABASE_POOL_SIZE,
+    read_only=False,
+)
+async_read_engine = _create_async_engine(
+    settings.SQLALCHEMY_ASYNC_REPLICA_DATABASE_URI,
+    pool_size=settings.DATABASE_READ_POOL_SIZE,
+    read_only=True,
+)
+
+
+class RoutingSession(Session):
+    """
+    Sends the reads of sessions opened with `info={"replica": True}` to the
+    read engine, and everything else to the primary. Once such a session has
+    written, or locked rows, it sticks to the primary so it reads its writes.
+    """
+
+    def get_bind(
+        self, mapper: Any = None, clause: Any = None, **kw: Any
+    ) -> Engine | Connection:
+        if (
+            self.info.get("replica")
+            and not self._flushing
+            and getattr(clause, "is_select", False)
+            and getattr(clause, "_for_update_arg", None) is None
+        ):
+            return async_read_engine.sync_engine
+        self.info["replica"] = False
+        return async_engine.sync_engine
+
+
+def get_session(*, replica: bool = False) -> AsyncSession:
+    # Loaded attributes stay usable after commit, as lazy loads can't run
+    # implicitly on an async session
+    return AsyncSession(
+        sync_session_class=RoutingSession,
+        expire_on_commit=False,
+        info={"replica": replica},
+    )
 
 
 # make sure all SQLModel models are imported (app.models) before initializing DB
@@ -12,7 +108,7 @@ engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI))
 # for more details: https://github.com/fastapi/full-stack-fastapi-template/issues/28
 
 
-def init_db(session: Session) -> None:
+async def init_db(session: AsyncSession) -> None:
     # Tables should be created with Alembic migrations
     # But if you don't want to use migrations, create
     # the tables un-commenting the next lines
@@ -21,8 +117,8 @@ def init_db(session: Session) -> None:
     # This works because the models are already imported and registered from app.models
     # SQLModel.metadata.create_all(engine)
 
-    user = session.exec(
-        select(User).where(User.email == settings.FIRST_SUPERUSER)
+    user = (
+        await session.exec(select(User).where(User.email == settings.FIRST_SUPERUSER))
     ).first()
     if not user:
         user_in = UserCreate(
@@ -30,4 +126,4 @@ def init_db(session: Session) -> None:
             password=settings.FIRST_SUPERUSER_PASSWORD,
             is_superuser=True,
         )
-        user = crud.create_user(session=session, user_create=user_in)
+        user = await crud.create_user(session=session, user_create=user_in)
@@ -1,11 +1,23 @@
+import asyncio
+import itertools
+import threading
+import time
+import uuid
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 import jwt
 from passlib.context import CryptContext
+from sqlalchemy.orm import make_transient_to_detached
 
+from app.core.cache import TTLCache
 from app.core.config import settings
 
+if TYPE_CHECKING:
+    from app.models.user import User
+
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
@@ -25,3 +37,129 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
+
+
+class PasswordHasherBusyError(Exception):
+    pass
+
+
+class PasswordHasher:
+    """
+    Bounded worker pool for bcrypt, so a burst of logins queues up here
+    instead of tying up the threads that serve every other request. Once
+    `max_workers + max_queue` calls are pending, new ones are rejected.
+    """
+
+    def __init__(self, *, max_workers: int, max_queue: int) -> None:
+        self.max_workers = max_workers
+        self.max_pending = max_workers + max_queue
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="password-hasher"
+        )
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+    async def run[T](self, func: Callable[..., T], *args: Any) -> T:
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise PasswordHasherBusyError()
+            self.pending += 1
+        try:
+            return await asyncio.wrap_future(self._executor.submit(func, *args))
+        finally:
+            with self._lock:
+                self.pending -= 1
+                self.completed += 1
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "pending": self.pending,
+                "queued": max(0, self.pending - self.max_workers),
+                "max_pending": self.max_pending,
+                "completed": self.completed,
+                "rejected": self.rejected,
+            }
+
+
+password_hasher = PasswordHasher(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await password_hasher.run(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    return await password_hasher.run(get_password_hash, password)
+
+
+class PrincipalCache:
+    """
+    Verified access tokens mapped to detached snapshots of their users, so
+    authenticating a request skips decoding the token and loading the user.
+    Invalidating a user bumps their version, which voids all of their entries.
+    Versions are kept as long as entries, so once a user's version expires
+    every entry it voided has too.
+    """
+
+    def __init__(self, *, ttl: float, max_size: int) -> None:
+        self._cache: TTLCache[str, tuple[int, User]] = TTLCache(
+            ttl=ttl, max_size=max_size
+        )
+        self._versions: TTLCache[uuid.UUID, int] = TTLCache(ttl=ttl, max_size=max_size)
+        # Versions never repeat, even for a user whose version expired
+        self._generations = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def version(self, user_id: uuid.UUID) -> int:
+        return self._versions.get(user_id) or 0
+
+    def get(self, token: str) -> "User | None":
+        entry = self._cache.get(token)
+        if entry is None:
+            return None
+        version, user = entry
+        if version != self.version(user.id):
+            self._cache.pop(token)
+            return None
+        return user
+
+    def set(self, token: str, user: "User", *, version: int, expires_at: float) -> None:
+        """
+        Cache a snapshot of `user` for `token` until the token expires at the
+        latest. `version` is the user's version from before they were loaded,
+        so a snapshot loaded before an invalidation isn't cached.
+        """
+        ttl = min(self._cache.ttl, expires_at - time.time())
+        if ttl <= 0:
+            return
+        # Copy the columns only, relationships would be lazy loaded
+        snapshot = type(user)(**user.model_dump())
+        make_transient_to_detached(snapshot)
+        with self._lock:
+            if version != self.version(user.id):
+                return
+            if version:
+                # Outlive the entry, or an older version would count again
+                self._versions.set(user.id, version)
+            self._cache.set(token, (version, snapshot), ttl=ttl)
+
+    def invalidate(self, user_id: uuid.UUID) -> None:
+        with self._lock:
+            self._versions.set(user_id, next(self._generations))
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+
+principal_cache = PrincipalCache(
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    max_size=settings.PRINCIPAL_CACHE_MAX_SIZE,
+)
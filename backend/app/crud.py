@@ -1,60 +1,570 @@
+import datetime
 import uuid
+from collections.abc import Callable, Iterable
 from typing import Any
 
-from sqlmodel import Session, select
+from pydantic import ValidationError
+from sqlalchemy import CompoundSelect, Select, union_all
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import col, func, insert, select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.core.security import get_password_hash, verify_password
+from app.core.security import (
+    get_password_hash_async,
+    principal_cache,
+    verify_password_async,
+)
+from app.models.position import Position
+from app.models.transaction import (
+    Transaction,
+    TransactionArchive,
+    TransactionArchiveMonth,
+    TransactionBulkError,
+    TransactionCreate,
+    TransactionOrderType,
+    TransactionStats,
+    TransactionStatus,
+    TransactionType,
+)
 from app.models.user import Item, ItemCreate, User, UserCreate, UserUpdate
+from app.models.wallet import Wallet
+from app.models.watchlist import Watchlist, WatchlistItem
+from app.services.securities import (
+    SecurityMismatchError,
+    SecurityNotFoundError,
+    security_index,
+)
 
 
-def create_user(*, session: Session, user_create: UserCreate) -> User:
+async def create_user(
+    *,
+    session: AsyncSession,
+    user_create: UserCreate,
+    hashed_password: str | None = None,
+) -> User:
+    if hashed_password is None:
+        hashed_password = await get_password_hash_async(user_create.password)
     db_obj = User.model_validate(
-        user_create, update={"hashed_password": get_password_hash(user_create.password)}
+        user_create, update={"hashed_password": hashed_password}
     )
     session.add(db_obj)
-    session.commit()
-    session.refresh(db_obj)
+    session.add(Wallet(user_id=db_obj.id))
+    await session.commit()
+    await session.refresh(db_obj)
     return db_obj
 
 
-def update_user(*, session: Session, db_user: User, user_in: UserUpdate) -> Any:
+async def update_user(
+    *, session: AsyncSession, db_user: User, user_in: UserUpdate
+) -> Any:
     user_data = user_in.model_dump(exclude_unset=True)
     extra_data = {}
     if "password" in user_data:
         password = user_data["password"]
-        hashed_password = get_password_hash(password)
+        hashed_password = await get_password_hash_async(password)
         extra_data["hashed_password"] = hashed_password
     db_user.sqlmodel_update(user_data, update=extra_data)
     session.add(db_user)
-    session.commit()
-    session.refresh(db_user)
+    await session.commit()
+    principal_cache.invalidate(db_user.id)
+    await session.refresh(db_user)
     return db_user
 
 
-def get_user_by_email(*, session: Session, email: str) -> User | None:
+async def get_user_by_email(*, session: AsyncSession, email: str) -> User | None:
     statement = select(User).where(User.email == email)
-    session_user = session.exec(statement).first()
+    session_user = (await session.exec(statement)).first()
     return session_user
 
 
-def get_user_by_username(*, session: Session, username: str) -> User | None:
+async def get_user_by_username(*, session: AsyncSession, username: str) -> User | None:
     statement = select(User).where(User.username == username)
-    session_user = session.exec(statement).first()
+    session_user = (await session.exec(statement)).first()
     return session_user
 
 
-def authenticate(*, session: Session, email: str, password: str) -> User | None:
-    db_user = get_user_by_email(session=session, email=email)
+async def authenticate(
+    *, session: AsyncSession, email: str, password: str
+) -> User | None:
+    db_user = await get_user_by_email(session=session, email=email)
     if not db_user:
         return None
-    if not verify_password(password, db_user.hashed_password):
+    if not await verify_password_async(password, db_user.hashed_password):
         return None
     return db_user
 
 
-def create_item(*, session: Session, item_in: ItemCreate, owner_id: uuid.UUID) -> Item:
+async def create_item(
+    *, session: AsyncSession, item_in: ItemCreate, owner_id: uuid.UUID
+) -> Item:
     db_item = Item.model_validate(item_in, update={"owner_id": owner_id})
     session.add(db_item)
-    session.commit()
-    session.refresh(db_item)
+    await session.commit()
+    await session.refresh(db_item)
     return db_item
+
+
+async def get_position(
+    *, session: AsyncSession, user_id: uuid.UUID, security_id: uuid.UUID
+) -> Position | None:
+    statement = select(Position).where(
+        Position.user_id == user_id, Position.security_id == security_id
+    )
+    return (await session.exec(statement)).first()
+
+
+def _upsert(session: AsyncSession, model: Any) -> Any:
+    """
+    An INSERT of `model` supporting ON CONFLICT, in the session's dialect.
+    """
+    if session.get_bind().dialect.name == "postgresql":
+        return postgresql.insert(model)
+    return sqlite.insert(model)
+
+
+def _apply_fill(position: Position, transaction: Transaction) -> None:
+    quantity = transaction.quantity
+    price = transaction.price_per_unit
+    if transaction.transaction_type == TransactionType.BUY:
+        position.quantity += quantity
+        position.cost_basis += quantity * price
+    else:
+        average_cost = (
+            position.cost_basis / position.quantity if position.quantity else 0.0
+        )
+        position.realized_pnl += quantity * (price - average_cost)
+        position.cost_basis -= quantity * average_cost
+        position.quantity -= quantity
+    position.symbol = transaction.symbol
+
+
+def _upsert_positions(session: AsyncSession) -> Any:
+    """
+    Add rows of bought quantities and costs to the users' positions, creating
+    the missing ones, so concurrent fills neither collide on a new position
+    nor lose an update.
+    """
+    statement = _upsert(session, Position)
+    return statement.on_conflict_do_update(
+        index_elements=["user_id", "security_id"],
+        set_={
+            "quantity": col(Position.quantity) + statement.excluded.quantity,
+            "cost_basis": col(Position.cost_basis) + statement.excluded.cost_basis,
+            "symbol": statement.excluded.symbol,
+        },
+    )
+
+
+async def apply_transaction_to_position(
+    *, session: AsyncSession, transaction: Transaction
+) -> bool:
+    """
+    Fold a completed transaction into the user's materialized position: an
+    upsert for a buy, and for a sell an UPDATE conditional on the quantity
+    held, so concurrent fills neither collide on a new position nor sell the
+    same shares twice. Returns False for a sell the position doesn't cover.
+    Nothing is committed, so the caller persists both in the same commit.
+    """
+    quantity = transaction.quantity
+    price = transaction.price_per_unit
+    if transaction.transaction_type == TransactionType.BUY:
+        position = Position(
+            user_id=transaction.user_id,
+            security_id=transaction.security_id,
+            symbol=transaction.symbol,
+            quantity=quantity,
+            cost_basis=quantity * price,
+        )
+        await session.exec(_upsert_positions(session).values(position.model_dump()))
+        return True
+    # The right-hand sides all read the row as it was before the update
+    average_cost = col(Position.cost_basis) / col(Position.quantity)
+    result = await session.exec(
+        update(Position)  # type: ignore
+        .where(
+            col(Position.user_id) == transaction.user_id,
+            col(Position.security_id) == transaction.security_id,
+            col(Position.quantity) >= quantity,
+        )
+        .values(
+            realized_pnl=col(Position.realized_pnl) + quantity * (price - average_cost),
+            cost_basis=col(Position.cost_basis) - quantity * average_cost,
+            quantity=col(Position.quantity) - quantity,
+            symbol=transaction.symbol,
+        )
+    )
+    return bool(result.rowcount)
+
+
+async def debit_wallet(
+    *, session: AsyncSession, user_id: uuid.UUID, amount: float
+) -> bool:
+    """
+    Take `amount` from the user's cash if they have that much, in a single
+    conditional UPDATE so concurrent orders can't spend the same cash twice.
+    Returns whether it was taken. Nothing is committed, so the caller persists
+    it with the order in the same commit.
+    """
+    result = await session.exec(
+        update(Wallet)  # type: ignore
+        .where(col(Wallet.user_id) == user_id, col(Wallet.balance) >= amount)
+        .values(
+            balance=col(Wallet.balance) - amount,
+            updated_at=datetime.datetime.now(),
+        )
+    )
+    return bool(result.rowcount)
+
+
+async def credit_wallet(
+    *, session: AsyncSession, user_id: uuid.UUID, amount: float
+) -> None:
+    """
+    Add `amount` to the user's cash, creating their wallet if needed.
+    Nothing is committed, so the caller persists it in the same commit.
+    """
+    result = await session.exec(
+        update(Wallet)  # type: ignore
+        .where(col(Wallet.user_id) == user_id)
+        .values(
+            balance=col(Wallet.balance) + amount,
+            updated_at=datetime.datetime.now(),
+        )
+    )
+    if not result.rowcount:
+        session.add(Wallet(user_id=user_id, balance=amount))
+
+
+async def get_or_create_watchlist(
+    *, session: AsyncSession, user_id: uuid.UUID
+) -> Watchlist:
+    """
+    The user's watchlist, inserted unless it exists so concurrent first adds
+    share one. Nothing is committed, so the caller persists it with the item.
+    """
+    await session.exec(
+        _upsert(session, Watchlist)
+        .values(Watchlist(user_id=user_id).model_dump())
+        .on_conflict_do_nothing(index_elements=["user_id"])
+    )
+    statement = select(Watchlist).where(Watchlist.user_id == user_id)
+    return (await session.exec(statement)).one()
+
+
+async def add_watchlist_item(*, session: AsyncSession, item: WatchlistItem) -> bool:
+    """
+    Insert `item` unless its security is already in the watchlist, returns
+    whether it was. Nothing is committed, so the caller persists it.
+    """
+    result = await session.exec(
+        _upsert(session, WatchlistItem)
+        .values(item.model_dump())
+        .on_conflict_do_nothing(index_elements=["watchlist_id", "security_id"])
+    )
+    return bool(result.rowcount)
+
+
+def compute_positions_from_ledger(
+    transactions: Iterable[Transaction],
+) -> dict[tuple[uuid.UUID, uuid.UUID], Position]:
+    """
+    Replay completed transactions (ordered by filled_at) into fresh positions,
+    keyed by (user_id, security_id).
+    """
+    positions: dict[tuple[uuid.UUID, uuid.UUID], Position] = {}
+    for transaction in transactions:
+        if transaction.status != TransactionStatus.COMPLETED:
+            continue
+        key = (transaction.user_id, transaction.security_id)
+        position = positions.get(key)
+        if not position:
+            position = Position(
+                user_id=transaction.user_id,
+                security_id=transaction.security_id,
+                symbol=transaction.symbol,
+            )
+            positions[key] = position
+        _apply_fill(position, transaction)
+    return positions
+
+
+def _apply_stats(stats: TransactionStats, transaction: Transaction) -> None:
+    stats.total_count += 1
+    stats.total_volume += transaction.quantity * transaction.price_per_unit
+    stats.price_sum += transaction.price_per_unit
+
+
+def _upsert_stats(session: AsyncSession) -> Any:
+    """
+    Add rows of totals to the per-symbol rollup, creating the missing ones,
+    so concurrent writers never collide on a new symbol nor lose an update.
+    """
+    statement = _upsert(session, TransactionStats)
+    return statement.on_conflict_do_update(
+        index_elements=["user_id", "symbol"],
+        set_={
+            name: getattr(TransactionStats, name) + getattr(statement.excluded, name)
+            for name in ("total_count", "total_volume", "price_sum")
+        },
+    )
+
+
+async def record_transaction_stats(
+    *, session: AsyncSession, transaction: Transaction
+) -> None:
+    """
+    Add a new transaction to the user's per-symbol rollup.
+    Nothing is committed, so the caller persists both in the same commit.
+    """
+    await session.exec(
+        _upsert_stats(session).values(
+            user_id=transaction.user_id,
+            symbol=transaction.symbol,
+            total_count=1,
+            total_volume=transaction.quantity * transaction.price_per_unit,
+            price_sum=transaction.price_per_unit,
+        )
+    )
+
+
+async def reprice_transaction_stats(
+    *, session: AsyncSession, transaction: Transaction, order_price: float
+) -> None:
+    """
+    Move a transaction recorded at its order price to the price it filled at
+    in the user's per-symbol rollup.
+    Nothing is committed, so the caller persists both in the same commit.
+    """
+    difference = transaction.price_per_unit - order_price
+    await session.exec(
+        update(TransactionStats)  # type: ignore
+        .where(
+            col(TransactionStats.user_id) == transaction.user_id,
+            col(TransactionStats.symbol) == transaction.symbol,
+        )
+        .values(
+            total_volume=col(TransactionStats.total_volume)
+            + transaction.quantity * difference,
+            price_sum=col(TransactionStats.price_sum) + difference,
+        )
+    )
+
+
+TRANSACTION_COLUMNS = [column.name for column in Transaction.__table__.columns]
+
+
+def month_after(month: datetime.date) -> datetime.datetime:
+    start = datetime.datetime(month.year, month.month, 1)
+    return (start + datetime.timedelta(days=32)).replace(day=1)
+
+
+async def get_archive_watermark(*, session: AsyncSession) -> datetime.datetime | None:
+    """
+    The end of the latest archived month: transactions from before it may be
+    in the archive, later ones never are. None when nothing is archived.
+    """
+    statement = select(func.max(TransactionArchiveMonth.month))
+    month = (await session.exec(statement)).one()
+    return month_after(month) if month else None
+
+
+def _transaction_rows(
+    model: type[Transaction] | type[TransactionArchive],
+    filters: Callable[[Any], Iterable[Any]],
+) -> Select[Any]:
+    table = model.__table__  # type: ignore[attr-defined]
+    columns = (table.c[name] for name in TRANSACTION_COLUMNS)
+    return select(*columns).where(*filters(model))  # type: ignore[call-overload]
+
+
+def select_transaction_rows(
+    filters: Callable[[Any], Iterable[Any]],
+    *,
+    include_archive: bool,
+    order_by: str = "timestamp",
+) -> Select[Any] | CompoundSelect:
+    """
+    Select the transactions matching `filters(model)`, ordered by (`order_by`,
+    id), from the transaction table and, with `include_archive`, the archive.
+    Wrap it in `select(Transaction).from_statement()` to load Transactions.
+    """
+    statement: Select[Any] | CompoundSelect = _transaction_rows(Transaction, filters)
+    if include_archive:
+        statement = union_all(statement, _transaction_rows(TransactionArchive, filters))
+    return statement.order_by(order_by, "id")
+
+
+async def count_transactions(
+    *,
+    session: AsyncSession,
+    filters: Callable[[Any], Iterable[Any]],
+    include_archive: bool,
+) -> int:
+    """
+    The number of transactions matching `filters(model)` in the transaction
+    table and, with `include_archive`, the archive.
+    """
+    models: list[type[Transaction | TransactionArchive]] = [Transaction]
+    if include_archive:
+        models.append(TransactionArchive)
+    count = 0
+    for model in models:
+        statement = select(func.count()).select_from(model).where(*filters(model))
+        count += (await session.exec(statement)).one()
+    return count
+
+
+def _format_validation_error(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(loc) for loc in e['loc']) or 'row'}: {e['msg']}"
+        for e in error.errors(include_url=False)
+    )
+
+
+class TransactionBulkLoader:
+    """
+    Insert many transactions for a user within one database transaction.
+    Rows are validated and inserted in chunks. Completed buys are added to the
+    positions with one upsert per chunk and security, and sells with the same
+    conditional UPDATE as the orders placed one by one, so concurrent orders
+    and fills are never overwritten. The increments of the stats rollup are
+    flushed with the final commit. Cash is settled as for the orders placed
+    one by one: buys take their cost, resting ones holding it, rows the wallet
+    can't cover being rejected, and completed sells pay in.
+    """
+
+    def __init__(self, *, session: AsyncSession, user_id: uuid.UUID) -> None:
+        self.session = session
+        self.user_id = user_id
+        self.inserted = 0
+        self.errors: list[TransactionBulkError] = []
+        # Pending orders for the matching engine, once committed
+        self.resting_orders: list[Transaction] = []
+        self._index = 0
+        # Bought quantities and costs per security, not yet added to positions
+        self._buys: dict[uuid.UUID, Position] = {}
+        self._stats: dict[str, TransactionStats] = {}
+
+    def _error(self, index: int, detail: str) -> None:
+        self.errors.append(TransactionBulkError(index=index, detail=detail))
+
+    async def _flush_buys(self, security_id: uuid.UUID | None = None) -> None:
+        # All of them, or those of one security
+        if security_id is None:
+            buys = list(self._buys.values())
+            self._buys.clear()
+        else:
+            buy = self._buys.pop(security_id, None)
+            buys = [buy] if buy else []
+        if buys:
+            await self.session.exec(
+                _upsert_positions(self.session),
+                params=[buy.model_dump() for buy in buys],
+            )
+
+    async def _apply(self, index: int, transaction: Transaction) -> bool:
+        if transaction.status == TransactionStatus.COMPLETED:
+            transaction.filled_at = transaction.timestamp
+            if transaction.transaction_type == TransactionType.BUY:
+                buy = self._buys.get(transaction.security_id)
+                if not buy:
+                    buy = Position(
+                        user_id=self.user_id,
+                        security_id=transaction.security_id,
+                        symbol=transaction.symbol,
+                    )
+                    self._buys[transaction.security_id] = buy
+                _apply_fill(buy, transaction)
+            else:
+                # The sell is priced against the position with the earlier
+                # buys in, so those are added first
+                await self._flush_buys(transaction.security_id)
+                if not await apply_transaction_to_position(
+                    session=self.session, transaction=transaction
+                ):
+                    self._error(index, "Insufficient position")
+                    return False
+        stats = self._stats.get(transaction.symbol)
+        if not stats:
+            stats = TransactionStats(user_id=self.user_id, symbol=transaction.symbol)
+            self._stats[transaction.symbol] = stats
+        _apply_stats(stats, transaction)
+        return True
+
+    async def add_chunk(self, rows: list[Any]) -> None:
+        """
+        Validate a chunk of rows (dicts, or an Exception for rows that
+        couldn't be parsed) and insert the valid ones with one executemany.
+        """
+        values = []
+        for row in rows:
+            index = self._index
+            self._index += 1
+            if isinstance(row, Exception):
+                self._error(index, str(row))
+                continue
+            try:
+                transaction_in = TransactionCreate.model_validate(row)
+            except ValidationError as e:
+                self._error(index, _format_validation_error(e))
+                continue
+            try:
+                security = security_index.resolve(
+                    transaction_in.symbol, transaction_in.security_id
+                )
+            except SecurityNotFoundError:
+                self._error(index, "Unknown symbol")
+                continue
+            except SecurityMismatchError:
+                self._error(index, "security_id doesn't match the symbol")
+                continue
+            transaction = Transaction.model_validate(
+                transaction_in,
+                update={
+                    "user_id": self.user_id,
+                    "symbol": security.symbol,
+                    "security_id": security.id,
+                },
+            )
+            # Market orders fill immediately at the submitted price, as they
+            # do through /buy and /sell, so only the others rest
+            if (
+                transaction.status == TransactionStatus.PENDING
+                and transaction.order_type == TransactionOrderType.MARKET
+            ):
+                transaction.status = TransactionStatus.COMPLETED
+            amount = transaction.quantity * transaction.price_per_unit
+            if (
+                transaction.status != TransactionStatus.FAILED
+                and transaction.transaction_type == TransactionType.BUY
+                and not await debit_wallet(
+                    session=self.session, user_id=self.user_id, amount=amount
+                )
+            ):
+                # Filling or cancelling a resting order settles against that cost
+                self._error(index, "Insufficient funds")
+                continue
+            if not await self._apply(index, transaction):
+                continue
+            if transaction.status == TransactionStatus.PENDING:
+                self.resting_orders.append(transaction)
+            elif (
+                transaction.status == TransactionStatus.COMPLETED
+                and transaction.transaction_type == TransactionType.SELL
+            ):
+                await credit_wallet(
+                    session=self.session, user_id=self.user_id, amount=amount
+                )
+            values.append(transaction.model_dump())
+        await self._flush_buys()
+        if values:
+            await self.session.exec(insert(Transaction), params=values)  # type: ignore
+            self.inserted += len(values)
+
+    async def commit(self) -> None:
+        if self._stats:
+            await self.session.exec(
+                _upsert_stats(self.session),
+                params=[stats.model_dump() for stats in self._stats.values()],
+            )
+        await self.session.commit()
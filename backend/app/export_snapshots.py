@@ -0,0 +1,140 @@
+import argparse
+import datetime
+import itertools
+import logging
+import uuid
+from collections.abc import Iterable
+from enum import StrEnum
+from typing import Any
+
+import pyarrow as pa
+from sqlmodel import Session, func, select
+
+from app import crud
+from app.core.db import engine
+from app.models import Transaction, TransactionArchive, TransactionArchiveMonth
+from app.models.transaction import TransactionStatus
+from app.services.analytics import SNAPSHOT_SCHEMA, snapshot_store
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 10_000
+
+
+def _first_day(session: Session) -> datetime.date | None:
+    oldest = [
+        session.exec(
+            select(func.min(model.timestamp)).where(
+                model.status == TransactionStatus.COMPLETED
+            )
+        ).one()
+        for model in (Transaction, TransactionArchive)
+    ]
+    days = [timestamp.date() for timestamp in oldest if timestamp]
+    return min(days) if days else None
+
+
+def _oldest_pending(session: Session) -> datetime.datetime | None:
+    statement = select(func.min(Transaction.timestamp)).where(
+        Transaction.status == TransactionStatus.PENDING
+    )
+    return session.exec(statement).one()
+
+
+def _snapshot_value(value: Any) -> Any:
+    if isinstance(value, uuid.UUID | StrEnum):
+        return str(value)
+    return value
+
+
+def _to_table(rows: Iterable[Any]) -> pa.Table:
+    columns: dict[str, list[Any]] = {name: [] for name in SNAPSHOT_SCHEMA.names}
+    for row in rows:
+        for name, values in columns.items():
+            values.append(_snapshot_value(getattr(row, name)))
+    return pa.Table.from_pydict(columns, schema=SNAPSHOT_SCHEMA)
+
+
+def export_days(session: Session, start: datetime.date, end: datetime.date) -> int:
+    """
+    Replace the snapshot of every day from `start` to before `end` with the
+    completed transactions of that day, reading the archive when needed.
+    """
+    begin = datetime.datetime.combine(start, datetime.time())
+    month = session.exec(select(func.max(TransactionArchiveMonth.month))).one()
+    statement = crud.select_transaction_rows(
+        lambda model: [
+            model.timestamp >= begin,
+            model.timestamp < datetime.datetime.combine(end, datetime.time()),
+            model.status == TransactionStatus.COMPLETED,
+        ],
+        include_archive=month is not None and begin < crud.month_after(month),
+    )
+    result = session.connection().execute(
+        statement.execution_options(yield_per=BATCH_SIZE)
+    )
+    exported = 0
+    empty = _to_table([])
+    day = start
+    for trade_date, rows in itertools.groupby(
+        result, key=lambda row: row.timestamp.date()
+    ):
+        # Days without trades may still have a stale snapshot to remove
+        for offset in range((trade_date - day).days):
+            snapshot_store.replace_day(day + datetime.timedelta(days=offset), empty)
+        table = _to_table(rows)
+        snapshot_store.replace_day(trade_date, table)
+        exported += table.num_rows
+        day = trade_date + datetime.timedelta(days=1)
+    for offset in range((end - day).days):
+        snapshot_store.replace_day(day + datetime.timedelta(days=offset), empty)
+    return exported
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Export the completed transactions of the past days to the "
+        "Parquet snapshot read by the analytics API"
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="export the whole history again, e.g. after importing backdated "
+        "transactions",
+    )
+    args = parser.parse_args()
+    # Only whole days are exported, today's trades are picked up tomorrow
+    end = datetime.date.today()
+    manifest = snapshot_store.read_manifest()
+    with Session(engine) as session:
+        # Pending orders keep their timestamp when they fill, so the next run
+        # goes back to the oldest order still pending now
+        oldest_pending = _oldest_pending(session)
+        if args.full or not manifest.get("exported_through"):
+            start = _first_day(session) or end
+        else:
+            start = datetime.date.fromisoformat(
+                manifest["exported_through"]
+            ) + datetime.timedelta(days=1)
+            if manifest.get("oldest_pending"):
+                previous = datetime.datetime.fromisoformat(manifest["oldest_pending"])
+                start = min(start, previous.date())
+        exported = export_days(session, start, end) if start < end else 0
+    snapshot_store.write_manifest(
+        {
+            "exported_through": (end - datetime.timedelta(days=1)).isoformat(),
+            "oldest_pending": oldest_pending.isoformat() if oldest_pending else None,
+            "exported_at": datetime.datetime.now().isoformat(),
+        }
+    )
+    logger.info(
+        "Exported %d transactions from %s to %s",
+        exported,
+        start.isoformat(),
+        end.isoformat(),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,28 @@
+import asyncio
+import logging
+from collections.abc import AsyncIterator
+from concurrent.futures import Future
+from contextlib import asynccontextmanager
+
 import sentry_sdk
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.routing import APIRoute
 from starlette.middleware.cors import CORSMiddleware
 
 from app.api.main import api_router
 from app.core.config import settings
+from app.core.db import async_engine, async_read_engine, get_session
+from app.core.security import PasswordHasherBusyError
+from app.models import Quote
+from app.services import alerts, matching, news
+from app.services.bars import bar_recorder
+from app.services.market_data import market_data
+from app.services.securities import security_index
+from app.services.streaming import quote_stream
+from app.services.trading_calendar import trading_calendars
+
+logger = logging.getLogger(__name__)
 
 
 def custom_generate_unique_id(route: APIRoute) -> str:
@@ -14,12 +32,115 @@ def custom_generate_unique_id(route: APIRoute) -> str:
 if settings.SENTRY_DSN and settings.ENVIRONMENT != "local":
     sentry_sdk.init(dsn=str(settings.SENTRY_DSN), enable_tracing=True)
 
+
+async def match_quote(quote: Quote) -> None:
+    async with get_session() as session:
+        await matching.process_price(session, quote.symbol, quote.price)
+
+
+async def refresh_security_index() -> None:
+    while True:
+        await asyncio.sleep(settings.SECURITY_INDEX_REFRESH_SECONDS)
+        try:
+            async with get_session() as session:
+                await security_index.load(session)
+        except Exception:
+            logger.exception("Reloading the security index failed")
+
+
+async def dispatch_alerts() -> None:
+    while True:
+        await asyncio.sleep(settings.ALERT_DISPATCH_SECONDS)
+        try:
+            # Symbols nobody is watching need quotes too, at most one fetch
+            # per quote cache lifetime
+            await market_data.get_quotes_async(alerts.alert_engine.symbols())
+        except Exception:
+            logger.exception("Fetching the quotes of the price alerts failed")
+        try:
+            async with get_session() as session:
+                await alerts.alert_dispatcher.dispatch(session)
+        except Exception:
+            logger.exception("Dispatching the triggered price alerts failed")
+
+
+async def ingest_news() -> None:
+    while True:
+        await asyncio.sleep(settings.NEWS_POLL_SECONDS)
+        try:
+            async with get_session() as session:
+                await news.news_ingester.run(session)
+        except Exception:
+            logger.exception("Ingesting news failed")
+
+
+def _log_match_failure(future: Future[None]) -> None:
+    if not future.cancelled() and future.exception():
+        logger.error("Matching a quote failed", exc_info=future.exception())
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    async with get_session() as session:
+        await security_index.load(session)
+        await matching.load_pending_orders(session)
+        await alerts.load_active_alerts(session)
+        await news.news_ingester.sync(session)
+    loop = asyncio.get_running_loop()
+    refresh = asyncio.create_task(refresh_security_index())
+
+    # Quotes arrive on the market data worker threads, the fills they trigger
+    # are settled on the event loop. Outside their exchange's sessions they
+    # are left unmatched
+    def on_quote(quote: Quote) -> None:
+        if settings.MATCH_ONLY_IN_SESSION and not trading_calendars.is_open(
+            quote.symbol
+        ):
+            return
+        future = asyncio.run_coroutine_threadsafe(match_quote(quote), loop)
+        future.add_done_callback(_log_match_failure)
+
+    market_data.add_listener(on_quote)
+    market_data.add_listener(bar_recorder.on_quote)
+    market_data.add_listener(quote_stream.on_quote)
+    market_data.add_listener(alerts.alert_dispatcher.on_quote)
+    streaming = asyncio.create_task(quote_stream.run(settings.STREAM_POLL_SECONDS))
+    dispatching = asyncio.create_task(dispatch_alerts())
+    ingesting = asyncio.create_task(ingest_news())
+    yield
+    ingesting.cancel()
+    dispatching.cancel()
+    market_data.remove_listener(alerts.alert_dispatcher.on_quote)
+    streaming.cancel()
+    market_data.remove_listener(quote_stream.on_quote)
+    refresh.cancel()
+    market_data.remove_listener(bar_recorder.on_quote)
+    market_data.remove_listener(on_quote)
+    bar_recorder.flush()
+    # Pooled aiosqlite connections hold threads that would block the exit
+    await async_engine.dispose()
+    await async_read_engine.dispose()
+
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     generate_unique_id_function=custom_generate_unique_id,
+    lifespan=lifespan,
 )
 
+
+@app.exception_handler(PasswordHasherBusyError)
+async def password_hasher_busy_handler(
+    request: Request, exc: PasswordHasherBusyError
+) -> JSONResponse:
+    return JSONResponse(
+        status_code=429,
+        content={"detail": "Too many password checks in progress, retry shortly"},
+        headers={"Retry-After": "1"},
+    )
+
+
 # Set all CORS enabled origins
 if settings.all_cors_origins:
     app.add_middleware(
@@ -10,7 +10,50 @@ from .user import (
     ItemUpdate,
 )
 
-from .transaction import Transaction, TransactionCreate
+from .transaction import (
+    SymbolStatsPublic,
+    Transaction,
+    TransactionArchive,
+    TransactionArchiveMonth,
+    TransactionBulkError,
+    TransactionBulkResult,
+    TransactionCreate,
+    TransactionStats,
+    TransactionStatsSummary,
+    TransactionsPublic,
+)
+from .position import Position, PositionPublic, PositionsPublic
+from .quote import Quote
+from .security import SecuritySearchResult
+from .alert import (
+    PriceAlert,
+    PriceAlertCreate,
+    PriceAlertPublic,
+    PriceAlertsPublic,
+    TriggeredAlertPublic,
+)
+from .wallet import Deposit, DepositCreate, Wallet, WalletPublic
+from .watchlist import (
+    Watchlist,
+    WatchlistItem,
+    WatchlistItemCreate,
+    WatchlistItemPublic,
+    WatchlistPublic,
+)
+from .market import MarketStatusPublic, TradingSessionPublic
+from .news import (
+    NewsArticle,
+    NewsArticleCreate,
+    NewsArticlePublic,
+    NewsArticlesPublic,
+)
+from .portfolio import PerformancePointPublic, PortfolioPerformancePublic
+from .analytics import (
+    DailyActivitiesPublic,
+    DailyActivityPublic,
+    SymbolActivityPublic,
+    TopSymbolsPublic,
+)
 
 __all__ = [
     "Message",
@@ -23,5 +66,44 @@ __all__ = [
     "ItemsPublic",
     "ItemUpdate",
     "Transaction",
+    "TransactionArchive",
+    "TransactionArchiveMonth",
     "TransactionCreate",
+    "TransactionBulkError",
+    "TransactionBulkResult",
+    "TransactionStats",
+    "TransactionStatsSummary",
+    "TransactionsPublic",
+    "SymbolStatsPublic",
+    "Position",
+    "PositionPublic",
+    "PositionsPublic",
+    "Quote",
+    "SecuritySearchResult",
+    "PriceAlert",
+    "PriceAlertCreate",
+    "PriceAlertPublic",
+    "PriceAlertsPublic",
+    "TriggeredAlertPublic",
+    "Deposit",
+    "DepositCreate",
+    "Wallet",
+    "WalletPublic",
+    "Watchlist",
+    "WatchlistItem",
+    "WatchlistItemCreate",
+    "WatchlistItemPublic",
+    "WatchlistPublic",
+    "MarketStatusPublic",
+    "TradingSessionPublic",
+    "NewsArticle",
+    "NewsArticleCreate",
+    "NewsArticlePublic",
+    "NewsArticlesPublic",
+    "PerformancePointPublic",
+    "PortfolioPerformancePublic",
+    "DailyActivitiesPublic",
+    "DailyActivityPublic",
+    "SymbolActivityPublic",
+    "TopSymbolsPublic",
 ]
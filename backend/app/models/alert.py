@@ -0,0 +1,74 @@
+import datetime
+import uuid
+from enum import StrEnum
+
+from sqlalchemy import Enum as SQLEnum
+from sqlalchemy import Index
+
+from app.models.models import Field, Relationship, SQLModel
+from app.models.user import User
+
+
+class AlertDirection(StrEnum):
+    # Triggered once the price rises to the target, or falls to it
+    ABOVE = "above"
+    BELOW = "below"
+
+
+class PriceAlertBase(SQLModel):
+    symbol: str = Field(min_length=1, max_length=99)
+    target_price: float = Field(gt=0)
+    direction: AlertDirection = Field(sa_type=SQLEnum(AlertDirection))
+    note: str = Field(default="", max_length=255)
+
+
+class PriceAlertCreate(PriceAlertBase):
+    pass
+
+
+# Database model. Alerts fire once: the evaluation engine deactivates them and
+# records the price that triggered them
+class PriceAlert(PriceAlertBase, table=True):
+    __table_args__ = (
+        Index("ix_pricealert_user_id_created_at", "user_id", "created_at", "id"),
+        # The engine loads the active alerts at startup
+        Index("ix_pricealert_is_active", "is_active"),
+    )
+
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    user_id: uuid.UUID = Field(
+        foreign_key="user.id", nullable=False, ondelete="CASCADE"
+    )
+    security_id: uuid.UUID = Field(foreign_key="security.id", nullable=False)
+    created_at: datetime.datetime = Field(default_factory=datetime.datetime.now)
+    is_active: bool = Field(default=True)
+    triggered_at: datetime.datetime | None = Field(default=None)
+    triggered_price: float | None = Field(default=None)
+    user: User | None = Relationship(back_populates="price_alerts")
+
+
+# Properties to return via API, with the latest quote when one is cached
+class PriceAlertPublic(PriceAlertBase):
+    id: uuid.UUID
+    security_id: uuid.UUID
+    created_at: datetime.datetime
+    is_active: bool
+    triggered_at: datetime.datetime | None
+    triggered_price: float | None
+    current_price: float | None = None
+
+
+class PriceAlertsPublic(SQLModel):
+    data: list[PriceAlertPublic]
+    count: int
+    next_cursor: str | None = None
+
+
+# Pushed on the quote streams of its user when an alert fires
+class TriggeredAlertPublic(SQLModel):
+    id: uuid.UUID
+    symbol: str
+    direction: AlertDirection
+    target_price: float
+    triggered_price: float
+    triggered_at: datetime.datetime
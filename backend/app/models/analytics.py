@@ -0,0 +1,31 @@
+import datetime
+
+from app.models.models import SQLModel
+
+
+# Completed trades of a symbol over a range of days, across every user
+class SymbolActivityPublic(SQLModel):
+    symbol: str
+    trade_count: int
+    quantity: float
+    volume: float
+    average_price: float
+
+
+class TopSymbolsPublic(SQLModel):
+    data: list[SymbolActivityPublic]
+    since: datetime.date
+    until: datetime.date
+    # Last day included in the snapshot, None until the first export
+    snapshot_through: datetime.date | None
+
+
+class DailyActivityPublic(SymbolActivityPublic):
+    date: datetime.date
+
+
+class DailyActivitiesPublic(SQLModel):
+    data: list[DailyActivityPublic]
+    since: datetime.date
+    until: datetime.date
+    snapshot_through: datetime.date | None
@@ -0,0 +1,20 @@
+import datetime
+
+from app.models.models import SQLModel
+
+
+class TradingSessionPublic(SQLModel):
+    date: datetime.date
+    open: datetime.datetime
+    close: datetime.datetime
+    early_close: bool
+
+
+class MarketStatusPublic(SQLModel):
+    exchange: str
+    timezone: str
+    is_open: bool
+    # Today's session in the exchange's time zone, None on days without trading
+    session: TradingSessionPublic | None
+    next_open: datetime.datetime | None
+    next_close: datetime.datetime | None
@@ -0,0 +1,49 @@
+import datetime
+
+from sqlalchemy import JSON, Index, UniqueConstraint
+
+from app.models.models import Field, SQLModel
+
+
+class NewsArticleBase(SQLModel):
+    headline: str = Field(max_length=500)
+    summary: str = Field(default="", max_length=5000)
+    # Publisher, e.g. "Reuters"
+    source: str = Field(default="", max_length=100)
+    url: str | None = Field(default=None, max_length=2000)
+    image_url: str | None = Field(default=None, max_length=2000)
+    category: str = Field(default="general", max_length=50)
+    sentiment: str | None = Field(default=None, max_length=20)
+    published_at: datetime.datetime
+    symbols: list[str] = Field(default_factory=list, sa_type=JSON)
+
+
+# As read from a news source, `external_id` being the source's own id
+class NewsArticleCreate(NewsArticleBase):
+    external_id: str = Field(max_length=255)
+
+
+# Database model. Kept for the retention period only, see app.services.news
+class NewsArticle(NewsArticleBase, table=True):
+    __table_args__ = (
+        UniqueConstraint("provider", "external_id"),
+        Index("ix_newsarticle_published_at", "published_at"),
+        # Every process picks up the articles ingested by the others by
+        # reading the rows ingested since its last sync
+        Index("ix_newsarticle_ingested_at_id", "ingested_at", "id"),
+    )
+
+    id: int | None = Field(default=None, primary_key=True)
+    provider: str = Field(max_length=50)
+    external_id: str = Field(max_length=255)
+    ingested_at: datetime.datetime = Field(default_factory=datetime.datetime.now)
+
+
+# Properties to return via API
+class NewsArticlePublic(NewsArticleBase):
+    id: int
+
+
+class NewsArticlesPublic(SQLModel):
+    data: list[NewsArticlePublic]
+    next_cursor: str | None = None
@@ -0,0 +1,23 @@
+import datetime
+
+from app.models.models import SQLModel
+
+
+class PerformancePointPublic(SQLModel):
+    date: datetime.date
+    label: str
+    # Market value of the holdings at the close
+    value: float
+
+
+class PortfolioPerformancePublic(SQLModel):
+    period: str
+    data: list[PerformancePointPublic]
+    # Growth of the holdings, regardless of when and how much was bought or sold
+    time_weighted_return: float
+    # XIRR of the trades, annualized for periods of a year or more
+    money_weighted_return: float | None
+    # Largest fall from a peak of the time weighted growth, e.g. -0.1 for 10%
+    max_drawdown: float
+    # Annualized standard deviation of the daily returns
+    volatility: float | None
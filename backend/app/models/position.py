@@ -0,0 +1,38 @@
+import uuid
+
+from sqlalchemy import UniqueConstraint
+
+from app.models.models import Field, Relationship, SQLModel
+from app.models.user import User
+
+
+class PositionBase(SQLModel):
+    symbol: str = Field(min_length=1, max_length=99)
+    quantity: float = Field(default=0.0)
+    # Total cost of the shares still held (average cost method)
+    cost_basis: float = Field(default=0.0)
+    realized_pnl: float = Field(default=0.0)
+
+
+# Database model, materialized from the completed transactions of a user
+class Position(PositionBase, table=True):
+    __table_args__ = (UniqueConstraint("user_id", "security_id"),)
+
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    user_id: uuid.UUID = Field(
+        foreign_key="user.id", nullable=False, ondelete="CASCADE"
+    )
+    security_id: uuid.UUID = Field(foreign_key="security.id", nullable=False)
+    user: User | None = Relationship(back_populates="positions")
+
+
+# Properties to return via API
+class PositionPublic(PositionBase):
+    id: uuid.UUID
+    security_id: uuid.UUID
+    average_cost: float
+
+
+class PositionsPublic(SQLModel):
+    data: list[PositionPublic]
+    count: int
@@ -0,0 +1,15 @@
+import datetime
+
+from app.models.models import SQLModel
+
+
+class Quote(SQLModel):
+    symbol: str
+    price: float
+    change: float
+    change_percent: float
+    open: float
+    high: float
+    low: float
+    previous_close: float
+    timestamp: datetime.datetime
@@ -38,3 +38,15 @@ class SecurityUpdate(SQLModel):
 
 class Security(SecurityBase, table=True):
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+
+
+# Autocomplete match, with the latest quote when one is cached
+class SecuritySearchResult(SQLModel):
+    symbol: str
+    name: str
+    security_type: SecurityType
+    market: str
+    currency: str
+    price: float | None = None
+    change: float | None = None
+    change_percent: float | None = None
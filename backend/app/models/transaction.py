@@ -2,7 +2,7 @@ import uuid
 import datetime
 from enum import StrEnum
 
-from sqlalchemy import Column, Enum as SQLEnum
+from sqlalchemy import Enum as SQLEnum, Index
 from app.models.models import Field, Relationship, SQLModel
 from app.models.user import User
 
@@ -36,25 +36,31 @@ class TransactionBase(SQLModel):
     symbol: str = Field(min_length=1, max_length=99)
     quantity: float = Field(gt=0)
     price_per_unit: float = Field(gt=0)
+    # sa_type rather than sa_column, so the archive table gets columns of its own
     transaction_type: TransactionType = Field(
-        sa_column=Column(SQLEnum(TransactionType))
+        sa_type=SQLEnum(TransactionType), nullable=True
     )
     order_type: TransactionOrderType = Field(
-        sa_column=Column(SQLEnum(TransactionOrderType)),
+        sa_type=SQLEnum(TransactionOrderType),
+        nullable=True,
         default=TransactionOrderType.MARKET,
     )
     options_contract: TransactionOptionsContract = Field(
-        sa_column=Column(SQLEnum(TransactionOptionsContract)),
+        sa_type=SQLEnum(TransactionOptionsContract),
+        nullable=True,
         default=TransactionOptionsContract.NONE,
     )
     status: TransactionStatus = Field(
-        sa_column=Column(SQLEnum(TransactionStatus)), default=TransactionStatus.PENDING
+        sa_type=SQLEnum(TransactionStatus),
+        nullable=True,
+        default=TransactionStatus.PENDING,
     )
     security_id: uuid.UUID = Field(foreign_key="security.id", nullable=False)
 
 
 class TransactionCreate(TransactionBase):
-    pass
+    # Resolved from the symbol when left out
+    security_id: uuid.UUID | None = None
 
 
 class TransactionSell(TransactionBase):
@@ -66,9 +72,86 @@ class TransactionBuy(TransactionBase):
 
 
 class Transaction(TransactionBase, table=True):
+    # Match the per-user access patterns of the transactions router
+    __table_args__ = (
+        Index("ix_transaction_user_id_timestamp", "user_id", "timestamp", "id"),
+        Index("ix_transaction_user_id_symbol", "user_id", "symbol"),
+    )
+
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     user_id: uuid.UUID = Field(
         foreign_key="user.id",
         nullable=False,  # , ondelete="CASCADE"
     )
+    # When the transaction completed and was applied to the user's position:
+    # its timestamp when it completed as it was placed, later for resting
+    # orders. Replaying the ledger in this order rebuilds the positions
+    filled_at: datetime.datetime | None = None
     user: User | None = Relationship(back_populates="transactions")
+
+
+# Completed transactions of past months, moved out of the transaction table by
+# app.archive_transactions so it only holds recent history. Nothing else
+# writes to it; the transactions router reads it for ranges reaching back.
+class TransactionArchive(TransactionBase, table=True):
+    __table_args__ = (
+        Index("ix_transactionarchive_user_id_timestamp", "user_id", "timestamp", "id"),
+    )
+
+    id: uuid.UUID = Field(primary_key=True)
+    user_id: uuid.UUID = Field(
+        foreign_key="user.id", nullable=False, ondelete="CASCADE"
+    )
+    filled_at: datetime.datetime | None = None
+
+
+# One row per month moved to the archive, reads that start after the latest
+# one don't need to look at the archive
+class TransactionArchiveMonth(SQLModel, table=True):
+    # First day of the month
+    month: datetime.date = Field(primary_key=True)
+    row_count: int = Field(default=0)
+    archived_at: datetime.datetime = Field(default_factory=datetime.datetime.now)
+
+
+class TransactionsPublic(SQLModel):
+    data: list[Transaction]
+    count: int
+    next_cursor: str | None = None
+
+
+class TransactionBulkError(SQLModel):
+    # Position of the row in the submitted list or NDJSON stream
+    index: int
+    detail: str
+
+
+class TransactionBulkResult(SQLModel):
+    inserted: int
+    errors: list[TransactionBulkError]
+
+
+# Rollup of a user's transactions per symbol, kept up to date as they are created
+class TransactionStats(SQLModel, table=True):
+    user_id: uuid.UUID = Field(
+        foreign_key="user.id", primary_key=True, ondelete="CASCADE"
+    )
+    symbol: str = Field(primary_key=True, max_length=99)
+    total_count: int = Field(default=0)
+    total_volume: float = Field(default=0.0)
+    # Sum of price_per_unit, so the average price is price_sum / total_count
+    price_sum: float = Field(default=0.0)
+    user: User | None = Relationship(back_populates="transaction_stats")
+
+
+class SymbolStatsPublic(SQLModel):
+    symbol: str
+    total_count: int
+    total_volume: float
+    average_price: float
+
+
+class TransactionStatsSummary(SQLModel):
+    total_count: int
+    total_volume: float
+    symbols: list[SymbolStatsPublic]
@@ -1,11 +1,16 @@
 import uuid
 
 from pydantic import EmailStr, BaseModel
+from sqlalchemy import Index
 from app.models.models import Field, Relationship, SQLModel
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
-    from .transaction import Transaction
+    from .alert import PriceAlert
+    from .position import Position
+    from .transaction import Transaction, TransactionStats
+    from .wallet import Wallet
+    from .watchlist import Watchlist
 
 
 # Shared properties
@@ -52,6 +57,23 @@ class User(UserBase, table=True):
     transactions: list["Transaction"] = Relationship(
         back_populates="user", cascade_delete=True
     )
+    positions: list["Position"] = Relationship(
+        back_populates="user", cascade_delete=True
+    )
+    transaction_stats: list["TransactionStats"] = Relationship(
+        back_populates="user", cascade_delete=True
+    )
+    price_alerts: list["PriceAlert"] = Relationship(
+        back_populates="user", cascade_delete=True
+    )
+    watchlists: list["Watchlist"] = Relationship(
+        back_populates="user", cascade_delete=True
+    )
+    wallet: "Wallet" = Relationship(
+        back_populates="user",
+        cascade_delete=True,
+        sa_relationship_kwargs={"uselist": False},
+    )
 
 
 # Properties to return via API, id is always required
@@ -66,7 +88,9 @@ class UserPublic(UserBase):
 
 class UsersPublic(SQLModel):
     data: list[UserPublic]
-    count: int
+    # Only counted for the first page, not when following a cursor
+    count: int | None = None
+    next_cursor: str | None = None
 
 
 # Shared properties
@@ -87,6 +111,8 @@ class ItemUpdate(ItemBase):
 
 # Database model, database table inferred from class name
 class Item(ItemBase, table=True):
+    __table_args__ = (Index("ix_item_owner_id_id", "owner_id", "id"),)
+
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     owner_id: uuid.UUID = Field(
         foreign_key="user.id", nullable=False, ondelete="CASCADE"
@@ -102,7 +128,9 @@ class ItemPublic(ItemBase):
 
 class ItemsPublic(SQLModel):
     data: list[ItemPublic]
-    count: int
+    # Only counted for the first page, not when following a cursor
+    count: int | None = None
+    next_cursor: str | None = None
 
 
 # Generic message
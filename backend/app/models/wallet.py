@@ -0,0 +1,44 @@
+import datetime
+import uuid
+
+from sqlalchemy import Index
+
+from app.models.models import Field, Relationship, SQLModel
+from app.models.user import User
+
+
+# Database model, a user's cash available to spend: buy orders take their
+# cost when they're placed, sells and deposits add to it. Every change is a
+# conditional UPDATE committed with the order or deposit, the balance is
+# never recomputed from the ledger
+class Wallet(SQLModel, table=True):
+    user_id: uuid.UUID = Field(
+        foreign_key="user.id", primary_key=True, ondelete="CASCADE"
+    )
+    balance: float = Field(default=0.0)
+    currency: str = Field(default="USD", max_length=3)
+    updated_at: datetime.datetime = Field(default_factory=datetime.datetime.now)
+    user: User | None = Relationship(back_populates="wallet")
+
+
+class DepositCreate(SQLModel):
+    amount: float = Field(gt=0)
+
+
+# Database model, the cash a user added to their wallet
+class Deposit(SQLModel, table=True):
+    __table_args__ = (Index("ix_deposit_user_id_timestamp", "user_id", "timestamp"),)
+
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    user_id: uuid.UUID = Field(
+        foreign_key="user.id", nullable=False, ondelete="CASCADE"
+    )
+    amount: float
+    timestamp: datetime.datetime = Field(default_factory=datetime.datetime.now)
+
+
+# Properties to return via API
+class WalletPublic(SQLModel):
+    balance: float
+    currency: str
+    updated_at: datetime.datetime | None = None
@@ -0,0 +1,58 @@
+import datetime
+import uuid
+
+from sqlalchemy import UniqueConstraint
+
+from app.models.models import Field, Relationship, SQLModel
+from app.models.user import User
+
+
+# Database model, one per user. `version` is bumped by every change of the
+# items, the watchlist routes use it as their ETag
+class Watchlist(SQLModel, table=True):
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    user_id: uuid.UUID = Field(
+        foreign_key="user.id", nullable=False, unique=True, ondelete="CASCADE"
+    )
+    version: int = Field(default=0)
+    updated_at: datetime.datetime = Field(default_factory=datetime.datetime.now)
+    user: User | None = Relationship(back_populates="watchlists")
+    items: list["WatchlistItem"] = Relationship(
+        back_populates="watchlist", cascade_delete=True
+    )
+
+
+class WatchlistItemCreate(SQLModel):
+    symbol: str = Field(min_length=1, max_length=99)
+
+
+# Database model
+class WatchlistItem(SQLModel, table=True):
+    __table_args__ = (UniqueConstraint("watchlist_id", "security_id"),)
+
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    watchlist_id: uuid.UUID = Field(
+        foreign_key="watchlist.id", nullable=False, ondelete="CASCADE"
+    )
+    security_id: uuid.UUID = Field(foreign_key="security.id", nullable=False)
+    symbol: str = Field(min_length=1, max_length=99)
+    added_at: datetime.datetime = Field(default_factory=datetime.datetime.now)
+    watchlist: Watchlist | None = Relationship(back_populates="items")
+
+
+# Properties to return via API, with the security's name and latest quote
+class WatchlistItemPublic(SQLModel):
+    id: uuid.UUID
+    symbol: str
+    security_id: uuid.UUID
+    name: str
+    added_at: datetime.datetime
+    price: float | None = None
+    change: float | None = None
+    change_percent: float | None = None
+
+
+class WatchlistPublic(SQLModel):
+    data: list[WatchlistItemPublic]
+    count: int
+    version: int
@@ -0,0 +1,90 @@
+import argparse
+import logging
+import math
+import sys
+from collections.abc import Iterator
+
+from sqlmodel import Session, delete, select
+
+from app import crud
+from app.core.db import engine
+from app.models import Position, Transaction
+from app.models.transaction import TransactionStatus
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+POSITION_FIELDS = ("quantity", "cost_basis", "realized_pnl")
+
+
+def _ledger(session: Session) -> Iterator[Transaction]:
+    # Archived months are part of the ledger as well. Fills are replayed in
+    # the order they were applied to the positions, a resting order's when
+    # it filled rather than when it was placed
+    rows = crud.select_transaction_rows(
+        lambda model: [model.status == TransactionStatus.COMPLETED],
+        include_archive=True,
+        order_by="filled_at",
+    )
+    statement = select(Transaction).from_statement(rows)
+    return session.exec(statement.execution_options(yield_per=1000)).scalars()
+
+
+def find_mismatches(session: Session) -> list[str]:
+    """
+    Compare the materialized positions against a replay of the ledger.
+    """
+    expected = crud.compute_positions_from_ledger(_ledger(session))
+    actual = {
+        (p.user_id, p.security_id): p for p in session.exec(select(Position)).all()
+    }
+    mismatches = []
+    for key in expected.keys() | actual.keys():
+        want, have = expected.get(key), actual.get(key)
+        for field in POSITION_FIELDS:
+            want_value = getattr(want, field) if want else 0.0
+            have_value = getattr(have, field) if have else 0.0
+            if not math.isclose(want_value, have_value, abs_tol=1e-6):
+                mismatches.append(
+                    f"user={key[0]} security={key[1]} {field}: "
+                    f"ledger={want_value} materialized={have_value}"
+                )
+    return mismatches
+
+
+def rebuild(session: Session) -> int:
+    """
+    Replace the materialized positions with a replay of the ledger.
+    """
+    positions = crud.compute_positions_from_ledger(_ledger(session))
+    session.exec(delete(Position))  # type: ignore
+    session.add_all(positions.values())
+    session.commit()
+    return len(positions)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Rebuild materialized positions from the transaction ledger"
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="only report differences between the positions and the ledger",
+    )
+    args = parser.parse_args()
+    with Session(engine) as session:
+        if args.check:
+            mismatches = find_mismatches(session)
+            for mismatch in mismatches:
+                logger.error(mismatch)
+            if mismatches:
+                sys.exit(1)
+            logger.info("Positions match the ledger")
+        else:
+            count = rebuild(session)
+            logger.info("Rebuilt %d positions from the ledger", count)
+
+
+if __name__ == "__main__":
+    main()
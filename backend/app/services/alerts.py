@@ -0,0 +1,310 @@
+import bisect
+import datetime
+import logging
+import threading
+import uuid
+from collections import defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from sqlmodel import col, select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.alert import AlertDirection, PriceAlert, TriggeredAlertPublic
+from app.models.quote import Quote
+from app.services.streaming import quote_stream
+
+logger = logging.getLogger(__name__)
+
+# Alerts claimed per UPDATE, within the bound parameter limits of SQLite
+CLAIM_CHUNK_SIZE = 500
+
+
+@dataclass
+class ActiveAlert:
+    id: uuid.UUID
+    user_id: uuid.UUID
+    symbol: str
+    direction: AlertDirection
+    target_price: float
+
+
+@dataclass
+class TriggeredAlert:
+    alert: ActiveAlert
+    price: float
+    timestamp: datetime.datetime
+
+
+class AlertBook:
+    """
+    Active alerts of one symbol, in two sorted arrays arranged so that the
+    alerts a price crosses are always at their tail: "above" targets from
+    the highest to the lowest (stored as ascending negated keys), "below"
+    targets from the lowest to the highest. A tick bisects each array and
+    cuts off its tail, O(log n + fired).
+    """
+
+    def __init__(self) -> None:
+        self.above_keys: list[float] = []
+        self.above: list[ActiveAlert] = []
+        self.below_keys: list[float] = []
+        self.below: list[ActiveAlert] = []
+
+    def __len__(self) -> int:
+        return len(self.above) + len(self.below)
+
+    def _side(self, alert: ActiveAlert) -> tuple[list[float], list[ActiveAlert], float]:
+        if alert.direction == AlertDirection.ABOVE:
+            return self.above_keys, self.above, -alert.target_price
+        return self.below_keys, self.below, alert.target_price
+
+    def add(self, alert: ActiveAlert) -> None:
+        keys, alerts, key = self._side(alert)
+        index = bisect.bisect_right(keys, key)
+        keys.insert(index, key)
+        alerts.insert(index, alert)
+
+    def extend(self, alerts: Iterable[ActiveAlert]) -> None:
+        """
+        Add many alerts at once, sorting each side once.
+        """
+        for alert in alerts:
+            keys, side, key = self._side(alert)
+            keys.append(key)
+            side.append(alert)
+        for keys, side in (
+            (self.above_keys, self.above),
+            (self.below_keys, self.below),
+        ):
+            order = sorted(range(len(keys)), key=keys.__getitem__)
+            keys[:] = [keys[index] for index in order]
+            side[:] = [side[index] for index in order]
+
+    def remove(self, alert: ActiveAlert) -> bool:
+        keys, alerts, key = self._side(alert)
+        index = bisect.bisect_left(keys, key)
+        while index < len(keys) and keys[index] == key:
+            if alerts[index].id == alert.id:
+                del keys[index]
+                del alerts[index]
+                return True
+            index += 1
+        return False
+
+    def crossed(self, price: float) -> list[ActiveAlert]:
+        """
+        Remove and return the alerts `price` triggers: "above" targets at or
+        below it and "below" targets at or above it.
+        """
+        above = bisect.bisect_left(self.above_keys, -price)
+        below = bisect.bisect_left(self.below_keys, price)
+        fired = self.above[above:] + self.below[below:]
+        del self.above_keys[above:], self.above[above:]
+        del self.below_keys[below:], self.below[below:]
+        return fired
+
+
+class AlertEngine:
+    """
+    In-memory alert books for the active price alerts of every symbol.
+    """
+
+    def __init__(self) -> None:
+        self._books: dict[str, AlertBook] = {}
+        self._alerts: dict[uuid.UUID, ActiveAlert] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._alerts)
+
+    def symbols(self) -> list[str]:
+        with self._lock:
+            return list(self._books)
+
+    def add(self, alert: ActiveAlert) -> None:
+        with self._lock:
+            self._books.setdefault(alert.symbol, AlertBook()).add(alert)
+            self._alerts[alert.id] = alert
+
+    def load(self, alerts: Iterable[ActiveAlert]) -> None:
+        """
+        Replace every alert, building each book in one sort.
+        """
+        by_symbol: dict[str, list[ActiveAlert]] = defaultdict(list)
+        for alert in alerts:
+            by_symbol[alert.symbol].append(alert)
+        books = {}
+        for symbol, symbol_alerts in by_symbol.items():
+            books[symbol] = AlertBook()
+            books[symbol].extend(symbol_alerts)
+        with self._lock:
+            self._books = books
+            self._alerts = {
+                alert.id: alert
+                for symbol_alerts in by_symbol.values()
+                for alert in symbol_alerts
+            }
+
+    def cancel(self, alert_id: uuid.UUID) -> bool:
+        with self._lock:
+            alert = self._alerts.pop(alert_id, None)
+            if alert is None:
+                return False
+            book = self._books[alert.symbol]
+            book.remove(alert)
+            if not book:
+                del self._books[alert.symbol]
+            return True
+
+    def on_price(self, symbol: str, price: float) -> list[ActiveAlert]:
+        with self._lock:
+            book = self._books.get(symbol)
+            if not book:
+                return []
+            fired = book.crossed(price)
+            for alert in fired:
+                del self._alerts[alert.id]
+            if not book:
+                del self._books[symbol]
+            return fired
+
+    def clear(self) -> None:
+        with self._lock:
+            self._books.clear()
+            self._alerts.clear()
+
+
+class AlertDispatcher:
+    """
+    Evaluates the quotes of the market data service against the alert
+    engine, and settles the alerts they trigger in batches: one claiming
+    UPDATE and one commit per batch, then one stream message per user.
+    """
+
+    def __init__(self, engine: AlertEngine) -> None:
+        self.engine = engine
+        self._pending: list[TriggeredAlert] = []
+        self._lock = threading.Lock()
+
+    def on_quote(self, quote: Quote) -> None:
+        """
+        Market data listener, called on its worker threads.
+        """
+        fired = self.engine.on_price(quote.symbol, quote.price)
+        if fired:
+            with self._lock:
+                # Stored like the other timestamps, naive local time
+                timestamp = quote.timestamp.astimezone().replace(tzinfo=None)
+                self._pending.extend(
+                    TriggeredAlert(alert=alert, price=quote.price, timestamp=timestamp)
+                    for alert in fired
+                )
+
+    async def _claim(
+        self, session: AsyncSession, batch: list[TriggeredAlert]
+    ) -> list[TriggeredAlert]:
+        # Only one process may fire an alert, whichever deactivates it first
+        claimed: set[uuid.UUID] = set()
+        for start in range(0, len(batch), CLAIM_CHUNK_SIZE):
+            chunk = batch[start : start + CLAIM_CHUNK_SIZE]
+            result = await session.exec(
+                update(PriceAlert)  # type: ignore
+                .where(
+                    col(PriceAlert.id).in_([t.alert.id for t in chunk]),
+                    col(PriceAlert.is_active),
+                )
+                .values(is_active=False)
+                .returning(PriceAlert.id)
+            )
+            claimed.update(result.scalars())
+        triggered = [t for t in batch if t.alert.id in claimed]
+        if triggered:
+            await session.exec(
+                update(PriceAlert),  # type: ignore
+                params=[
+                    {
+                        "id": t.alert.id,
+                        "triggered_price": t.price,
+                        "triggered_at": t.timestamp,
+                    }
+                    for t in triggered
+                ],
+            )
+        await session.commit()
+        return triggered
+
+    async def dispatch(self, session: AsyncSession) -> list[TriggeredAlert]:
+        with self._lock:
+            batch, self._pending = self._pending, []
+        if not batch:
+            return []
+        try:
+            triggered = await self._claim(session, batch)
+        except Exception:
+            # Nothing was claimed, so the batch is retried by the next dispatch
+            with self._lock:
+                self._pending[:0] = batch
+            raise
+        by_user: dict[uuid.UUID, list[str]] = defaultdict(list)
+        for t in triggered:
+            by_user[t.alert.user_id].append(
+                TriggeredAlertPublic(
+                    id=t.alert.id,
+                    symbol=t.alert.symbol,
+                    direction=t.alert.direction,
+                    target_price=t.alert.target_price,
+                    triggered_price=t.price,
+                    triggered_at=t.timestamp,
+                ).model_dump_json()
+            )
+        for user_id, alerts in by_user.items():
+            quote_stream.notify(user_id, "alerts", "[" + ",".join(alerts) + "]")
+        if triggered:
+            logger.info("Triggered %d price alerts", len(triggered))
+        return triggered
+
+
+alert_engine = AlertEngine()
+alert_dispatcher = AlertDispatcher(alert_engine)
+
+
+def submit_alert(alert: PriceAlert) -> None:
+    """
+    Evaluate a committed active alert from the next tick of its symbol.
+    """
+    alert_engine.add(
+        ActiveAlert(
+            id=alert.id,
+            user_id=alert.user_id,
+            symbol=alert.symbol,
+            direction=alert.direction,
+            target_price=alert.target_price,
+        )
+    )
+
+
+async def load_active_alerts(session: AsyncSession) -> int:
+    """
+    Rebuild the alert books from the active alerts in the database.
+    """
+    rows = await session.exec(
+        select(
+            PriceAlert.id,
+            PriceAlert.user_id,
+            PriceAlert.symbol,
+            PriceAlert.direction,
+            PriceAlert.target_price,
+        ).where(col(PriceAlert.is_active))
+    )
+    alert_engine.load(
+        ActiveAlert(
+            id=id,
+            user_id=user_id,
+            symbol=symbol,
+            direction=direction,
+            target_price=target_price,
+        )
+        for id, user_id, symbol, direction, target_price in rows
+    )
+    return len(alert_engine)
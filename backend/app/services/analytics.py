@@ -0,0 +1,226 @@
+import asyncio
+import datetime
+import json
+import shutil
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+from app.core.config import settings
+
+# Columns of the completed transactions in the snapshot; the trade date and the
+# symbol are the partition keys, encoded in the directory names
+SNAPSHOT_SCHEMA = pa.schema(
+    [
+        ("id", pa.string()),
+        ("user_id", pa.string()),
+        ("security_id", pa.string()),
+        ("symbol", pa.string()),
+        ("timestamp", pa.timestamp("us")),
+        ("quantity", pa.float64()),
+        ("price_per_unit", pa.float64()),
+        ("transaction_type", pa.string()),
+        ("order_type", pa.string()),
+        ("options_contract", pa.string()),
+    ]
+)
+PARTITIONING = ds.partitioning(
+    pa.schema([("date", pa.date32()), ("symbol", pa.string())]), flavor="hive"
+)
+SYMBOL_PARTITIONING = ds.partitioning(
+    pa.schema([("symbol", pa.string())]), flavor="hive"
+)
+
+# Files starting with "_" are ignored by the dataset discovery
+MANIFEST_FILE = "_manifest.json"
+STAGING_DIR = "_staging"
+
+ACTIVITY_COLUMNS = ["trade_count", "quantity", "volume", "price_sum"]
+
+
+def _aggregate(table: pa.Table, keys: list[str]) -> pa.Table:
+    # Partial sums, so the aggregates of every batch can be added up
+    notional = pc.multiply(table["quantity"], table["price_per_unit"])
+    table = table.append_column("volume", notional)
+    grouped = table.group_by(keys).aggregate(
+        [
+            ([], "count_all"),
+            ("quantity", "sum"),
+            ("volume", "sum"),
+            ("price_per_unit", "sum"),
+        ]
+    )
+    return grouped.rename_columns(
+        {
+            "count_all": "trade_count",
+            "quantity_sum": "quantity",
+            "volume_sum": "volume",
+            "price_per_unit_sum": "price_sum",
+        }
+    )
+
+
+def _combine(partials: list[pa.Table], keys: list[str]) -> list[dict[str, Any]]:
+    if not partials:
+        return []
+    table = (
+        pa.concat_tables(partials)
+        .group_by(keys)
+        .aggregate([(column, "sum") for column in ACTIVITY_COLUMNS])
+    )
+    rows = table.rename_columns(
+        {f"{column}_sum": column for column in ACTIVITY_COLUMNS}
+    ).to_pylist()
+    for row in rows:
+        row["average_price"] = row.pop("price_sum") / row["trade_count"]
+    return rows
+
+
+class SnapshotStore:
+    """
+    Columnar copy of the completed transactions, as Parquet files partitioned
+    by trade date and symbol, for analytics across every user's trades.
+
+    Written a whole day at a time by app.export_snapshots; reads only scan the
+    files of the days and symbols they ask for, never the database.
+    """
+
+    def __init__(self, path: str | Path, *, max_workers: int) -> None:
+        self.path = Path(path)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="analytics"
+        )
+        self._dataset: ds.Dataset | None = None
+        self._dataset_version: int | None = None
+
+    # Writing, from the exporter
+
+    def read_manifest(self) -> dict[str, Any]:
+        try:
+            return json.loads((self.path / MANIFEST_FILE).read_text())
+        except FileNotFoundError:
+            return {}
+
+    def write_manifest(self, manifest: dict[str, Any]) -> None:
+        self.path.mkdir(parents=True, exist_ok=True)
+        temporary = self.path / f"{MANIFEST_FILE}.tmp"
+        temporary.write_text(json.dumps(manifest))
+        temporary.replace(self.path / MANIFEST_FILE)
+
+    def _day_path(self, day: datetime.date) -> Path:
+        return self.path / f"date={day.isoformat()}"
+
+    def replace_day(self, day: datetime.date, table: pa.Table) -> None:
+        """
+        Replace the snapshot of a day with `table`, or remove it when empty.
+        The day is written aside and swapped in, readers never see half of it.
+        """
+        staging = self.path / STAGING_DIR / day.isoformat()
+        shutil.rmtree(staging, ignore_errors=True)
+        if table.num_rows:
+            ds.write_dataset(
+                table,
+                staging,
+                format="parquet",
+                partitioning=SYMBOL_PARTITIONING,
+                basename_template="part-{i}.parquet",
+            )
+        target = self._day_path(day)
+        previous = self.path / STAGING_DIR / f"{day.isoformat()}.previous"
+        if target.exists():
+            target.rename(previous)
+        if table.num_rows:
+            staging.rename(target)
+        shutil.rmtree(previous, ignore_errors=True)
+
+    # Reading, from the API
+
+    def _open(self) -> ds.Dataset | None:
+        # The exporter rewrites the manifest last, reopen the dataset to pick
+        # up the files of the days it replaced
+        try:
+            version = (self.path / MANIFEST_FILE).stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+        if version != self._dataset_version:
+            self._dataset = ds.dataset(
+                self.path,
+                schema=SNAPSHOT_SCHEMA.append(pa.field("date", pa.date32())),
+                format="parquet",
+                partitioning=PARTITIONING,
+            )
+            self._dataset_version = version
+        return self._dataset
+
+    @property
+    def exported_through(self) -> datetime.date | None:
+        """
+        The last day in the snapshot; later trades aren't in it yet.
+        """
+        day = self.read_manifest().get("exported_through")
+        return datetime.date.fromisoformat(day) if day else None
+
+    def _scan(self, expression: ds.Expression, keys: list[str]) -> list[dict[str, Any]]:
+        dataset = self._open()
+        if dataset is None:
+            return []
+        columns = list(dict.fromkeys(keys + ["quantity", "price_per_unit"]))
+        partials = [
+            _aggregate(pa.Table.from_batches([batch]), keys)
+            for batch in dataset.to_batches(columns=columns, filter=expression)
+            if batch.num_rows
+        ]
+        return _combine(partials, keys)
+
+    def top_symbols(
+        self, since: datetime.date, until: datetime.date, *, limit: int
+    ) -> list[dict[str, Any]]:
+        """
+        Trade count, quantity, volume and average price of the most traded
+        symbols, by volume, with trade dates from `since` to before `until`.
+        """
+        expression = (ds.field("date") >= since) & (ds.field("date") < until)
+        rows = self._scan(expression, ["symbol"])
+        rows.sort(key=lambda row: (-row["volume"], row["symbol"]))
+        return rows[:limit]
+
+    def daily_activity(
+        self, symbols: Iterable[str], since: datetime.date, until: datetime.date
+    ) -> list[dict[str, Any]]:
+        """
+        The same figures per symbol and trade date, ordered by date.
+        """
+        expression = (
+            ds.field("symbol").isin(list(symbols))
+            & (ds.field("date") >= since)
+            & (ds.field("date") < until)
+        )
+        rows = self._scan(expression, ["symbol", "date"])
+        rows.sort(key=lambda row: (row["date"], row["symbol"]))
+        return rows
+
+    async def top_symbols_async(
+        self, since: datetime.date, until: datetime.date, *, limit: int
+    ) -> list[dict[str, Any]]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, lambda: self.top_symbols(since, until, limit=limit)
+        )
+
+    async def daily_activity_async(
+        self, symbols: Iterable[str], since: datetime.date, until: datetime.date
+    ) -> list[dict[str, Any]]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, self.daily_activity, list(symbols), since, until
+        )
+
+
+snapshot_store = SnapshotStore(
+    settings.ANALYTICS_SNAPSHOT_PATH, max_workers=settings.ANALYTICS_MAX_WORKERS
+)
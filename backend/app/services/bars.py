@@ -0,0 +1,191 @@
+import asyncio
+import fcntl
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import quote as quote_path
+
+import numpy as np
+
+from app.core.config import settings
+from app.models.quote import Quote
+
+logger = logging.getLogger(__name__)
+
+# One fixed-width little-endian record per bar, `time` being the start of the
+# bar in seconds since the epoch (UTC)
+BAR_DTYPE = np.dtype(
+    [
+        ("time", "<i8"),
+        ("open", "<f8"),
+        ("high", "<f8"),
+        ("low", "<f8"),
+        ("close", "<f8"),
+        ("volume", "<f8"),
+    ]
+)
+INTERVAL_SECONDS = {"1m": 60, "5m": 5 * 60, "1h": 60 * 60, "1d": 24 * 60 * 60}
+
+
+def downsample(bars: np.ndarray, seconds: int) -> np.ndarray:
+    """
+    Merge consecutive bars into bars of `seconds`, aligned on the epoch.
+    """
+    if not len(bars) or seconds == INTERVAL_SECONDS["1m"]:
+        return bars
+    buckets = bars["time"] // seconds
+    starts = np.flatnonzero(np.diff(buckets, prepend=buckets[0] - 1))
+    ends = np.append(starts[1:], len(bars)) - 1
+    merged = np.empty(len(starts), dtype=BAR_DTYPE)
+    merged["time"] = buckets[starts] * seconds
+    merged["open"] = bars["open"][starts]
+    merged["high"] = np.maximum.reduceat(bars["high"], starts)
+    merged["low"] = np.minimum.reduceat(bars["low"], starts)
+    merged["close"] = bars["close"][ends]
+    merged["volume"] = np.add.reduceat(bars["volume"], starts)
+    return merged
+
+
+class BarStore:
+    """
+    1 minute OHLCV bars, one append-only file of BAR_DTYPE records per
+    symbol, read through memory maps. Bars are only ever appended in time
+    order, so a time range is a contiguous slice found by binary search.
+    """
+
+    def __init__(self, path: str | Path, *, max_workers: int) -> None:
+        self.path = Path(path)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="bars"
+        )
+        # Memory map and file size per symbol, remapped once the file grows
+        self._maps: dict[str, tuple[int, np.ndarray]] = {}
+        self._lock = threading.Lock()
+
+    def _file(self, symbol: str) -> Path:
+        return self.path / f"{quote_path(symbol.upper(), safe='')}.bars"
+
+    def append(self, symbol: str, bars: np.ndarray) -> int:
+        """
+        Append the bars later than the last stored one, returns how many.
+        Safe across processes, appends to a file are serialized by a lock.
+        """
+        self.path.mkdir(parents=True, exist_ok=True)
+        with open(self._file(symbol), "a+b") as file:
+            fcntl.flock(file, fcntl.LOCK_EX)
+            size = os.fstat(file.fileno()).st_size
+            # Drop the partial record of an interrupted append
+            size -= size % BAR_DTYPE.itemsize
+            file.truncate(size)
+            if size:
+                last = os.pread(
+                    file.fileno(), BAR_DTYPE.itemsize, size - BAR_DTYPE.itemsize
+                )
+                last_time = np.frombuffer(last, dtype=BAR_DTYPE)["time"][0]
+                bars = bars[bars["time"] > last_time]
+            file.write(np.ascontiguousarray(bars, dtype=BAR_DTYPE).tobytes())
+        return len(bars)
+
+    def bars(self, symbol: str) -> np.ndarray:
+        """
+        Every stored bar of a symbol, as a read-only memory map.
+        """
+        symbol = symbol.upper()
+        try:
+            size = self._file(symbol).stat().st_size
+        except FileNotFoundError:
+            return np.empty(0, dtype=BAR_DTYPE)
+        count = size // BAR_DTYPE.itemsize
+        with self._lock:
+            cached = self._maps.get(symbol)
+            if cached and cached[0] == count:
+                return cached[1]
+            if not count:
+                return np.empty(0, dtype=BAR_DTYPE)
+            bars = np.memmap(self._file(symbol), dtype=BAR_DTYPE, mode="r", shape=count)
+            self._maps[symbol] = (count, bars)
+            return bars
+
+    def history(self, symbol: str, start: int, end: int, seconds: int) -> np.ndarray:
+        """
+        The bars from `start` to before `end` (epoch seconds), downsampled to
+        bars of `seconds`. 1 minute bars are a view of the memory map.
+        """
+        bars = self.bars(symbol)
+        times = bars["time"]
+        low, high = np.searchsorted(times, [start, end])
+        return downsample(bars[low:high], seconds)
+
+    def daily_closes(self, symbol: str, start: int, days: int) -> np.ndarray:
+        """
+        The close of the last bar of each day from `start` (epoch seconds of a
+        midnight), NaN for the days without bars.
+        """
+        bars = self.bars(symbol)
+        times = bars["time"]
+        midnights = start + INTERVAL_SECONDS["1d"] * np.arange(days + 1)
+        # Bars of a day are those between its midnight and the next one
+        bounds = np.searchsorted(times, midnights)
+        closes = np.full(days, np.nan)
+        traded = bounds[1:] > bounds[:-1]
+        closes[traded] = bars["close"][bounds[1:][traded] - 1]
+        return closes
+
+    async def history_async(
+        self, symbol: str, start: int, end: int, seconds: int
+    ) -> np.ndarray:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, self.history, symbol, start, end, seconds
+        )
+
+
+class BarRecorder:
+    """
+    Builds 1 minute bars from the quotes of the market data service, and
+    appends each bar to the store once a quote of a later minute arrives.
+    Quotes carry no traded volume, recorded bars have a volume of 0.
+    """
+
+    def __init__(self, store: BarStore) -> None:
+        self.store = store
+        self._bars: dict[str, np.ndarray] = {}
+        self._lock = threading.Lock()
+
+    def on_quote(self, quote: Quote) -> None:
+        minute = int(quote.timestamp.timestamp()) // 60 * 60
+        price = quote.price
+        with self._lock:
+            bar = self._bars.get(quote.symbol)
+            if bar is not None and bar["time"] == minute:
+                bar["high"] = max(bar["high"], price)
+                bar["low"] = min(bar["low"], price)
+                bar["close"] = price
+                return
+            if bar is not None and bar["time"] > minute:
+                return
+            self._bars[quote.symbol] = np.array(
+                [(minute, price, price, price, price, 0.0)], dtype=BAR_DTYPE
+            )[0]
+        if bar is not None:
+            self.store.append(quote.symbol, np.array([bar], dtype=BAR_DTYPE))
+
+    def flush(self) -> None:
+        """
+        Append the bars of the current minute, e.g. on shutdown.
+        """
+        with self._lock:
+            bars, self._bars = self._bars, {}
+        for symbol, bar in bars.items():
+            try:
+                self.store.append(symbol, np.array([bar], dtype=BAR_DTYPE))
+            except OSError:
+                logger.exception("Saving the last bar of %s failed", symbol)
+
+
+bar_store = BarStore(
+    settings.BAR_STORE_PATH, max_workers=settings.BAR_STORE_MAX_WORKERS
+)
+bar_recorder = BarRecorder(bar_store)
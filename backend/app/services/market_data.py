@@ -0,0 +1,252 @@
+import asyncio
+import logging
+import random
+import threading
+import zlib
+from collections.abc import Callable, Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import UTC, datetime
+from typing import Any, Protocol
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.quote import Quote
+
+logger = logging.getLogger(__name__)
+
+
+class QuoteNotFoundError(LookupError):
+    pass
+
+
+class MarketDataError(RuntimeError):
+    """
+    The provider couldn't be reached or answered with an error.
+    """
+
+
+class QuoteProvider(Protocol):
+    def fetch_quote(self, symbol: str) -> Quote: ...
+
+
+class FinnhubQuoteProvider:
+    def __init__(self, api_key: str) -> None:
+        import finnhub  # type: ignore
+        import requests  # type: ignore
+
+        self.client = finnhub.Client(api_key=api_key)
+        # What the client raises for a failed request
+        self.errors = (
+            finnhub.FinnhubAPIException,
+            finnhub.FinnhubRequestException,
+            requests.RequestException,
+        )
+
+    def fetch_quote(self, symbol: str) -> Quote:
+        try:
+            data: dict[str, Any] = self.client.quote(symbol)
+        except self.errors as e:
+            raise MarketDataError(f"Fetching the quote of {symbol} failed: {e}") from e
+        # Finnhub answers unknown symbols with an all-zero quote
+        if not data.get("c"):
+            raise QuoteNotFoundError(symbol)
+        return Quote(
+            symbol=symbol,
+            price=data["c"],
+            change=data.get("d") or 0.0,
+            change_percent=data.get("dp") or 0.0,
+            open=data["o"],
+            high=data["h"],
+            low=data["l"],
+            previous_close=data["pc"],
+            timestamp=datetime.fromtimestamp(data["t"], tz=UTC),
+        )
+
+
+class FakeQuoteProvider:
+    """
+    Local feed for tests and benchmarks: every symbol follows its own
+    reproducible random walk, starting from a price derived from its name.
+    """
+
+    def __init__(self, seed: int = 0, volatility: float = 0.005) -> None:
+        self.seed = seed
+        self.volatility = volatility
+        self._walks: dict[str, tuple[random.Random, Quote]] = {}
+        self._lock = threading.Lock()
+
+    def _open(self, symbol: str) -> tuple[random.Random, Quote]:
+        rng = random.Random(zlib.crc32(symbol.encode()) ^ self.seed)
+        price = round(rng.uniform(10, 500), 2)
+        quote = Quote(
+            symbol=symbol,
+            price=price,
+            change=0.0,
+            change_percent=0.0,
+            open=price,
+            high=price,
+            low=price,
+            previous_close=price,
+            timestamp=datetime.now(UTC),
+        )
+        return rng, quote
+
+    def fetch_quote(self, symbol: str) -> Quote:
+        with self._lock:
+            rng, last = self._walks.get(symbol) or self._open(symbol)
+            price = round(max(0.01, last.price * rng.gauss(1, self.volatility)), 2)
+            change = price - last.previous_close
+            quote = last.model_copy(
+                update={
+                    "price": price,
+                    "change": round(change, 2),
+                    "change_percent": round(100 * change / last.previous_close, 4),
+                    "high": max(last.high, price),
+                    "low": min(last.low, price),
+                    "timestamp": datetime.now(UTC),
+                }
+            )
+            self._walks[symbol] = (rng, quote)
+            return quote
+
+
+class MarketDataService:
+    """
+    Quotes served from a TTL+LRU cache in front of a quote provider.
+    Concurrent misses for a symbol share a single upstream fetch, and batches
+    of symbols are fetched in parallel through a bounded worker pool.
+    """
+
+    def __init__(
+        self,
+        provider: QuoteProvider,
+        *,
+        ttl: float,
+        max_size: int,
+        max_workers: int,
+    ) -> None:
+        self.provider = provider
+        self.cache: TTLCache[str, Quote] = TTLCache(ttl=ttl, max_size=max_size)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="market-data"
+        )
+        self._inflight: dict[str, Future[Quote]] = {}
+        self._lock = threading.Lock()
+        self._listeners: list[Callable[[Quote], None]] = []
+        self.fetches = 0
+
+    def add_listener(self, listener: Callable[[Quote], None]) -> None:
+        """
+        Call `listener` with every quote freshly fetched from the provider.
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[Quote], None]) -> None:
+        self._listeners.remove(listener)
+
+    def _notify(self, quote: Quote) -> None:
+        for listener in self._listeners:
+            try:
+                listener(quote)
+            except Exception:
+                logger.exception("Quote listener failed for %s", quote.symbol)
+
+    def _fetch(self, symbol: str) -> Quote:
+        with self._lock:
+            future = self._inflight.get(symbol)
+            leader = future is None
+            if future is None:
+                future = self._inflight[symbol] = Future()
+        if not leader:
+            return future.result()
+        try:
+            self.fetches += 1
+            quote = self.provider.fetch_quote(symbol)
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        else:
+            self.cache.set(symbol, quote)
+            future.set_result(quote)
+        finally:
+            with self._lock:
+                del self._inflight[symbol]
+        self._notify(quote)
+        return quote
+
+    def get_quote(self, symbol: str) -> Quote:
+        symbol = symbol.upper()
+        quote = self.cache.get(symbol)
+        if quote is None:
+            quote = self._fetch(symbol)
+        return quote
+
+    def get_quotes(self, symbols: Iterable[str]) -> dict[str, Quote]:
+        """
+        Return the quotes of every symbol found, fetching the cache misses in
+        parallel. Symbols the provider doesn't know are left out.
+        """
+        wanted = list(dict.fromkeys(symbol.upper() for symbol in symbols))
+        quotes = self.cache.get_many(wanted)
+        misses = [symbol for symbol in wanted if symbol not in quotes]
+        futures = {
+            symbol: self._executor.submit(self._fetch, symbol) for symbol in misses
+        }
+        for symbol, future in futures.items():
+            try:
+                quotes[symbol] = future.result()
+            except QuoteNotFoundError:
+                pass
+        return quotes
+
+    async def get_quote_async(self, symbol: str) -> Quote:
+        symbol = symbol.upper()
+        quote = self.cache.get(symbol)
+        if quote is None:
+            loop = asyncio.get_running_loop()
+            quote = await loop.run_in_executor(self._executor, self._fetch, symbol)
+        return quote
+
+    async def get_quotes_async(self, symbols: Iterable[str]) -> dict[str, Quote]:
+        """
+        Same as `get_quotes`, awaiting the fetches instead of blocking on them.
+        """
+        wanted = list(dict.fromkeys(symbol.upper() for symbol in symbols))
+        quotes = self.cache.get_many(wanted)
+        misses = [symbol for symbol in wanted if symbol not in quotes]
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(
+            *(loop.run_in_executor(self._executor, self._fetch, s) for s in misses),
+            return_exceptions=True,
+        )
+        for symbol, result in zip(misses, results):
+            if isinstance(result, QuoteNotFoundError):
+                continue
+            if isinstance(result, BaseException):
+                raise result
+            quotes[symbol] = result
+        return quotes
+
+    def refresh(self, symbols: Iterable[str]) -> dict[str, Quote]:
+        """
+        Fetch fresh quotes for `symbols` regardless of what's cached.
+        """
+        for symbol in symbols:
+            self.cache.pop(symbol.upper())
+        return self.get_quotes(symbols)
+
+
+def _build_provider() -> QuoteProvider:
+    if settings.MARKET_DATA_PROVIDER == "finnhub":
+        if not settings.FINNHUB_API_KEY:
+            raise ValueError("FINNHUB_API_KEY is required by the finnhub provider")
+        return FinnhubQuoteProvider(settings.FINNHUB_API_KEY)
+    return FakeQuoteProvider()
+
+
+market_data = MarketDataService(
+    _build_provider(),
+    ttl=settings.QUOTE_CACHE_TTL_SECONDS,
+    max_size=settings.QUOTE_CACHE_MAX_SIZE,
+    max_workers=settings.MARKET_DATA_MAX_WORKERS,
+)
@@ -0,0 +1,326 @@
+import datetime
+import heapq
+import itertools
+import logging
+import threading
+import uuid
+from dataclasses import dataclass, field
+
+from sqlmodel import col, select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app import crud
+from app.models.transaction import (
+    Transaction,
+    TransactionOrderType,
+    TransactionStatus,
+    TransactionType,
+)
+
+logger = logging.getLogger(__name__)
+
+COMPACT_THRESHOLD = 1024
+
+
+@dataclass
+class RestingOrder:
+    id: uuid.UUID
+    symbol: str
+    side: TransactionType
+    order_type: TransactionOrderType
+    price: float
+    seq: int = 0
+    # A stop-limit order rests as a limit order once its stop has triggered
+    triggered: bool = False
+
+
+@dataclass
+class Fill:
+    order: RestingOrder
+    price: float
+
+    @property
+    def order_id(self) -> uuid.UUID:
+        return self.order.id
+
+
+@dataclass
+class OrderBook:
+    """
+    Resting orders for one symbol. Each heap is ordered by price-time
+    priority, so the next order to trigger is always at the top; cancelled
+    orders are removed lazily when they reach the top.
+    """
+
+    orders: dict[uuid.UUID, RestingOrder] = field(default_factory=dict)
+    # Highest limit first
+    buy_limits: list[tuple[float, int, uuid.UUID]] = field(default_factory=list)
+    # Lowest limit first
+    sell_limits: list[tuple[float, int, uuid.UUID]] = field(default_factory=list)
+    # Lowest stop first, triggered when the price rises to it
+    buy_stops: list[tuple[float, int, uuid.UUID]] = field(default_factory=list)
+    # Highest stop first, triggered when the price falls to it
+    sell_stops: list[tuple[float, int, uuid.UUID]] = field(default_factory=list)
+    stale: int = 0
+
+    def add(self, order: RestingOrder) -> None:
+        self.orders[order.id] = order
+        is_buy = order.side == TransactionType.BUY
+        if order.order_type == TransactionOrderType.LIMIT or order.triggered:
+            heap, key = (
+                (self.buy_limits, -order.price)
+                if is_buy
+                else (self.sell_limits, order.price)
+            )
+        else:
+            heap, key = (
+                (self.buy_stops, order.price)
+                if is_buy
+                else (self.sell_stops, -order.price)
+            )
+        heapq.heappush(heap, (key, order.seq, order.id))
+
+    def cancel(self, order_id: uuid.UUID) -> bool:
+        if self.orders.pop(order_id, None) is None:
+            return False
+        # Cancelled entries stay in the heaps until they surface, so compact
+        # them away once they outnumber the live orders
+        self.stale += 1
+        if self.stale > max(COMPACT_THRESHOLD, len(self.orders)):
+            self._compact()
+        return True
+
+    def _compact(self) -> None:
+        for heap in (
+            self.buy_limits,
+            self.sell_limits,
+            self.buy_stops,
+            self.sell_stops,
+        ):
+            live = [
+                entry
+                for entry in heap
+                if (order := self.orders.get(entry[2])) and order.seq == entry[1]
+            ]
+            heap[:] = live
+            heapq.heapify(heap)
+        self.stale = 0
+
+    def _pop_crossed(
+        self, heap: list[tuple[float, int, uuid.UUID]], crossed: float
+    ) -> list[RestingOrder]:
+        """
+        Pop every live order whose heap key is at or below `crossed`.
+        """
+        popped = []
+        while heap and heap[0][0] <= crossed:
+            _, seq, order_id = heapq.heappop(heap)
+            order = self.orders.get(order_id)
+            if order and order.seq == seq:
+                popped.append(order)
+        return popped
+
+    def match(self, price: float) -> list[Fill]:
+        fills = []
+        for order in self._pop_crossed(self.buy_stops, price) + self._pop_crossed(
+            self.sell_stops, -price
+        ):
+            if order.order_type == TransactionOrderType.STOP_LOSS:
+                # Becomes a market order, filled at the price that triggered it
+                del self.orders[order.id]
+                fills.append(Fill(order=order, price=price))
+            else:
+                order.triggered = True
+                self.add(order)
+        for order in self._pop_crossed(self.buy_limits, -price) + self._pop_crossed(
+            self.sell_limits, price
+        ):
+            del self.orders[order.id]
+            fills.append(Fill(order=order, price=order.price))
+        return fills
+
+
+class MatchingEngine:
+    """
+    In-memory order books for the pending LIMIT, STOP_LOSS and STOP_LIMIT
+    orders of every symbol. Adding and cancelling orders is O(log n), and a
+    price tick only touches the orders it triggers.
+    """
+
+    def __init__(self) -> None:
+        self._books: dict[str, OrderBook] = {}
+        self._symbols: dict[uuid.UUID, str] = {}
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._symbols)
+
+    def add(self, order: RestingOrder) -> None:
+        with self._lock:
+            order.seq = next(self._seq)
+            self._books.setdefault(order.symbol, OrderBook()).add(order)
+            self._symbols[order.id] = order.symbol
+
+    def cancel(self, order_id: uuid.UUID) -> bool:
+        with self._lock:
+            symbol = self._symbols.pop(order_id, None)
+            return symbol is not None and self._books[symbol].cancel(order_id)
+
+    def on_price(self, symbol: str, price: float) -> list[Fill]:
+        with self._lock:
+            book = self._books.get(symbol)
+            if not book:
+                return []
+            fills = book.match(price)
+            for fill in fills:
+                del self._symbols[fill.order_id]
+            return fills
+
+    def restore(self, fills: list[Fill]) -> None:
+        """
+        Rest the orders of fills that couldn't be persisted again, keeping
+        their time priority.
+        """
+        with self._lock:
+            for fill in fills:
+                order = fill.order
+                if order.id in self._symbols:
+                    continue
+                self._books.setdefault(order.symbol, OrderBook()).add(order)
+                self._symbols[order.id] = order.symbol
+
+    def clear(self) -> None:
+        with self._lock:
+            self._books.clear()
+            self._symbols.clear()
+
+
+matching_engine = MatchingEngine()
+
+
+def is_resting_order(transaction: Transaction) -> bool:
+    return (
+        transaction.status == TransactionStatus.PENDING
+        and transaction.order_type != TransactionOrderType.MARKET
+    )
+
+
+def submit_order(transaction: Transaction) -> None:
+    """
+    Rest a committed pending order in the engine until a price triggers it.
+    """
+    matching_engine.add(
+        RestingOrder(
+            id=transaction.id,
+            symbol=transaction.symbol,
+            side=transaction.transaction_type,
+            order_type=transaction.order_type,
+            price=transaction.price_per_unit,
+        )
+    )
+
+
+async def load_pending_orders(session: AsyncSession) -> int:
+    """
+    Rebuild the order books from the pending orders in the database.
+    """
+    matching_engine.clear()
+    statement = (
+        select(Transaction)
+        .where(
+            Transaction.status == TransactionStatus.PENDING,
+            Transaction.order_type != TransactionOrderType.MARKET,
+        )
+        .order_by(Transaction.timestamp)
+    )
+    for transaction in await session.exec(statement):
+        submit_order(transaction)
+    return len(matching_engine)
+
+
+async def _fill_order(session: AsyncSession, fill: Fill) -> Transaction | None:
+    # Only one process may complete an order, whichever flips its status first
+    claimed = await session.exec(
+        update(Transaction)  # type: ignore
+        .where(
+            col(Transaction.id) == fill.order_id,
+            col(Transaction.status) == TransactionStatus.PENDING,
+        )
+        .values(status=TransactionStatus.COMPLETED)
+    )
+    if not claimed.rowcount:
+        return None
+    transaction = await session.get(Transaction, fill.order_id)
+    if not transaction:
+        return None
+    await session.refresh(transaction)
+    if transaction.transaction_type == TransactionType.BUY:
+        # The buy's cost at its order price was taken from the wallet when it
+        # was placed, only the difference with the fill price is settled
+        reserved = transaction.quantity * transaction.price_per_unit
+        extra = transaction.quantity * fill.price - reserved
+        if extra > 0 and not await crud.debit_wallet(
+            session=session, user_id=transaction.user_id, amount=extra
+        ):
+            await crud.credit_wallet(
+                session=session, user_id=transaction.user_id, amount=reserved
+            )
+            transaction.status = TransactionStatus.FAILED
+            session.add(transaction)
+            return transaction
+        if extra < 0:
+            await crud.credit_wallet(
+                session=session, user_id=transaction.user_id, amount=-extra
+            )
+    order_price = transaction.price_per_unit
+    transaction.price_per_unit = fill.price
+    if not await crud.apply_transaction_to_position(
+        session=session, transaction=transaction
+    ):
+        # A sell the position no longer covers
+        transaction.price_per_unit = order_price
+        transaction.status = TransactionStatus.FAILED
+        session.add(transaction)
+        return transaction
+    if fill.price != order_price:
+        await crud.reprice_transaction_stats(
+            session=session, transaction=transaction, order_price=order_price
+        )
+    transaction.filled_at = datetime.datetime.now()
+    session.add(transaction)
+    if transaction.transaction_type == TransactionType.SELL:
+        await crud.credit_wallet(
+            session=session,
+            user_id=transaction.user_id,
+            amount=transaction.quantity * transaction.price_per_unit,
+        )
+    return transaction
+
+
+async def process_price(
+    session: AsyncSession, symbol: str, price: float
+) -> list[Transaction]:
+    """
+    Match a price tick against the resting orders of its symbol, and persist
+    the resulting fills (or failures) in one commit.
+    """
+    fills = matching_engine.on_price(symbol, price)
+    if not fills:
+        return []
+    try:
+        transactions = [
+            transaction
+            for fill in fills
+            if (transaction := await _fill_order(session, fill)) is not None
+        ]
+        await session.commit()
+    except Exception:
+        # None of the fills were persisted and their orders are still pending
+        # in the database, so they rest again until a later tick
+        matching_engine.restore(fills)
+        raise
+    for transaction in transactions:
+        await session.refresh(transaction)
+    logger.info("%s at %s filled %d orders", symbol, price, len(transactions))
+    return transactions
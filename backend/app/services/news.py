@@ -0,0 +1,365 @@
+import asyncio
+import bisect
+import datetime
+import json
+import logging
+import threading
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any, Protocol
+
+from pydantic import ValidationError
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import col, delete, insert, select, tuple_
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.models.news import NewsArticle, NewsArticleCreate, NewsArticlePublic
+
+logger = logging.getLogger(__name__)
+
+# (published timestamp, id), the order of the postings
+NewsKey = tuple[float, int]
+
+
+class NewsSource(Protocol):
+    name: str
+
+    def fetch(
+        self, cursor: str | None, limit: int
+    ) -> tuple[list[NewsArticleCreate], str | None]:
+        """
+        Up to `limit` articles after `cursor` (from the start when None), and
+        the cursor to continue from.
+        """
+        ...
+
+
+class FinnhubNewsSource:
+    name = "finnhub"
+
+    def __init__(self, api_key: str) -> None:
+        import finnhub  # type: ignore
+
+        self.client = finnhub.Client(api_key=api_key)
+
+    def fetch(
+        self, cursor: str | None, limit: int
+    ) -> tuple[list[NewsArticleCreate], str | None]:
+        min_id = int(cursor or 0)
+        items: list[dict[str, Any]] = self.client.general_news("general", min_id=min_id)
+        items = sorted(
+            (item for item in items if item["id"] > min_id), key=lambda item: item["id"]
+        )[:limit]
+        articles = [
+            NewsArticleCreate(
+                external_id=str(item["id"]),
+                headline=item["headline"],
+                summary=item.get("summary") or "",
+                source=item.get("source") or "",
+                url=item.get("url") or None,
+                image_url=item.get("image") or None,
+                category=item.get("category") or "general",
+                published_at=datetime.datetime.fromtimestamp(item["datetime"]),
+                symbols=[s for s in (item.get("related") or "").split(",") if s],
+            )
+            for item in items
+        ]
+        return articles, str(max((item["id"] for item in items), default=min_id))
+
+
+class FileNewsSource:
+    """
+    Local source for tests and development: one JSON article per line, read
+    from the byte offset reached by the previous batch. Invalid lines are
+    logged and skipped.
+    """
+
+    name = "file"
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+
+    def fetch(
+        self, cursor: str | None, limit: int
+    ) -> tuple[list[NewsArticleCreate], str | None]:
+        offset = int(cursor or 0)
+        if not self.path.exists():
+            return [], cursor
+        articles = []
+        with self.path.open("rb") as file:
+            # Start over when the file was replaced by a shorter one
+            if offset > self.path.stat().st_size:
+                offset = 0
+            file.seek(offset)
+            while len(articles) < limit:
+                line = file.readline()
+                # A line still being written is read again by the next batch
+                if not line.endswith(b"\n"):
+                    break
+                offset = file.tell()
+                if not line.strip():
+                    continue
+                try:
+                    articles.append(NewsArticleCreate.model_validate(json.loads(line)))
+                except (ValueError, ValidationError) as e:
+                    logger.warning(
+                        "Skipping an invalid article in %s: %s", self.path, e
+                    )
+        return articles, str(offset)
+
+
+class NewsIndex:
+    """
+    The retained articles in memory, with an inverted index from each symbol
+    and each category to the keys of its articles, sorted by publication
+    time. A page is a bisection into one list of keys; the oldest articles
+    are at the start of every list, so retention trims prefixes.
+    """
+
+    def __init__(self) -> None:
+        self._articles: dict[int, NewsArticlePublic] = {}
+        self._keys: list[NewsKey] = []
+        self._postings: dict[tuple[str, str], list[NewsKey]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._articles)
+
+    @staticmethod
+    def _terms(article: NewsArticlePublic) -> set[tuple[str, str]]:
+        terms = {("symbol", symbol.upper()) for symbol in article.symbols}
+        terms.add(("category", article.category.lower()))
+        return terms
+
+    def add(self, articles: Iterable[NewsArticlePublic]) -> int:
+        """
+        Add the articles not indexed yet, returns how many.
+        """
+        added = 0
+        with self._lock:
+            for article in articles:
+                if article.id in self._articles:
+                    continue
+                key = (article.published_at.timestamp(), article.id)
+                self._articles[article.id] = article
+                # Articles mostly arrive in publication order, so these are
+                # usually appends
+                bisect.insort(self._keys, key)
+                for term in self._terms(article):
+                    bisect.insort(self._postings.setdefault(term, []), key)
+                added += 1
+        return added
+
+    def prune(self, cutoff: datetime.datetime, max_articles: int) -> int:
+        """
+        Drop the articles published before `cutoff`, and the oldest ones
+        beyond `max_articles`.
+        """
+        with self._lock:
+            end = bisect.bisect_left(self._keys, (cutoff.timestamp(), 0))
+            end = max(end, len(self._keys) - max_articles)
+            if end <= 0:
+                return 0
+            boundary = self._keys[end - 1]
+            removed = [self._articles.pop(key[1]) for key in self._keys[:end]]
+            del self._keys[:end]
+            for term in set().union(*(self._terms(a) for a in removed)):
+                keys = self._postings[term]
+                del keys[: bisect.bisect_right(keys, boundary)]
+                if not keys:
+                    del self._postings[term]
+            return len(removed)
+
+    def page(
+        self,
+        *,
+        symbol: str | None = None,
+        category: str | None = None,
+        before: NewsKey | None = None,
+        limit: int,
+    ) -> tuple[list[NewsArticlePublic], NewsKey | None]:
+        """
+        The newest articles about `symbol` in `category` (either optional)
+        published before the `before` key, and the key to continue from when
+        there may be more.
+        """
+        terms = []
+        if symbol:
+            terms.append(("symbol", symbol.upper()))
+        if category:
+            terms.append(("category", category.lower()))
+        with self._lock:
+            lists = [self._postings.get(term, []) for term in terms] or [self._keys]
+            # Walk the shortest list, checking the other filter on each article
+            keys = min(lists, key=len)
+            end = bisect.bisect_left(keys, before) if before else len(keys)
+            articles = []
+            index = end - 1
+            while index >= 0 and len(articles) < limit:
+                article = self._articles[keys[index][1]]
+                if all(term in self._terms(article) for term in terms):
+                    articles.append(article)
+                index -= 1
+        if index < 0 or len(articles) < limit:
+            return articles, None
+        last = articles[-1]
+        return articles, (last.published_at.timestamp(), last.id)
+
+
+class NewsIngester:
+    """
+    Moves batches of articles from a news source to the database, and from
+    the database (whichever process ingested them) to the index, within the
+    retention limits.
+    """
+
+    def __init__(
+        self,
+        source: NewsSource,
+        index: NewsIndex,
+        *,
+        batch_size: int,
+        retention: datetime.timedelta,
+        max_articles: int,
+        sync_overlap: datetime.timedelta,
+    ) -> None:
+        self.source = source
+        self.index = index
+        self.batch_size = batch_size
+        self.retention = retention
+        self.max_articles = max_articles
+        self.sync_overlap = sync_overlap
+        self._cursor: str | None = None
+        # Latest ingestion time synced to the index
+        self._synced_at: datetime.datetime | None = None
+
+    def cutoff(self) -> datetime.datetime:
+        return datetime.datetime.now() - self.retention
+
+    async def ingest(self, session: AsyncSession) -> int:
+        """
+        Store the next batch of the source, skipping the articles already
+        stored or past retention. Returns the number stored.
+        """
+        articles, cursor = await asyncio.to_thread(
+            self.source.fetch, self._cursor, self.batch_size
+        )
+        cutoff = self.cutoff()
+        fresh: dict[str, NewsArticleCreate] = {}
+        for article in articles:
+            # Stored like the other timestamps, naive local time
+            if article.published_at.tzinfo is not None:
+                article.published_at = article.published_at.astimezone().replace(
+                    tzinfo=None
+                )
+            if article.published_at >= cutoff:
+                fresh[article.external_id] = article
+        if fresh:
+            existing = await session.exec(
+                select(NewsArticle.external_id).where(
+                    NewsArticle.provider == self.source.name,
+                    col(NewsArticle.external_id).in_(list(fresh)),
+                )
+            )
+            for external_id in existing:
+                fresh.pop(external_id, None)
+        if fresh:
+            try:
+                await session.exec(
+                    insert(NewsArticle),  # type: ignore
+                    params=[
+                        {**article.model_dump(), "provider": self.source.name}
+                        for article in fresh.values()
+                    ],
+                )
+                await session.commit()
+            except IntegrityError:
+                # Another process stored some of them first, the batch is
+                # read again from the source
+                await session.rollback()
+                return 0
+        self._cursor = cursor
+        return len(fresh)
+
+    async def sync(self, session: AsyncSession) -> int:
+        """
+        Add the articles stored since the last sync to the index. Ids and
+        ingestion times don't become visible in order (concurrent commits,
+        other processes' clocks), so the rows ingested within `sync_overlap`
+        of the latest one synced are read again, the index skipping those it
+        has. Returns the number added.
+        """
+        filters = [NewsArticle.published_at >= self.cutoff()]
+        if self._synced_at:
+            filters.append(
+                NewsArticle.ingested_at >= self._synced_at - self.sync_overlap
+            )
+        added = 0
+        while True:
+            statement = (
+                select(NewsArticle)
+                .where(*filters)
+                .order_by(col(NewsArticle.ingested_at), col(NewsArticle.id))
+                .limit(self.batch_size)
+            )
+            rows = (await session.exec(statement)).all()
+            if not rows:
+                return added
+            added += self.index.add(
+                NewsArticlePublic.model_validate(row) for row in rows
+            )
+            last = rows[-1]
+            filters.append(
+                tuple_(NewsArticle.ingested_at, NewsArticle.id)
+                > tuple_(last.ingested_at, last.id)
+            )
+            if not self._synced_at or last.ingested_at > self._synced_at:
+                self._synced_at = last.ingested_at
+
+    async def prune(self, session: AsyncSession) -> int:
+        """
+        Delete the articles past retention, from the index and the database.
+        """
+        removed = self.index.prune(self.cutoff(), self.max_articles)
+        cutoff = self.cutoff()
+        # The publication time of the oldest article within the count limit
+        oldest_kept = (
+            await session.exec(
+                select(NewsArticle.published_at)
+                .order_by(col(NewsArticle.published_at).desc())
+                .offset(self.max_articles - 1)
+                .limit(1)
+            )
+        ).first()
+        if oldest_kept and oldest_kept > cutoff:
+            cutoff = oldest_kept
+        await session.exec(
+            delete(NewsArticle).where(col(NewsArticle.published_at) < cutoff)  # type: ignore
+        )
+        await session.commit()
+        return removed
+
+    async def run(self, session: AsyncSession) -> None:
+        await self.ingest(session)
+        await self.sync(session)
+        await self.prune(session)
+
+
+def _build_source() -> NewsSource:
+    if settings.NEWS_SOURCE == "finnhub":
+        if not settings.FINNHUB_API_KEY:
+            raise ValueError("FINNHUB_API_KEY is required by the finnhub news source")
+        return FinnhubNewsSource(settings.FINNHUB_API_KEY)
+    return FileNewsSource(settings.NEWS_FILE_PATH)
+
+
+news_index = NewsIndex()
+news_ingester = NewsIngester(
+    _build_source(),
+    news_index,
+    batch_size=settings.NEWS_BATCH_SIZE,
+    retention=datetime.timedelta(days=settings.NEWS_RETENTION_DAYS),
+    max_articles=settings.NEWS_MAX_ARTICLES,
+    sync_overlap=datetime.timedelta(seconds=settings.NEWS_SYNC_OVERLAP_SECONDS),
+)
@@ -0,0 +1,199 @@
+import datetime
+from dataclasses import dataclass
+
+import numpy as np
+
+# Values are computed for every calendar day, prices carry over weekends
+PERIODS_PER_YEAR = 365
+
+
+@dataclass
+class PriceMatrix:
+    """
+    Daily closing prices, one row per day from `start` and one column per
+    symbol. Days without a price carry the previous one forward; days before
+    a symbol's first price are NaN.
+    """
+
+    start: datetime.date
+    symbols: list[str]
+    closes: np.ndarray
+
+    @classmethod
+    def from_observations(
+        cls,
+        start: datetime.date,
+        days: int,
+        symbols: list[str],
+        day: np.ndarray,
+        symbol: np.ndarray,
+        price: np.ndarray,
+    ) -> "PriceMatrix":
+        """
+        Build the matrix from (day index, symbol index, price) observations;
+        when a day has several prices for a symbol the last one is kept.
+        """
+        closes = np.full((days, len(symbols)), np.nan)
+        closes[day, symbol] = price
+        # Forward fill: the index of the latest observed row, for every cell
+        observed = np.where(np.isnan(closes), 0, np.arange(days)[:, None])
+        np.maximum.accumulate(observed, axis=0, out=observed)
+        closes = closes[observed, np.arange(len(symbols))]
+        return cls(start=start, symbols=symbols, closes=closes)
+
+    @property
+    def dates(self) -> list[datetime.date]:
+        return [
+            self.start + datetime.timedelta(days=offset)
+            for offset in range(len(self.closes))
+        ]
+
+
+@dataclass
+class Trades:
+    """
+    Completed transactions of a batch of users, one array element per trade.
+    """
+
+    # Index of the user in the batch
+    user: np.ndarray
+    # Row and column of the trade in the PriceMatrix
+    day: np.ndarray
+    symbol: np.ndarray
+    # Positive for buys, negative for sells
+    quantity: np.ndarray
+    price: np.ndarray
+
+
+def _accumulate(
+    row: np.ndarray, column: np.ndarray, weights: np.ndarray, shape: tuple[int, int]
+) -> np.ndarray:
+    # Sum of the weights falling in each cell; much faster than np.add.at.
+    # bincount of nothing is an integer array, whatever the weights
+    cells = np.bincount(row * shape[1] + column, weights, minlength=shape[0] * shape[1])
+    return cells.reshape(shape).astype(float, copy=False)
+
+
+def daily_values(
+    trades: Trades, prices: PriceMatrix, users: int
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    The closing market value of each user's holdings, and the amounts bought
+    and sold on each day, as (users, days) matrices.
+    """
+    days, symbols = prices.closes.shape
+    # Holdings are only tracked for the (user, symbol) pairs that traded
+    pairs, pair = np.unique(trades.user * symbols + trades.symbol, return_inverse=True)
+    changes = _accumulate(pair, trades.day, trades.quantity, (len(pairs), days))
+    holdings = np.cumsum(changes, axis=1)
+    # One contiguous row per symbol, so gathering a row per pair is cheap
+    closes = np.ascontiguousarray(np.nan_to_num(prices.closes).T)
+    pair_values = holdings * closes[pairs % symbols]
+    # Pairs are sorted by user, so each user's pairs are contiguous
+    pair_users = pairs // symbols
+    holders, first_pair = np.unique(pair_users, return_index=True)
+    values = np.zeros((users, days))
+    if len(pairs):
+        values[holders] = np.add.reduceat(pair_values, first_pair, axis=0)
+    amounts = trades.quantity * trades.price
+    bought = _accumulate(trades.user, trades.day, np.maximum(amounts, 0), (users, days))
+    sold = _accumulate(trades.user, trades.day, np.maximum(-amounts, 0), (users, days))
+    return values, bought, sold
+
+
+def daily_returns(
+    values: np.ndarray, bought: np.ndarray, sold: np.ndarray
+) -> np.ndarray:
+    """
+    The return of each day, with the day's buys invested at its start and its
+    sales taken out at its close. NaN on the days nothing was invested.
+    """
+    invested = bought.copy()
+    invested[:, 1:] += values[:, :-1]
+    returns = np.full_like(values, np.nan)
+    np.divide(values + sold, invested, out=returns, where=invested > 0)
+    return returns - 1
+
+
+def time_weighted_return(returns: np.ndarray) -> np.ndarray:
+    return np.prod(1 + np.nan_to_num(returns), axis=1) - 1
+
+
+def max_drawdown(returns: np.ndarray) -> np.ndarray:
+    """
+    The largest fall from a peak of the growth of 1 invested, as a negative
+    fraction, so deposits and withdrawals don't count as gains or losses.
+    """
+    growth = np.cumprod(1 + np.nan_to_num(returns), axis=1)
+    if not growth.shape[1]:
+        return np.zeros(len(growth))
+    peaks = np.maximum.accumulate(growth, axis=1)
+    return np.min(growth / peaks - 1, axis=1)
+
+
+def volatility(returns: np.ndarray) -> np.ndarray:
+    """
+    The annualized standard deviation of the daily returns, NaN for users
+    invested on fewer than two days.
+    """
+    active = ~np.isnan(returns)
+    count = active.sum(axis=1)
+    mean = np.nansum(returns, axis=1) / np.maximum(count, 1)
+    squares = np.where(active, returns - mean[:, None], 0) ** 2
+    variance = np.full(len(returns), np.nan)
+    np.divide(squares.sum(axis=1), count - 1, out=variance, where=count > 1)
+    return np.sqrt(variance * PERIODS_PER_YEAR)
+
+
+def xirr(
+    user: np.ndarray,
+    years: np.ndarray,
+    amounts: np.ndarray,
+    users: int,
+    *,
+    iterations: int = 100,
+    tolerance: float = 1e-10,
+) -> np.ndarray:
+    """
+    The annual rate that brings the net present value of each user's cash
+    flows (`amounts` received after `years`) to zero, solved
+    with Newton's method for every user at once. NaN when there's no
+    solution, e.g. unless a user has both inflows and outflows.
+    """
+    has_inflow = np.bincount(user, amounts > 0, minlength=users) > 0
+    has_outflow = np.bincount(user, amounts < 0, minlength=users) > 0
+    scale = np.bincount(user, np.abs(amounts), minlength=users)
+    rates = np.full(users, 0.1)
+    with np.errstate(over="ignore", invalid="ignore", divide="ignore"):
+        for _ in range(iterations):
+            growth = 1 + rates[user]
+            discounted = amounts * growth**-years
+            npv = np.bincount(user, discounted, minlength=users)
+            slope = np.bincount(user, -years * discounted / growth, minlength=users)
+            step = np.divide(npv, slope, out=np.zeros(users), where=slope != 0)
+            # Keep 1 + rate positive, halving the distance to -100% at most
+            rates = np.maximum(rates - step, (rates - 1) / 2)
+            if np.all(np.abs(step[np.isfinite(step)]) < tolerance):
+                break
+        growth = 1 + rates[user]
+        npv = np.bincount(user, amounts * growth**-years, minlength=users)
+    solved = has_inflow & has_outflow & (np.abs(npv) <= 1e-6 * scale)
+    return np.where(solved, rates, np.nan)
+
+
+def money_weighted_return(
+    values: np.ndarray, bought: np.ndarray, sold: np.ndarray, start: int = 0
+) -> np.ndarray:
+    """
+    The XIRR of each user from day `start`: the holdings are bought at the
+    previous close, the trades of every day made, and the final value sold.
+    """
+    users, days = values.shape
+    # One column per day of the window, after the previous close
+    window = np.zeros((users, days - start + 1))
+    window[:, 1:] = sold[:, start:] - bought[:, start:]
+    if start:
+        window[:, 0] = -values[:, start - 1]
+    window[:, -1] += values[:, -1]
+    user, day = np.nonzero(window)
+    return xirr(user, day / PERIODS_PER_YEAR, window[user, day], users)
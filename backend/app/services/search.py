@@ -0,0 +1,186 @@
+import bisect
+import itertools
+import math
+import re
+import threading
+import uuid
+from collections.abc import Iterable, Iterator
+
+from app.services.securities import SecurityEntry, security_index
+
+# A fuzzy match shares at least this fraction of the query's trigrams
+FUZZY_MIN_OVERLAP = 0.5
+# Beyond this, keys are re-sorted in one go rather than inserted one by one
+BULK_UPDATE_SIZE = 1000
+
+_NON_ALPHANUMERIC = re.compile(r"[^0-9a-z]+")
+
+
+def normalize(text: str) -> str:
+    return _NON_ALPHANUMERIC.sub(" ", text.casefold()).strip()
+
+
+def trigrams(text: str) -> set[str]:
+    """
+    The trigrams of each word of normalized `text`, padded so the start and
+    end of words count.
+    """
+    grams = set()
+    for word in text.split():
+        padded = f"  {word} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class SecuritySearchIndex:
+    """
+    Autocomplete over the symbols and names of the security index, ranked:
+    exact symbol, symbol prefix, name prefix, prefix of a later word of the
+    name, then fuzzy matches sharing most trigrams with the query.
+
+    Prefixes are looked up by binary search in sorted (key, doc) lists, the
+    flat equivalent of a trie. Fuzzy matches find the terms (symbols and
+    name words) sharing most trigrams with the query, then their securities
+    by prefix. Both are updated incrementally as securities change.
+    """
+
+    def __init__(self) -> None:
+        self._docs: dict[int, SecurityEntry] = {}
+        self._doc_ids: dict[uuid.UUID, int] = {}
+        self._next_doc = 0
+        self._symbols: list[tuple[str, int]] = []
+        self._names: list[tuple[str, int]] = []
+        # Each later word of a name to its end, e.g. "inc" of "apple inc"
+        self._words: list[tuple[str, int]] = []
+        # Securities using each term, and the terms of each trigram
+        self._terms: dict[str, int] = {}
+        self._trigrams: dict[str, set[str]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    @staticmethod
+    def _keys(doc: int, entry: SecurityEntry) -> tuple[list[tuple[str, int]], ...]:
+        # The keys of a document in the symbol, name and word lists
+        name = normalize(entry.name)
+        # Words of a normalized name are separated by single spaces
+        starts = itertools.accumulate(len(word) + 1 for word in name.split(" ")[:-1])
+        return (
+            [(entry.symbol.casefold(), doc)],
+            [(name, doc)],
+            [(name[start:], doc) for start in starts],
+        )
+
+    @staticmethod
+    def _entry_terms(entry: SecurityEntry) -> set[str]:
+        return {*normalize(entry.symbol).split(), *normalize(entry.name).split()}
+
+    def update(self, upserts: list[SecurityEntry], deletes: list[uuid.UUID]) -> None:
+        """
+        Listener of the security index: re-index what changed.
+        """
+        with self._lock:
+            removed = [
+                doc
+                for id in (*deletes, *(entry.id for entry in upserts))
+                if (doc := self._doc_ids.pop(id, None)) is not None
+            ]
+            added = []
+            for entry in upserts:
+                self._doc_ids[entry.id] = self._next_doc
+                added.append((self._next_doc, entry))
+                self._next_doc += 1
+            old = [self._keys(doc, self._docs[doc]) for doc in removed]
+            new = [self._keys(doc, entry) for doc, entry in added]
+            bulk = len(removed) + len(added) > BULK_UPDATE_SIZE
+            for index, keys in enumerate((self._symbols, self._names, self._words)):
+                stale = [key for doc_keys in old for key in doc_keys[index]]
+                fresh = [key for doc_keys in new for key in doc_keys[index]]
+                if bulk:
+                    gone = set(stale)
+                    keys[:] = [key for key in keys if key not in gone]
+                    keys.extend(fresh)
+                    keys.sort()
+                    continue
+                for key in stale:
+                    del keys[bisect.bisect_left(keys, key)]
+                for key in fresh:
+                    bisect.insort(keys, key)
+            for doc in removed:
+                for term in self._entry_terms(self._docs.pop(doc)):
+                    self._terms[term] -= 1
+                    if self._terms[term]:
+                        continue
+                    del self._terms[term]
+                    for gram in trigrams(term):
+                        postings = self._trigrams[gram]
+                        postings.discard(term)
+                        if not postings:
+                            del self._trigrams[gram]
+            for doc, entry in added:
+                self._docs[doc] = entry
+                for term in self._entry_terms(entry):
+                    if term not in self._terms:
+                        self._terms[term] = 0
+                        for gram in trigrams(term):
+                            self._trigrams.setdefault(gram, set()).add(term)
+                    self._terms[term] += 1
+
+    @staticmethod
+    def _prefixed(keys: list[tuple[str, int]], prefix: str) -> Iterator[int]:
+        # Sorted keys starting with `prefix` are contiguous
+        index = bisect.bisect_left(keys, (prefix,))
+        while index < len(keys) and keys[index][0].startswith(prefix):
+            yield keys[index][1]
+            index += 1
+
+    def _fuzzy(self, query: str) -> Iterator[int]:
+        # The longest word of the query carries the most trigrams
+        word = max(query.split(), key=len, default="")
+        if len(word) < 3:
+            return
+        grams = trigrams(word)
+        needed = math.ceil(len(grams) * FUZZY_MIN_OVERLAP)
+        postings = sorted((self._trigrams.get(gram, set()) for gram in grams), key=len)
+        # A term sharing `needed` trigrams is in one of the rarest
+        # len - needed + 1 postings, so only those are scanned
+        candidates = set().union(*postings[: len(postings) - needed + 1])
+        scored = []
+        for term in candidates:
+            shared = sum(term in posting for posting in postings)
+            if shared >= needed:
+                # Dice coefficient, a padded term has len + 1 trigrams
+                scored.append((-2 * shared / (len(grams) + len(term) + 1), term))
+        scored.sort()
+        for _, term in scored:
+            yield from self._prefixed(self._symbols, term)
+            yield from self._prefixed(self._names, term)
+            yield from self._prefixed(self._words, term)
+
+    def search(self, query: str, *, limit: int) -> list[SecurityEntry]:
+        symbol = query.strip().casefold()
+        name = normalize(query)
+        if not symbol:
+            return []
+        with self._lock:
+            tiers: Iterable[Iterable[int]] = (
+                self._prefixed(self._symbols, symbol),
+                self._prefixed(self._names, name) if name else (),
+                self._prefixed(self._words, name) if name else (),
+            )
+            found: dict[int, None] = {}
+            for tier in tiers:
+                for doc in tier:
+                    found.setdefault(doc)
+                    if len(found) == limit:
+                        return [self._docs[doc] for doc in found]
+            for doc in self._fuzzy(name):
+                found.setdefault(doc)
+                if len(found) == limit:
+                    break
+            return [self._docs[doc] for doc in found]
+
+
+search_index = SecuritySearchIndex()
+security_index.add_listener(search_index.update)
@@ -0,0 +1,188 @@
+import threading
+import uuid
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, UOWTransaction
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.security import Security, SecurityType
+
+
+class SecurityNotFoundError(LookupError):
+    pass
+
+
+class SecurityMismatchError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class SecurityEntry:
+    id: uuid.UUID
+    symbol: str
+    name: str
+    security_type: SecurityType
+    market: str
+    currency: str
+
+    @classmethod
+    def from_security(cls, security: Security) -> "SecurityEntry":
+        return cls(
+            id=security.id,
+            symbol=security.symbol.upper(),
+            name=security.name,
+            security_type=security.security_type,
+            market=security.market,
+            currency=security.currency,
+        )
+
+
+def _merge(
+    by_id: dict[uuid.UUID, SecurityEntry],
+    upserts: Iterable[SecurityEntry],
+    deletes: Iterable[uuid.UUID],
+) -> None:
+    for id in deletes:
+        by_id.pop(id, None)
+    for entry in upserts:
+        by_id[entry.id] = entry
+
+
+class SecurityIndex:
+    """
+    In-memory copy of the security table, by symbol and by id, so orders are
+    resolved without a database round trip.
+
+    Loaded at startup, then kept current by the commits of this process
+    (see `track_changes`) and reloaded periodically for the others'.
+    Readers never lock: every change swaps in new dicts.
+    """
+
+    def __init__(self) -> None:
+        self._by_symbol: dict[str, SecurityEntry] = {}
+        self._by_id: dict[uuid.UUID, SecurityEntry] = {}
+        self._lock = threading.Lock()
+        # Counts the applied changes, logged while a reload reads the table
+        self._generation = 0
+        self._loads = 0
+        self._changes: list[tuple[int, list[SecurityEntry], list[uuid.UUID]]] = []
+        self._listeners: list[
+            Callable[[list[SecurityEntry], list[uuid.UUID]], None]
+        ] = []
+
+    def add_listener(
+        self, listener: Callable[[list[SecurityEntry], list[uuid.UUID]], None]
+    ) -> None:
+        """
+        Call `listener` with the entries added or changed and the ids deleted
+        by every update of the index, in order.
+        """
+        self._listeners.append(listener)
+
+    def _swap(self, by_id: dict[uuid.UUID, SecurityEntry]) -> None:
+        # Called with the lock held, so listeners see the updates in order
+        upserts = [entry for id, entry in by_id.items() if self._by_id.get(id) != entry]
+        deletes = [id for id in self._by_id if id not in by_id]
+        self._by_symbol = {entry.symbol: entry for entry in by_id.values()}
+        self._by_id = by_id
+        if upserts or deletes:
+            for listener in self._listeners:
+                listener(upserts, deletes)
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def replace(self, securities: Iterable[Security]) -> None:
+        entries = [SecurityEntry.from_security(security) for security in securities]
+        with self._lock:
+            self._swap({entry.id: entry for entry in entries})
+
+    async def load(self, session: AsyncSession) -> int:
+        """
+        Reload the index from the table. Changes applied while it's read are
+        applied again on top, as the read may predate them.
+        """
+        with self._lock:
+            self._loads += 1
+            generation = self._generation
+        try:
+            securities = (await session.exec(select(Security))).all()
+            by_id = {
+                entry.id: entry
+                for entry in map(SecurityEntry.from_security, securities)
+            }
+            with self._lock:
+                for applied, upserts, deletes in self._changes:
+                    if applied > generation:
+                        _merge(by_id, upserts, deletes)
+                self._swap(by_id)
+        finally:
+            with self._lock:
+                self._loads -= 1
+                if not self._loads:
+                    self._changes.clear()
+        return len(securities)
+
+    def apply(
+        self, upserts: Iterable[SecurityEntry], deletes: Iterable[uuid.UUID]
+    ) -> None:
+        upserts, deletes = list(upserts), list(deletes)
+        with self._lock:
+            self._generation += 1
+            if self._loads:
+                self._changes.append((self._generation, upserts, deletes))
+            by_id = dict(self._by_id)
+            _merge(by_id, upserts, deletes)
+            self._swap(by_id)
+
+    def get(self, symbol: str) -> SecurityEntry | None:
+        return self._by_symbol.get(symbol.upper())
+
+    def get_by_id(self, id: uuid.UUID) -> SecurityEntry | None:
+        return self._by_id.get(id)
+
+    def resolve(self, symbol: str, security_id: uuid.UUID | None) -> SecurityEntry:
+        """
+        The security of `symbol`, checked against `security_id` when given.
+        """
+        entry = self.get(symbol)
+        if entry is None:
+            raise SecurityNotFoundError(symbol)
+        if security_id is not None and security_id != entry.id:
+            raise SecurityMismatchError(symbol)
+        return entry
+
+    def track_changes(self) -> None:
+        """
+        Apply the securities added, changed or deleted by any session of this
+        process once its transaction commits.
+        """
+
+        @event.listens_for(Session, "after_flush")
+        def collect(session: Session, flush_context: UOWTransaction) -> None:
+            changes = session.info.setdefault("security_changes", ({}, set()))
+            upserts, deletes = changes
+            for instance in (*session.new, *session.dirty):
+                if isinstance(instance, Security):
+                    upserts[instance.id] = SecurityEntry.from_security(instance)
+            for instance in session.deleted:
+                if isinstance(instance, Security):
+                    upserts.pop(instance.id, None)
+                    deletes.add(instance.id)
+
+        @event.listens_for(Session, "after_commit")
+        def publish(session: Session) -> None:
+            changes = session.info.pop("security_changes", None)
+            if changes:
+                self.apply(changes[0].values(), changes[1])
+
+        @event.listens_for(Session, "after_rollback")
+        def discard(session: Session) -> None:
+            session.info.pop("security_changes", None)
+
+
+security_index = SecurityIndex()
+security_index.track_changes()
@@ -0,0 +1,174 @@
+import asyncio
+import logging
+import uuid
+from collections import deque
+from collections.abc import Iterable
+
+from app.core.config import settings
+from app.models.quote import Quote
+from app.services.market_data import market_data
+
+logger = logging.getLogger(__name__)
+
+# Messages for a connection's user (e.g. triggered alerts) kept until sent,
+# the oldest are dropped beyond this
+MAX_PENDING_EVENTS = 100
+
+
+class StreamFullError(RuntimeError):
+    pass
+
+
+class TooManySymbolsError(ValueError):
+    pass
+
+
+class QuoteSubscriber:
+    """
+    A streaming connection: the symbols it follows and, for each, the latest
+    quote not sent yet. A consumer slower than the ticks only gets the latest
+    quote of each symbol, so its queue never outgrows its symbols.
+    """
+
+    def __init__(self, user_id: uuid.UUID) -> None:
+        self.user_id = user_id
+        self.symbols: set[str] = set()
+        self.coalesced = 0
+        self._pending: dict[str, str] = {}
+        # (type, JSON data) of the messages for the user
+        self._events: deque[tuple[str, str]] = deque(maxlen=MAX_PENDING_EVENTS)
+        self._ready = asyncio.Event()
+
+    def offer(self, symbol: str, quote_json: str) -> None:
+        if symbol in self._pending:
+            self.coalesced += 1
+        self._pending[symbol] = quote_json
+        self._ready.set()
+
+    def notify(self, type: str, data: str) -> None:
+        self._events.append((type, data))
+        self._ready.set()
+
+    async def next_batch(self) -> tuple[list[tuple[str, str]], list[str]]:
+        """
+        Wait for something to send, then take the pending user messages and
+        quotes, as JSON objects.
+        """
+        await self._ready.wait()
+        self._ready.clear()
+        events = list(self._events)
+        self._events.clear()
+        quotes = list(self._pending.values())
+        self._pending.clear()
+        return events, quotes
+
+
+class QuoteStreamHub:
+    """
+    Registry of the streaming connections by symbol and by user. The
+    subscribed symbols are refreshed from the market data service every
+    `run` interval, and each fresh quote is serialized once and handed to
+    every subscriber of its symbol on the event loop.
+    """
+
+    def __init__(self, *, max_connections: int, max_symbols: int) -> None:
+        self.max_connections = max_connections
+        self.max_symbols = max_symbols
+        self._connections: set[QuoteSubscriber] = set()
+        self._subscribers: dict[str, set[QuoteSubscriber]] = {}
+        self._users: dict[uuid.UUID, set[QuoteSubscriber]] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def __len__(self) -> int:
+        return len(self._connections)
+
+    @property
+    def full(self) -> bool:
+        return len(self._connections) >= self.max_connections
+
+    def connect(self, user_id: uuid.UUID) -> QuoteSubscriber:
+        if self.full:
+            raise StreamFullError()
+        subscriber = QuoteSubscriber(user_id)
+        self._connections.add(subscriber)
+        self._users.setdefault(user_id, set()).add(subscriber)
+        return subscriber
+
+    def disconnect(self, subscriber: QuoteSubscriber) -> None:
+        self.unsubscribe(subscriber, list(subscriber.symbols))
+        self._connections.discard(subscriber)
+        connections = self._users.get(subscriber.user_id)
+        if connections is not None:
+            connections.discard(subscriber)
+            if not connections:
+                del self._users[subscriber.user_id]
+
+    def notify(self, user_id: uuid.UUID, type: str, data: str) -> None:
+        """
+        Send a message of `type` with JSON `data` to every connection of a user.
+        """
+        for subscriber in self._users.get(user_id, ()):
+            subscriber.notify(type, data)
+
+    def subscribe(self, subscriber: QuoteSubscriber, symbols: Iterable[str]) -> None:
+        """
+        Follow `symbols` too, starting with their cached quotes if any.
+        """
+        added = {symbol.upper() for symbol in symbols} - subscriber.symbols
+        if len(subscriber.symbols) + len(added) > self.max_symbols:
+            raise TooManySymbolsError(self.max_symbols)
+        for symbol in added:
+            subscriber.symbols.add(symbol)
+            self._subscribers.setdefault(symbol, set()).add(subscriber)
+        for symbol, quote in market_data.cache.get_many(added).items():
+            subscriber.offer(symbol, quote.model_dump_json())
+
+    def unsubscribe(self, subscriber: QuoteSubscriber, symbols: Iterable[str]) -> None:
+        for symbol in symbols:
+            symbol = symbol.upper()
+            subscriber.symbols.discard(symbol)
+            subscribers = self._subscribers.get(symbol)
+            if subscribers is None:
+                continue
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del self._subscribers[symbol]
+
+    def on_quote(self, quote: Quote) -> None:
+        """
+        Market data listener, called on its worker threads.
+        """
+        if self._loop is None or quote.symbol not in self._subscribers:
+            return
+        self._loop.call_soon_threadsafe(
+            self._fan_out, quote.symbol, quote.model_dump_json()
+        )
+
+    def _fan_out(self, symbol: str, quote_json: str) -> None:
+        for subscriber in self._subscribers.get(symbol, ()):
+            subscriber.offer(symbol, quote_json)
+
+    async def run(self, interval: float) -> None:
+        """
+        Every `interval` seconds, fetch the subscribed symbols whose cached
+        quote expired, until cancelled. Fetched quotes reach the subscribers
+        through `on_quote`, like those fetched for any other request.
+        """
+        self._loop = asyncio.get_running_loop()
+        try:
+            while True:
+                await asyncio.sleep(interval)
+                if not self._subscribers:
+                    continue
+                try:
+                    await market_data.get_quotes_async(list(self._subscribers))
+                except Exception:
+                    logger.exception("Refreshing the streamed quotes failed")
+        finally:
+            self._loop = None
+
+
+quote_stream = QuoteStreamHub(
+    max_connections=settings.STREAM_MAX_CONNECTIONS,
+    max_symbols=settings.STREAM_MAX_SYMBOLS,
+)
@@ -0,0 +1,418 @@
+import bisect
+import datetime
+from collections.abc import Callable
+from dataclasses import dataclass
+from zoneinfo import ZoneInfo
+
+from app.core.config import settings
+from app.models.security import SecurityType
+from app.services.securities import security_index
+
+
+class CalendarRangeError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class TradingSession:
+    date: datetime.date
+    # Aware, in UTC
+    open: datetime.datetime
+    close: datetime.datetime
+    early_close: bool
+
+
+@dataclass(frozen=True)
+class MarketStatus:
+    exchange: str
+    timezone: str
+    is_open: bool
+    # The session under way, or the day's session before it opens or after it
+    # closes, None on days without trading
+    session: TradingSession | None
+    next_open: datetime.datetime | None
+    next_close: datetime.datetime | None
+
+    @property
+    def next_change(self) -> datetime.datetime | None:
+        return self.next_close if self.is_open else self.next_open
+
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> datetime.date:
+    first = datetime.date(year, month, 1)
+    offset = (weekday - first.weekday()) % 7
+    return first + datetime.timedelta(days=offset + 7 * (n - 1))
+
+
+def _last_weekday(year: int, month: int, weekday: int) -> datetime.date:
+    following = datetime.date(year + month // 12, month % 12 + 1, 1)
+    last = following - datetime.timedelta(days=1)
+    return last - datetime.timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _easter(year: int) -> datetime.date:
+    # Anonymous Gregorian algorithm
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return datetime.date(year, month, day + 1)
+
+
+def _observed(day: datetime.date) -> datetime.date:
+    # Saturday holidays are observed on Friday, Sunday ones on Monday
+    if day.weekday() == 5:
+        return day - datetime.timedelta(days=1)
+    if day.weekday() == 6:
+        return day + datetime.timedelta(days=1)
+    return day
+
+
+def _weekday_from(day: datetime.date) -> datetime.date:
+    # Weekend holidays are substituted by the following weekday
+    while day.weekday() >= 5:
+        day += datetime.timedelta(days=1)
+    return day
+
+
+def _weekday_until(day: datetime.date, closed: set[datetime.date]) -> datetime.date:
+    # The last trading weekday on or before `day`
+    while day.weekday() >= 5 or day in closed:
+        day -= datetime.timedelta(days=1)
+    return day
+
+
+# Unscheduled closures, e.g. national days of mourning
+NYSE_SPECIAL_CLOSURES = {
+    datetime.date(2012, 10, 29),
+    datetime.date(2012, 10, 30),
+    datetime.date(2018, 12, 5),
+    datetime.date(2025, 1, 9),
+}
+
+
+def nyse_holidays(year: int) -> tuple[set[datetime.date], set[datetime.date]]:
+    """
+    The weekdays of `year` the NYSE is closed, and those it closes early.
+    """
+    new_year = datetime.date(year, 1, 1)
+    closed = {
+        # A Saturday New Year's Day isn't observed on the Friday before
+        new_year + datetime.timedelta(days=1) if new_year.weekday() == 6 else new_year,
+        _nth_weekday(year, 1, 0, 3),  # Martin Luther King Jr. Day
+        _nth_weekday(year, 2, 0, 3),  # Washington's Birthday
+        _easter(year) - datetime.timedelta(days=2),  # Good Friday
+        _last_weekday(year, 5, 0),  # Memorial Day
+        _observed(datetime.date(year, 7, 4)),
+        _nth_weekday(year, 9, 0, 1),  # Labor Day
+        _nth_weekday(year, 11, 3, 4),  # Thanksgiving
+        _observed(datetime.date(year, 12, 25)),
+    }
+    if year >= 2022:
+        closed.add(_observed(datetime.date(year, 6, 19)))  # Juneteenth
+    closed |= {day for day in NYSE_SPECIAL_CLOSURES if day.year == year}
+    early = {_nth_weekday(year, 11, 3, 4) + datetime.timedelta(days=1)}
+    # The eves of Independence Day and Christmas, when they're trading days
+    for eve in (datetime.date(year, 7, 3), datetime.date(year, 12, 24)):
+        if eve.weekday() < 4 and eve not in closed:
+            early.add(eve)
+    return {day for day in closed if day.weekday() < 5}, early - closed
+
+
+# Bank holidays moved for royal occasions, and closures in addition to them
+LSE_MOVED_HOLIDAYS = {
+    datetime.date(2020, 5, 4): datetime.date(2020, 5, 8),
+    datetime.date(2022, 5, 30): datetime.date(2022, 6, 2),
+}
+LSE_SPECIAL_CLOSURES = {
+    datetime.date(2022, 6, 3),
+    datetime.date(2022, 9, 19),
+    datetime.date(2023, 5, 8),
+}
+
+
+def lse_holidays(year: int) -> tuple[set[datetime.date], set[datetime.date]]:
+    """
+    The weekdays of `year` the London Stock Exchange is closed, and those it
+    closes early.
+    """
+    christmas = _weekday_from(datetime.date(year, 12, 25))
+    closed = {
+        _weekday_from(datetime.date(year, 1, 1)),
+        _easter(year) - datetime.timedelta(days=2),  # Good Friday
+        _easter(year) + datetime.timedelta(days=1),  # Easter Monday
+        _nth_weekday(year, 5, 0, 1),  # Early May bank holiday
+        _last_weekday(year, 5, 0),  # Spring bank holiday
+        _last_weekday(year, 8, 0),  # Summer bank holiday
+        christmas,
+        _weekday_from(christmas + datetime.timedelta(days=1)),  # Boxing Day
+    }
+    closed = {LSE_MOVED_HOLIDAYS.get(day, day) for day in closed}
+    closed |= {day for day in LSE_SPECIAL_CLOSURES if day.year == year}
+    # The last trading days before Christmas and of the year
+    early = {
+        _weekday_until(datetime.date(year, 12, 24), closed),
+        _weekday_until(datetime.date(year, 12, 31), closed),
+    }
+    return closed, early
+
+
+def no_holidays(year: int) -> tuple[set[datetime.date], set[datetime.date]]:
+    return set(), set()
+
+
+WEEKDAYS = frozenset(range(5))
+EVERY_DAY = frozenset(range(7))
+
+
+class ExchangeCalendar:
+    """
+    Every session of an exchange over a range of years, computed once:
+    sessions by date for O(1) lookups, and their open and close instants in
+    sorted arrays to bisect for the session at (or after) an instant.
+    Daylight saving time is handled by converting each day's local open and
+    close times through the exchange's time zone. A close time that isn't
+    after the open time is the next day's, e.g. midnight to midnight for
+    markets that never close.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        timezone: str,
+        open: datetime.time,
+        close: datetime.time,
+        early_close: datetime.time,
+        holidays: Callable[[int], tuple[set[datetime.date], set[datetime.date]]],
+        first_year: int,
+        last_year: int,
+        trading_weekdays: frozenset[int] = WEEKDAYS,
+    ) -> None:
+        self.name = name
+        self.timezone = timezone
+        self.first_year = first_year
+        self.last_year = last_year
+        self._zone = zone = ZoneInfo(timezone)
+        self.sessions: list[TradingSession] = []
+        for year in range(first_year, last_year + 1):
+            closed, early = holidays(year)
+            day = datetime.date(year, 1, 1)
+            while day.year == year:
+                if day.weekday() in trading_weekdays and day not in closed:
+                    is_early = day in early
+                    closes_at = early_close if is_early else close
+                    close_day = day
+                    if closes_at <= open:
+                        close_day += datetime.timedelta(days=1)
+                    self.sessions.append(
+                        TradingSession(
+                            date=day,
+                            open=_utc(day, open, zone),
+                            close=_utc(close_day, closes_at, zone),
+                            early_close=is_early,
+                        )
+                    )
+                day += datetime.timedelta(days=1)
+        self._by_date = {session.date: session for session in self.sessions}
+        self._start = _utc(datetime.date(first_year, 1, 1), datetime.time(), zone)
+        self._end = _utc(datetime.date(last_year + 1, 1, 1), datetime.time(), zone)
+        self._opens = [session.open.timestamp() for session in self.sessions]
+        self._closes = [session.close.timestamp() for session in self.sessions]
+
+    def __len__(self) -> int:
+        return len(self.sessions)
+
+    def _out_of_range(self) -> CalendarRangeError:
+        return CalendarRangeError(
+            f"{self.name} sessions are only known from {self.first_year} "
+            f"to {self.last_year}"
+        )
+
+    def _timestamp(self, at: datetime.datetime) -> float:
+        if not self._start <= at < self._end:
+            raise self._out_of_range()
+        return at.timestamp()
+
+    def session(self, day: datetime.date) -> TradingSession | None:
+        """
+        The session of a date in the exchange's time zone, None when closed.
+        """
+        if not self.first_year <= day.year <= self.last_year:
+            raise self._out_of_range()
+        return self._by_date.get(day)
+
+    def is_trading_day(self, day: datetime.date) -> bool:
+        return self.session(day) is not None
+
+    def _last_opened(self, timestamp: float) -> int:
+        # Index of the last session opened at or before `timestamp`, -1 if none
+        return bisect.bisect_right(self._opens, timestamp) - 1
+
+    def is_open(self, at: datetime.datetime | None = None) -> bool:
+        """
+        Whether a session is under way at `at` (aware, now by default).
+        """
+        timestamp = self._timestamp(at or _now())
+        index = self._last_opened(timestamp)
+        return index >= 0 and timestamp < self._closes[index]
+
+    def next_open(
+        self, at: datetime.datetime | None = None
+    ) -> datetime.datetime | None:
+        """
+        The first session open after `at`, None beyond the computed years.
+        """
+        index = self._last_opened(self._timestamp(at or _now())) + 1
+        return self.sessions[index].open if index < len(self.sessions) else None
+
+    def next_close(
+        self, at: datetime.datetime | None = None
+    ) -> datetime.datetime | None:
+        """
+        The first session close after `at`, None beyond the computed years.
+        """
+        index = bisect.bisect_right(self._closes, self._timestamp(at or _now()))
+        return self.sessions[index].close if index < len(self.sessions) else None
+
+    def sessions_between(
+        self, start: datetime.datetime, end: datetime.datetime
+    ) -> list[TradingSession]:
+        """
+        The sessions open at any point from `start` to before `end`.
+        """
+        low = bisect.bisect_right(self._closes, start.timestamp())
+        high = bisect.bisect_left(self._opens, end.timestamp())
+        return self.sessions[low:high]
+
+    def status(
+        self, at: datetime.datetime | None = None, *, exchange: str | None = None
+    ) -> MarketStatus:
+        at = at or _now()
+        is_open = self.is_open(at)
+        return MarketStatus(
+            exchange=exchange or self.name,
+            timezone=self.timezone,
+            is_open=is_open,
+            session=self._by_date.get(at.astimezone(self._zone).date()),
+            next_open=self.next_open(at),
+            next_close=self.next_close(at),
+        )
+
+
+def _utc(day: datetime.date, time: datetime.time, zone: ZoneInfo) -> datetime.datetime:
+    local = datetime.datetime.combine(day, time, tzinfo=zone)
+    return local.astimezone(datetime.UTC)
+
+
+def _now() -> datetime.datetime:
+    return datetime.datetime.now(datetime.UTC)
+
+
+class TradingCalendars:
+    """
+    The calendar of each exchange, by the names `Security.market` uses, and
+    those of the security types that trade on a schedule of their own
+    whatever their market, such as cryptocurrencies.
+    """
+
+    def __init__(
+        self,
+        calendars: dict[str, ExchangeCalendar],
+        default: str,
+        security_types: dict[SecurityType, str] | None = None,
+    ) -> None:
+        self._calendars = {name.upper(): cal for name, cal in calendars.items()}
+        self.default = default.upper()
+        self._security_types = {
+            security_type: self._calendars[name.upper()]
+            for security_type, name in (security_types or {}).items()
+        }
+
+    def exchanges(self) -> list[str]:
+        return sorted(self._calendars)
+
+    def find(
+        self, market: str | None, security_type: SecurityType | None = None
+    ) -> ExchangeCalendar | None:
+        """
+        The calendar of a security's market or type, None when it has none.
+        """
+        if security_type in self._security_types:
+            return self._security_types[security_type]
+        return self._calendars.get((market or "").strip().upper())
+
+    def get(self, market: str | None) -> ExchangeCalendar:
+        """
+        The calendar of a market, the default exchange's when it has none.
+        """
+        return self.find(market) or self._calendars[self.default]
+
+    def for_symbol(self, symbol: str) -> ExchangeCalendar | None:
+        security = security_index.get(symbol)
+        return self.find(security.market, security.security_type) if security else None
+
+    def is_open(self, symbol: str, at: datetime.datetime | None = None) -> bool:
+        """
+        Whether `symbol` trades at `at` (now): its exchange is in session, or
+        it has no calendar, its hours being unknown.
+        """
+        calendar = self.for_symbol(symbol)
+        return calendar is None or calendar.is_open(at)
+
+
+def _build() -> TradingCalendars:
+    year = datetime.date.today().year
+    first_year = year - settings.MARKET_CALENDAR_YEARS_BACK
+    last_year = year + settings.MARKET_CALENDAR_YEARS_AHEAD
+    # The US exchanges all follow the NYSE schedule
+    us_equities = ExchangeCalendar(
+        "NYSE",
+        timezone="America/New_York",
+        open=datetime.time(9, 30),
+        close=datetime.time(16),
+        early_close=datetime.time(13),
+        holidays=nyse_holidays,
+        first_year=first_year,
+        last_year=last_year,
+    )
+    london = ExchangeCalendar(
+        "LSE",
+        timezone="Europe/London",
+        open=datetime.time(8),
+        close=datetime.time(16, 30),
+        early_close=datetime.time(12, 30),
+        holidays=lse_holidays,
+        first_year=first_year,
+        last_year=last_year,
+    )
+    # Trades around the clock, in daily sessions from midnight UTC
+    crypto = ExchangeCalendar(
+        "CRYPTO",
+        timezone="UTC",
+        open=datetime.time(0),
+        close=datetime.time(0),
+        early_close=datetime.time(0),
+        holidays=no_holidays,
+        trading_weekdays=EVERY_DAY,
+        first_year=first_year,
+        last_year=last_year,
+    )
+    us_names = ["NYSE", "NASDAQ", "NYSE AMERICAN", "AMEX", "NYSE ARCA", "ARCA", "BATS"]
+    return TradingCalendars(
+        {
+            **dict.fromkeys(us_names, us_equities),
+            **dict.fromkeys(["LSE", "LON", "XLON"], london),
+            "CRYPTO": crypto,
+        },
+        default=settings.MARKET_DEFAULT_EXCHANGE,
+        security_types={SecurityType.CRYPTOCURRENCY: "CRYPTO"},
+    )
+
+
+trading_calendars = _build()
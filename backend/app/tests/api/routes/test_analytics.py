@@ -0,0 +1,14 @@
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+
+
+def test_read_top_symbols_limit(
+    client: TestClient, user_token_headers: dict[str, str]
+) -> None:
+    url = f"{settings.API_V1_STR}/analytics/top-symbols"
+    r = client.get(url, headers=user_token_headers, params={"limit": 100})
+    assert r.status_code == 200, r.text
+    for limit in (0, 101):
+        r = client.get(url, headers=user_token_headers, params={"limit": limit})
+        assert r.status_code == 422
@@ -0,0 +1,22 @@
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+
+
+def test_read_market_status(client: TestClient) -> None:
+    for exchange, timezone in [
+        ("NYSE", "America/New_York"),
+        ("lse", "Europe/London"),
+        ("CRYPTO", "UTC"),
+    ]:
+        r = client.get(
+            f"{settings.API_V1_STR}/market/status", params={"exchange": exchange}
+        )
+        assert r.status_code == 200, r.text
+        assert r.json()["timezone"] == timezone
+    r = client.get(f"{settings.API_V1_STR}/market/status", params={"exchange": "TSX"})
+    assert r.status_code == 404
+    r = client.get(
+        f"{settings.API_V1_STR}/market/status", params={"exchange": "CRYPTO"}
+    )
+    assert r.json()["is_open"]
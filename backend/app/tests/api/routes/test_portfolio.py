@@ -0,0 +1,56 @@
+import datetime
+
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.tests.utils import deposit
+
+
+def _performance(
+    client: TestClient, headers: dict[str, str], period: str
+) -> list[float]:
+    r = client.get(
+        f"{settings.API_V1_STR}/portfolio/performance/",
+        headers=headers,
+        params={"period": period},
+    )
+    assert r.status_code == 200, r.text
+    return [point["value"] for point in r.json()["data"]]
+
+
+def test_performance_rolls_back_from_positions(
+    client: TestClient, user_token_headers: dict[str, str]
+) -> None:
+    deposit(client, user_token_headers, 10000)
+    now = datetime.datetime.now()
+    rows = [
+        (30, "buy", 20, 100),
+        (3, "sell", 5, 120),
+        (1, "sell", 5, 105),
+    ]
+    r = client.post(
+        f"{settings.API_V1_STR}/transactions/bulk",
+        headers=user_token_headers,
+        json=[
+            {
+                "symbol": "AAPL",
+                "quantity": quantity,
+                "price_per_unit": price,
+                "transaction_type": side,
+                "order_type": "market",
+                "status": "completed",
+                "timestamp": (now - datetime.timedelta(days=days)).isoformat(),
+            }
+            for days, side, quantity, price in rows
+        ],
+    )
+    assert r.status_code == 200, r.text
+    assert r.json()["inserted"] == 3
+
+    # Holdings before the week are rolled back from the position, valued at
+    # its average cost without recorded closes, and match the values
+    # computed from the whole history
+    week = _performance(client, user_token_headers, "1W")
+    assert len(week) == 8
+    assert week[0] == 20 * 100
+    assert week == _performance(client, user_token_headers, "ALL")[-8:]
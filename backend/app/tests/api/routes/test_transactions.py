@@ -0,0 +1,148 @@
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.tests.utils import balance, deposit, positions
+
+
+def _bulk(
+    client: TestClient, headers: dict[str, str], rows: list[dict[str, object]]
+) -> dict[str, object]:
+    r = client.post(
+        f"{settings.API_V1_STR}/transactions/bulk", headers=headers, json=rows
+    )
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+def _row(**kwargs: object) -> dict[str, object]:
+    return {
+        "symbol": "MSFT",
+        "quantity": 1000,
+        "price_per_unit": 10,
+        "transaction_type": "buy",
+        "order_type": "market",
+        "status": "completed",
+    } | kwargs
+
+
+def test_bulk_buy_without_cash_is_rejected(
+    client: TestClient, user_token_headers: dict[str, str]
+) -> None:
+    result = _bulk(client, user_token_headers, [_row(), _row(status="pending")])
+    assert result["inserted"] == 0
+    assert [e["detail"] for e in result["errors"]] == ["Insufficient funds"] * 2
+    assert positions(client, user_token_headers) == []
+
+    r = client.post(
+        f"{settings.API_V1_STR}/transactions/sell",
+        headers=user_token_headers,
+        json=_row(transaction_type="sell", status="pending"),
+    )
+    assert r.status_code == 400
+    assert balance(client, user_token_headers) == 0
+
+
+def test_bulk_import_settles_cash(
+    client: TestClient, user_token_headers: dict[str, str]
+) -> None:
+    deposit(client, user_token_headers, 15000)
+    result = _bulk(
+        client,
+        user_token_headers,
+        [
+            _row(),
+            _row(quantity=600, transaction_type="sell", price_per_unit=12),
+            _row(quantity=1000, price_per_unit=20),
+        ],
+    )
+    assert result["inserted"] == 2
+    assert [(e["index"], e["detail"]) for e in result["errors"]] == [
+        (2, "Insufficient funds")
+    ]
+    assert balance(client, user_token_headers) == 15000 - 10000 + 7200
+    [position] = positions(client, user_token_headers)
+    assert position["quantity"] == 400
+
+
+def test_read_transactions_since_aware_timestamp(
+    client: TestClient, user_token_headers: dict[str, str]
+) -> None:
+    deposit(client, user_token_headers, 1000)
+    _bulk(client, user_token_headers, [_row(quantity=10)])
+
+    r = client.get(
+        f"{settings.API_V1_STR}/transactions/",
+        headers=user_token_headers,
+        params={"since": "2020-01-01T00:00:00Z"},
+    )
+    assert r.status_code == 200, r.text
+    assert len(r.json()["data"]) == 1
+
+    r = client.get(
+        f"{settings.API_V1_STR}/transactions/",
+        headers=user_token_headers,
+        params={"until": "2020-01-01T00:00:00+02:00"},
+    )
+    assert r.status_code == 200, r.text
+    assert r.json()["data"] == []
+
+
+def test_read_transactions_count_of_range(
+    client: TestClient, user_token_headers: dict[str, str]
+) -> None:
+    deposit(client, user_token_headers, 1000)
+    _bulk(
+        client,
+        user_token_headers,
+        [
+            _row(quantity=10, timestamp="2024-01-10T12:00:00"),
+            _row(quantity=10, timestamp="2024-02-10T12:00:00"),
+            _row(quantity=10),
+        ],
+    )
+
+    def count(**params: str) -> int:
+        r = client.get(
+            f"{settings.API_V1_STR}/transactions/",
+            headers=user_token_headers,
+            params={"limit": 1, **params},
+        )
+        assert r.status_code == 200, r.text
+        return r.json()["count"]
+
+    assert count() == 3
+    assert count(since="2024-02-01T00:00:00") == 2
+    assert count(until="2024-02-01T00:00:00") == 1
+    assert count(since="2024-01-01T00:00:00", until="2024-03-01T00:00:00") == 2
+
+
+def test_bulk_import_adds_to_positions(
+    client: TestClient, user_token_headers: dict[str, str]
+) -> None:
+    deposit(client, user_token_headers, 5000)
+    r = client.post(
+        f"{settings.API_V1_STR}/transactions/buy",
+        headers=user_token_headers,
+        json=_row(quantity=10, price_per_unit=100),
+    )
+    assert r.status_code == 200, r.text
+
+    result = _bulk(
+        client,
+        user_token_headers,
+        [
+            _row(quantity=10, price_per_unit=200),
+            _row(quantity=15, price_per_unit=300, transaction_type="sell"),
+            _row(quantity=10, price_per_unit=1, transaction_type="sell"),
+            _row(quantity=5, price_per_unit=50),
+        ],
+    )
+    assert result["inserted"] == 3
+    assert [(e["index"], e["detail"]) for e in result["errors"]] == [
+        (2, "Insufficient position")
+    ]
+    [position] = positions(client, user_token_headers)
+    assert position["quantity"] == 10
+    assert position["cost_basis"] == 1000
+    assert position["realized_pnl"] == 2250
+    assert balance(client, user_token_headers) == 5000 - 1000 - 2000 + 4500 - 250
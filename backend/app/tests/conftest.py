@@ -0,0 +1,72 @@
+import os
+import tempfile
+from collections.abc import Generator
+
+# Settings are read when the app is imported, so the database and the files
+# the app writes go to a scratch directory first
+_data = tempfile.mkdtemp(prefix="backend-tests-")
+os.environ.setdefault("PROJECT_NAME", "backend-tests")
+os.environ.setdefault("FIRST_SUPERUSER", "admin@example.com")
+os.environ.setdefault("FIRST_SUPERUSER_PASSWORD", "changethis12")
+os.environ["DATABASE_URL"] = ""
+os.environ["SQLITE_FILE_PATH"] = os.path.join(_data, "app.db")
+os.environ["BAR_STORE_PATH"] = os.path.join(_data, "bars")
+os.environ["ANALYTICS_SNAPSHOT_PATH"] = os.path.join(_data, "analytics")
+os.environ["NEWS_FILE_PATH"] = os.path.join(_data, "news.jsonl")
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, SQLModel
+
+from app.core.config import settings
+from app.core.db import engine
+from app.core.security import get_password_hash
+from app.main import app
+from app.models.security import Security, SecurityType
+from app.models.user import User
+from app.tests.utils import SECURITIES, login, signup
+
+
+@pytest.fixture(scope="session", autouse=True)
+def db() -> Generator[Session]:
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(
+            User(
+                email=settings.FIRST_SUPERUSER,
+                username="admin",
+                hashed_password=get_password_hash(settings.FIRST_SUPERUSER_PASSWORD),
+                is_superuser=True,
+            )
+        )
+        for symbol, name, market in SECURITIES:
+            session.add(
+                Security(
+                    symbol=symbol,
+                    name=name,
+                    security_type=SecurityType.COMMON_STOCK,
+                    market=market,
+                    currency="USD",
+                )
+            )
+        session.commit()
+        yield session
+
+
+@pytest.fixture(scope="session")
+def client() -> Generator[TestClient]:
+    with TestClient(app) as c:
+        yield c
+
+
+@pytest.fixture(scope="session")
+def superuser_token_headers(client: TestClient) -> dict[str, str]:
+    return login(client, settings.FIRST_SUPERUSER, settings.FIRST_SUPERUSER_PASSWORD)
+
+
+@pytest.fixture
+def user_token_headers(client: TestClient) -> dict[str, str]:
+    """
+    A new user for each test, so wallets and positions don't carry over.
+    """
+    return signup(client)
@@ -0,0 +1,50 @@
+import datetime
+
+from app.models.security import SecurityType
+from app.services.trading_calendar import lse_holidays, trading_calendars
+
+
+def test_lse_holidays() -> None:
+    closed, early = lse_holidays(2026)
+    assert closed == {
+        datetime.date(2026, 1, 1),
+        datetime.date(2026, 4, 3),
+        datetime.date(2026, 4, 6),
+        datetime.date(2026, 5, 4),
+        datetime.date(2026, 5, 25),
+        datetime.date(2026, 8, 31),
+        datetime.date(2026, 12, 25),
+        # Boxing Day falls on a Saturday
+        datetime.date(2026, 12, 28),
+    }
+    assert early == {datetime.date(2026, 12, 24), datetime.date(2026, 12, 31)}
+
+    # Christmas on a Saturday
+    closed, early = lse_holidays(2027)
+    assert {datetime.date(2027, 12, 27), datetime.date(2027, 12, 28)} <= closed
+    assert early == {datetime.date(2027, 12, 24), datetime.date(2027, 12, 31)}
+
+
+def test_lse_session() -> None:
+    lse = trading_calendars.find("LSE")
+    assert lse is not None
+    # British Summer Time, 08:00 to 16:30 in London
+    session = lse.session(datetime.date(2026, 7, 1))
+    assert session is not None
+    assert session.open == datetime.datetime(2026, 7, 1, 7, tzinfo=datetime.UTC)
+    assert session.close == datetime.datetime(2026, 7, 1, 15, 30, tzinfo=datetime.UTC)
+    assert lse.session(datetime.date(2026, 12, 28)) is None
+
+
+def test_crypto_never_closes() -> None:
+    crypto = trading_calendars.find("Binance", SecurityType.CRYPTOCURRENCY)
+    assert crypto is trading_calendars.find("CRYPTO")
+    assert crypto is not None
+    saturday = datetime.datetime(2026, 12, 26, tzinfo=datetime.UTC)
+    for minutes in range(0, 3 * 24 * 60, 7):
+        assert crypto.is_open(saturday + datetime.timedelta(minutes=minutes))
+
+
+def test_markets_without_calendar() -> None:
+    assert trading_calendars.find("TSX") is None
+    assert trading_calendars.get("TSX") is trading_calendars.get("NYSE")
@@ -0,0 +1,173 @@
+import datetime
+import json
+
+from fastapi.testclient import TestClient
+
+from app.check_query_plans import capture_statements, find_table_scans
+from app.core.config import settings
+from app.core.db import async_engine, async_read_engine, engine, get_session
+from app.models import Quote
+from app.services import alerts, matching, news
+from app.services.securities import security_index
+from app.tests.utils import deposit
+
+V = settings.API_V1_STR
+
+# Tables some queries read whole: the security index loads every security,
+# and superusers list every user and item with their total count
+FULL_SCANS = frozenset({"security", "user", "item"})
+
+
+def _exercise_routes(
+    client: TestClient, headers: dict[str, str], superuser_headers: dict[str, str]
+) -> None:
+    deposit(client, headers, 10000)
+    order = {"symbol": "AAPL", "quantity": 1, "price_per_unit": 100}
+    bought = client.post(
+        f"{V}/transactions/buy",
+        headers=headers,
+        json=order | {"transaction_type": "buy", "order_type": "market"},
+    ).json()
+    client.post(
+        f"{V}/transactions/sell",
+        headers=headers,
+        json=order | {"transaction_type": "sell", "order_type": "limit"},
+    )
+    resting = client.post(
+        f"{V}/transactions/buy",
+        headers=headers,
+        json=order | {"transaction_type": "buy", "order_type": "limit"},
+    ).json()
+    client.post(f"{V}/transactions/{resting['id']}/cancel", headers=headers)
+    client.post(
+        f"{V}/transactions/bulk",
+        headers=headers,
+        json=[order | {"transaction_type": "buy", "status": "completed"}],
+    )
+    client.post(
+        f"{V}/transactions/",
+        headers=headers,
+        json=order | {"transaction_type": "buy", "status": "completed"},
+    )
+    page = client.get(f"{V}/transactions/", headers=headers, params={"limit": 1})
+    for params in [
+        {"limit": 1, "cursor": page.json()["next_cursor"]},
+        {"since": "2020-01-01T00:00:00"},
+        {"until": "2020-01-01T00:00:00"},
+        {"since": "2000-01-01T00:00:00", "until": "2100-01-01T00:00:00"},
+    ]:
+        client.get(f"{V}/transactions/", headers=headers, params=params)
+    for path in [
+        f"/transactions/{bought['id']}",
+        "/transactions/export",
+        "/transactions/stats/summary",
+        "/transactions/stats/total-volume",
+        "/transactions/stats/total-count",
+        "/transactions/stats/average-price/AAPL",
+        "/transactions/stats/total-volume/AAPL",
+        "/transactions/stats/total-count/AAPL",
+        "/positions/",
+        f"/positions/{bought['security_id']}",
+        "/wallet/",
+        "/portfolio/performance/?period=1M",
+        "/news/?symbol=AAPL",
+        "/market/status",
+        "/stocks/search/?q=AA",
+    ]:
+        r = client.get(f"{V}{path}", headers=headers)
+        assert r.status_code == 200, (path, r.text)
+
+    client.post(f"{V}/watchlist/", headers=headers, json={"symbol": "AAPL"})
+    client.get(f"{V}/watchlist/", headers=headers)
+    client.delete(f"{V}/watchlist/AAPL", headers=headers)
+
+    alert = {"symbol": "MSFT", "target_price": 1, "direction": "above"}
+    client.post(f"{V}/alerts/", headers=headers, json=alert)
+    removed = client.post(
+        f"{V}/alerts/", headers=headers, json=alert | {"target_price": 2}
+    )
+    client.delete(f"{V}/alerts/{removed.json()['id']}", headers=headers)
+    page = client.get(f"{V}/alerts/", headers=headers, params={"limit": 1})
+    client.get(
+        f"{V}/alerts/",
+        headers=headers,
+        params={"limit": 1, "cursor": page.json()["next_cursor"]},
+    )
+
+    for item_headers in [headers, superuser_headers]:
+        item = client.post(f"{V}/items/", headers=item_headers, json={"title": "t"})
+        client.post(f"{V}/items/", headers=item_headers, json={"title": "u"})
+        client.put(
+            f"{V}/items/{item.json()['id']}", headers=item_headers, json={"title": "v"}
+        )
+        page = client.get(f"{V}/items/", headers=item_headers, params={"limit": 1})
+        client.get(
+            f"{V}/items/",
+            headers=item_headers,
+            params={"limit": 1, "cursor": page.json()["next_cursor"]},
+        )
+        client.get(f"{V}/items/{item.json()['id']}", headers=item_headers)
+        client.delete(f"{V}/items/{item.json()['id']}", headers=item_headers)
+
+    page = client.get(f"{V}/users/", headers=superuser_headers, params={"limit": 1})
+    client.get(
+        f"{V}/users/",
+        headers=superuser_headers,
+        params={"limit": 1, "cursor": page.json()["next_cursor"]},
+    )
+    me = client.get(f"{V}/users/me", headers=headers).json()
+    client.get(f"{V}/users/{me['id']}", headers=superuser_headers)
+
+
+def _add_news_article() -> None:
+    now = datetime.datetime.now().isoformat()
+    article = {
+        "external_id": now,
+        "headline": "Headline",
+        "published_at": now,
+        "symbols": ["AAPL"],
+    }
+    with open(settings.NEWS_FILE_PATH, "a") as f:
+        f.write(json.dumps(article) + "\n")
+
+
+async def _run_jobs() -> None:
+    now = datetime.datetime.now()
+    alerts.alert_dispatcher.on_quote(
+        Quote(
+            symbol="MSFT",
+            price=2,
+            change=0,
+            change_percent=0,
+            open=2,
+            high=2,
+            low=2,
+            previous_close=2,
+            timestamp=now,
+        )
+    )
+    # Not matching.load_pending_orders, which reads every pending order once
+    # at startup
+    async with get_session() as session:
+        await security_index.load(session)
+        await matching.process_price(session, "AAPL", 150)
+        await alerts.load_active_alerts(session)
+        await alerts.alert_dispatcher.dispatch(session)
+        await news.news_ingester.run(session)
+
+
+def test_queries_use_indexes(
+    client: TestClient,
+    user_token_headers: dict[str, str],
+    superuser_token_headers: dict[str, str],
+) -> None:
+    with capture_statements(
+        async_engine.sync_engine, async_read_engine.sync_engine
+    ) as statements:
+        _exercise_routes(client, user_token_headers, superuser_token_headers)
+        _add_news_article()
+        client.portal.call(_run_jobs)
+    assert statements
+    with engine.connect() as connection:
+        scans = find_table_scans(connection, statements, full_scans=FULL_SCANS)
+    assert scans == {}
@@ -0,0 +1,46 @@
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.core.db import engine, get_session
+from app.rebuild_positions import find_mismatches
+from app.services import matching
+from app.tests.utils import deposit, positions
+
+
+async def _tick(symbol: str, price: float) -> None:
+    async with get_session() as session:
+        await matching.process_price(session, symbol, price)
+
+
+def test_check_after_resting_fill(
+    client: TestClient, user_token_headers: dict[str, str]
+) -> None:
+    deposit(client, user_token_headers, 10000)
+    for side, order_type, price in [
+        ("buy", "market", 100),
+        ("sell", "limit", 150),
+        ("buy", "market", 200),
+    ]:
+        r = client.post(
+            f"{settings.API_V1_STR}/transactions/{side}",
+            headers=user_token_headers,
+            json={
+                "symbol": "MSFT",
+                "quantity": 10,
+                "price_per_unit": price,
+                "order_type": order_type,
+                "transaction_type": side,
+            },
+        )
+        assert r.status_code == 200, r.text
+
+    # Fills the sell placed before the second buy, which it then follows
+    client.portal.call(_tick, "MSFT", 151)
+    [position] = positions(client, user_token_headers)
+    assert position["quantity"] == 10
+    assert position["cost_basis"] == 1500
+    assert position["realized_pnl"] == 0
+
+    with Session(engine) as session:
+        assert find_mismatches(session) == []
@@ -0,0 +1,58 @@
+import uuid
+from typing import Any
+
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+
+# Seeded once for the whole session, see conftest
+SECURITIES = [
+    ("AAPL", "Apple Inc.", "NASDAQ"),
+    ("MSFT", "Microsoft Corporation", "NASDAQ"),
+]
+
+
+def login(client: TestClient, username: str, password: str) -> dict[str, str]:
+    r = client.post(
+        f"{settings.API_V1_STR}/login/access-token",
+        data={"username": username, "password": password},
+    )
+    assert r.status_code == 200, r.text
+    return {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+
+def signup(client: TestClient) -> dict[str, str]:
+    name = uuid.uuid4().hex[:20]
+    r = client.post(
+        f"{settings.API_V1_STR}/users/signup",
+        json={
+            "email": f"{name}@example.com",
+            "username": name,
+            "first_name": None,
+            "last_name": None,
+            "password": "password1234",
+        },
+    )
+    assert r.status_code == 200, r.text
+    return {"Authorization": f"Bearer {r.json()['token']}"}
+
+
+def deposit(client: TestClient, headers: dict[str, str], amount: float) -> None:
+    r = client.post(
+        f"{settings.API_V1_STR}/wallet/deposit",
+        headers=headers,
+        json={"amount": amount},
+    )
+    assert r.status_code == 200, r.text
+
+
+def balance(client: TestClient, headers: dict[str, str]) -> float:
+    r = client.get(f"{settings.API_V1_STR}/wallet/", headers=headers)
+    assert r.status_code == 200, r.text
+    return r.json()["balance"]
+
+
+def positions(client: TestClient, headers: dict[str, str]) -> list[dict[str, Any]]:
+    r = client.get(f"{settings.API_V1_STR}/positions/", headers=headers)
+    assert r.status_code == 200, r.text
+    return r.json()["data"]